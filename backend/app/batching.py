@@ -0,0 +1,110 @@
+"""
+Dynamic micro-batching scheduler
+
+Collects concurrent single-item requests and runs them through one batched
+call, flushing when the batch is full or the oldest request has waited
+max_wait seconds. Each caller gets back its own result.
+"""
+
+import asyncio
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+class MicroBatcher:
+    """Groups concurrent submit() calls into batched batch_fn calls"""
+
+    def __init__(
+        self,
+        batch_fn: Callable[[List[Any]], List[Any]],
+        max_batch_size: int = 16,
+        max_wait: float = 0.005,
+        max_concurrency: int = 1,
+        executor: Optional[Executor] = None
+    ):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait)
+        self._executor = executor or ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="microbatch")
+        self._owns_executor = executor is None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._max_concurrency = max(1, max_concurrency)
+        self._pending: List[Tuple[Any, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks = set()
+
+        self.batches = 0
+        self.items = 0
+        self.full_flushes = 0
+        self.total_batch_time = 0.0
+
+    async def submit(self, item: Any) -> Any:
+        """Queue one item and wait for its result"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self.max_batch_size:
+            self.full_flushes += 1
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        while self._pending:
+            batch = self._pending[:self.max_batch_size]
+            self._pending = self._pending[self.max_batch_size:]
+            task = asyncio.get_running_loop().create_task(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[Tuple[Any, asyncio.Future]]) -> None:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self._max_concurrency)
+        # Callers that gave up while queued do not need a slot in the batch
+        batch = [(item, future) for item, future in batch if not future.done()]
+        if not batch:
+            return
+
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            items = [item for item, _ in batch]
+            started_at = time.perf_counter()
+            try:
+                results = await loop.run_in_executor(self._executor, self.batch_fn, items)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                return
+            finally:
+                self.batches += 1
+                self.items += len(items)
+                self.total_batch_time += time.perf_counter() - started_at
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": 1000 * self.max_wait,
+            "pending": len(self._pending),
+            "batches": self.batches,
+            "items": self.items,
+            "full_flushes": self.full_flushes,
+            "avg_batch_size": self.items / self.batches if self.batches else 0.0,
+            "avg_batch_ms": 1000 * self.total_batch_time / self.batches if self.batches else 0.0
+        }
+
+    def shutdown(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._owns_executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
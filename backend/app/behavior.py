@@ -0,0 +1,384 @@
+"""
+Reviewer and product behavior store
+
+Per-reviewer and per-product aggregates for account-level fake review
+signals: review counts, average ratings, how far a reviewer's ratings sit from
+the products' averages, and the most reviews a reviewer posted in one day.
+Each entity is one row of preallocated numpy columns found through an id ->
+row dict, so a lookup is a few dict and array reads and an update is O(1).
+
+Every recorded review is remembered by a digest of its text, reviewer and
+product (13 bytes each), so checking the same review again neither records it
+twice nor counts it against itself.
+
+The store is built from the corpus in one streaming pass and saved to and
+loaded from a single .npz file.
+
+Usage:
+    python -m app.behavior build Electronics_5.json behavior.npz
+    python -m app.behavior lookup behavior.npz --reviewer A2NYK9KWFMJV4Y --product B00000J1V5
+"""
+
+import argparse
+import os
+import threading
+import time
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.dedup import content_digest
+from app.registry import registry
+
+STORE_VERSION = 1
+DAY_SECONDS = 86400
+
+REVIEWER_COLUMNS = {
+    "reviews": np.int32,
+    "rating_sum": np.int64,
+    # Sum of |rating - product average| over the reviewer's reviews
+    "deviation_sum": np.float64,
+    "last_day": np.int32,
+    "day_reviews": np.int32,
+    "max_day_reviews": np.int32
+}
+PRODUCT_COLUMNS = {
+    "reviews": np.int32,
+    "rating_sum": np.int64
+}
+
+
+class _Table:
+    """Growable numpy columns with an id -> row index"""
+
+    def __init__(self, columns: Dict[str, Any], capacity: int = 1024):
+        self.rows: Dict[str, int] = {}
+        self.columns = {name: np.zeros(capacity, dtype=dtype) for name, dtype in columns.items()}
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def row(self, entity_id: str) -> int:
+        """Row of an id, appending a zeroed row for a new one"""
+        row = self.rows.get(entity_id)
+        if row is None:
+            row = len(self.rows)
+            capacity = len(next(iter(self.columns.values())))
+            if row == capacity:
+                for name, column in self.columns.items():
+                    grown = np.zeros(2 * capacity, dtype=column.dtype)
+                    grown[:capacity] = column
+                    self.columns[name] = grown
+            self.rows[entity_id] = row
+        return row
+
+    def get(self, entity_id: Optional[str], name: str):
+        row = self.rows.get(entity_id) if entity_id is not None else None
+        return None if row is None else self.columns[name][row].item()
+
+    def arrays(self, prefix: str) -> Dict[str, np.ndarray]:
+        count = len(self.rows)
+        arrays = {f"{prefix}_ids": np.array(list(self.rows), dtype=str)}
+        arrays.update({f"{prefix}_{name}": column[:count] for name, column in self.columns.items()})
+        return arrays
+
+    def restore(self, data, prefix: str) -> None:
+        self.rows = {str(entity_id): row for row, entity_id in enumerate(data[f"{prefix}_ids"])}
+        self.columns = {name: np.array(data[f"{prefix}_{name}"]) for name in self.columns}
+        if not self.rows:
+            self.columns = {name: np.zeros(1024, dtype=column.dtype) for name, column in self.columns.items()}
+
+
+class BehaviorStore:
+    """Incrementally updated reviewer and product aggregates"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or None
+        self._lock = threading.Lock()
+        self.reviewers = _Table(REVIEWER_COLUMNS)
+        self.products = _Table(PRODUCT_COLUMNS)
+        # Recorded reviews by digest, with their rating and rating deviation:
+        # sorted arrays from the corpus or the last save, plus a dict of newer ones
+        self._digests = np.zeros(0, dtype=np.uint64)
+        self._digest_ratings = np.zeros(0, dtype=np.int8)
+        self._digest_deviations = np.zeros(0, dtype=np.float32)
+        self._recent: Dict[int, Tuple[int, float]] = {}
+        self.dirty = False
+        if self.path and os.path.exists(self.path):
+            self.load(self.path)
+
+    @classmethod
+    def from_env(cls) -> "BehaviorStore":
+        return cls(path=os.getenv("BEHAVIOR_STORE_PATH"))
+
+    def _product_average(self, product_id: Optional[str]) -> Optional[float]:
+        reviews = self.products.get(product_id, "reviews")
+        if not reviews:
+            return None
+        return self.products.get(product_id, "rating_sum") / reviews
+
+    def _recorded(self, digest: Optional[int]) -> Optional[Tuple[int, float]]:
+        """Rating and rating deviation a review was recorded with, or None if it was not"""
+        if digest is None:
+            return None
+        found = self._recent.get(digest)
+        if found is not None:
+            return found
+        position = int(np.searchsorted(self._digests, np.uint64(digest)))
+        if position < len(self._digests) and self._digests[position] == digest:
+            return int(self._digest_ratings[position]), float(self._digest_deviations[position])
+        return None
+
+    def profile(self, reviewer_id: Optional[str], product_id: Optional[str], rating: int,
+                timestamp: Optional[float] = None, digest: Optional[int] = None) -> Dict[str, Any]:
+        """Aggregates for a review about to be posted, before it is recorded
+
+        A review that was already recorded (found by its digest) is taken back
+        out of the aggregates, so every check of it sees the same profile.
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        with self._lock:
+            recorded = self._recorded(digest)
+            # This review's own share of the aggregates, when it was recorded
+            own_reviews, own_rating, own_deviation = (0, 0, 0.0) if recorded is None else (1, *recorded)
+            product_reviews = (self.products.get(product_id, "reviews") or 0) - (own_reviews if product_id else 0)
+            product_average = None
+            if product_reviews > 0:
+                product_average = (self.products.get(product_id, "rating_sum") - own_rating) / product_reviews
+            reviewer_reviews = (self.reviewers.get(reviewer_id, "reviews") or 0) - (own_reviews if reviewer_id else 0)
+
+            profile = {
+                "reviewer_reviews": reviewer_reviews,
+                "reviewer_average_rating": None,
+                "reviewer_rating_deviation": None,
+                # Counting the review being checked
+                "reviewer_max_daily_reviews": 1 if reviewer_id is not None else 0,
+                "product_reviews": product_reviews,
+                "product_average_rating": product_average,
+                "rating_deviation": None if product_average is None else abs(rating - product_average)
+            }
+            if reviewer_reviews:
+                today = int(timestamp // DAY_SECONDS)
+                same_day = self.reviewers.get(reviewer_id, "day_reviews") if (
+                    self.reviewers.get(reviewer_id, "last_day") == today) else 0
+                profile.update(
+                    reviewer_average_rating=(
+                        self.reviewers.get(reviewer_id, "rating_sum") - own_rating
+                    ) / reviewer_reviews,
+                    reviewer_rating_deviation=(
+                        self.reviewers.get(reviewer_id, "deviation_sum") - own_deviation
+                    ) / reviewer_reviews,
+                    # A recorded review is already in its day's count
+                    reviewer_max_daily_reviews=max(
+                        self.reviewers.get(reviewer_id, "max_day_reviews"), same_day + 1 - own_reviews
+                    )
+                )
+        return profile
+
+    def record(self, reviewer_id: Optional[str], product_id: Optional[str], rating: int,
+               timestamp: Optional[float] = None, digest: Optional[int] = None) -> bool:
+        """Add one review, in posting order, to its reviewer's and product's aggregates
+
+        Returns False, changing nothing, when a review with this digest was
+        already recorded.
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        with self._lock:
+            if self._recorded(digest) is not None:
+                return False
+            product_average = self._product_average(product_id)
+            deviation = 0.0 if product_average is None else abs(rating - product_average)
+            if digest is not None:
+                self._recent[digest] = (rating, deviation)
+            if product_id is not None:
+                row = self.products.row(product_id)
+                columns = self.products.columns
+                columns["reviews"][row] += 1
+                columns["rating_sum"][row] += rating
+            if reviewer_id is not None:
+                row = self.reviewers.row(reviewer_id)
+                columns = self.reviewers.columns
+                day = int(timestamp // DAY_SECONDS)
+                columns["reviews"][row] += 1
+                columns["rating_sum"][row] += rating
+                columns["deviation_sum"][row] += deviation
+                if columns["last_day"][row] == day:
+                    columns["day_reviews"][row] += 1
+                elif columns["last_day"][row] < day:
+                    columns["last_day"][row] = day
+                    columns["day_reviews"][row] = 1
+                columns["max_day_reviews"][row] = max(columns["max_day_reviews"][row], columns["day_reviews"][row])
+            self.dirty = True
+        return True
+
+    @classmethod
+    def build(cls, records: Iterable[Dict[str, Any]], path: Optional[str] = None) -> "BehaviorStore":
+        """Aggregate a corpus in one streaming pass
+
+        The corpus is not in posting order, so each review keeps only its
+        reviewer row, product row, rating, day and digest (21 bytes) during the
+        pass; rating deviations and daily bursts are computed once at the end.
+        Repeated copies of a review count once, and reviews without a
+        review_time are left out of the daily bursts.
+        """
+        store = cls(path=path)
+        reviewer_rows, product_rows, ratings, days = array("i"), array("i"), array("b"), array("i")
+        digests = array("Q")
+        for record in records:
+            reviewer_id, product_id = record.get("reviewer_id"), record.get("product_id")
+            if reviewer_id is None and product_id is None:
+                continue
+            reviewer_rows.append(-1 if reviewer_id is None else store.reviewers.row(reviewer_id))
+            product_rows.append(-1 if product_id is None else store.products.row(product_id))
+            ratings.append(record["rating"])
+            review_time = record.get("review_time")
+            days.append(-1 if review_time is None else int(review_time // DAY_SECONDS))
+            digests.append(content_digest(record.get("text") or "", reviewer_id, product_id))
+
+        digests = np.frombuffer(digests, dtype=np.uint64)
+        unique_digests, first = np.unique(digests, return_index=True)
+        first.sort()
+        reviewer_rows = np.frombuffer(reviewer_rows, dtype=np.int32)[first]
+        product_rows = np.frombuffer(product_rows, dtype=np.int32)[first]
+        ratings = np.frombuffer(ratings, dtype=np.int8).astype(np.int64)[first]
+        days = np.frombuffer(days, dtype=np.int32)[first]
+        digests = digests[first]
+        reviewer_count, product_count = len(store.reviewers), len(store.products)
+
+        # Rows are -1 where a review has no reviewer or no product ID
+        has_product = product_rows >= 0
+        products = store.products.columns
+        products["reviews"][:product_count] = np.bincount(product_rows[has_product], minlength=product_count)
+        products["rating_sum"][:product_count] = np.bincount(
+            product_rows[has_product], ratings[has_product], product_count
+        )
+        averages = products["rating_sum"][:product_count] / np.maximum(products["reviews"][:product_count], 1)
+
+        has_reviewer = reviewer_rows >= 0
+        deviations = np.where(has_product, np.abs(ratings - averages[np.maximum(product_rows, 0)]), 0.0)
+        order = np.argsort(digests)
+        store._digests = unique_digests
+        store._digest_ratings = ratings[order].astype(np.int8)
+        store._digest_deviations = deviations[order].astype(np.float32)
+        reviewer_rows, ratings, days = reviewer_rows[has_reviewer], ratings[has_reviewer], days[has_reviewer]
+        reviewers = store.reviewers.columns
+        reviewers["reviews"][:reviewer_count] = np.bincount(reviewer_rows, minlength=reviewer_count)
+        reviewers["rating_sum"][:reviewer_count] = np.bincount(reviewer_rows, ratings, reviewer_count)
+        reviewers["deviation_sum"][:reviewer_count] = np.bincount(
+            reviewer_rows, deviations[has_reviewer], reviewer_count
+        )
+
+        # Day -1: no review_time, so no day to count a burst in
+        dated = days >= 0
+        reviewer_rows, days = reviewer_rows[dated], days[dated]
+        if len(reviewer_rows):
+            # Reviews per (reviewer, day), then the busiest day and the latest day per reviewer
+            pairs, per_day = np.unique((reviewer_rows.astype(np.int64) << 32) | days, return_counts=True)
+            pair_reviewers = (pairs >> 32).astype(np.int32)
+            pair_days = (pairs & 0xFFFFFFFF).astype(np.int32)
+            np.maximum.at(reviewers["max_day_reviews"], pair_reviewers, per_day.astype(np.int32))
+            latest = np.r_[pair_reviewers[1:] != pair_reviewers[:-1], True]
+            reviewers["last_day"][pair_reviewers[latest]] = pair_days[latest]
+            reviewers["day_reviews"][pair_reviewers[latest]] = per_day[latest]
+
+        store.dirty = True
+        return store
+
+    def save(self, path: Optional[str] = None) -> None:
+        """Atomically write the store to an .npz file"""
+        path = path or self.path
+        if not path:
+            return
+        with self._lock:
+            arrays = {"version": np.array([STORE_VERSION])}
+            arrays.update(self.reviewers.arrays("reviewer"))
+            arrays.update(self.products.arrays("product"))
+            self._merge_recent()
+            arrays.update(
+                review_digests=self._digests, review_ratings=self._digest_ratings,
+                review_deviations=self._digest_deviations
+            )
+            self.dirty = False
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, path)
+
+    def _merge_recent(self) -> None:
+        """Fold reviews recorded since the last save into the sorted digest arrays"""
+        if not self._recent:
+            return
+        digests = np.concatenate([self._digests, np.fromiter(self._recent, dtype=np.uint64, count=len(self._recent))])
+        order = np.argsort(digests, kind="stable")
+        recent = list(self._recent.values())
+        self._digests = digests[order]
+        self._digest_ratings = np.concatenate(
+            [self._digest_ratings, np.array([rating for rating, _ in recent], dtype=np.int8)]
+        )[order]
+        self._digest_deviations = np.concatenate(
+            [self._digest_deviations, np.array([deviation for _, deviation in recent], dtype=np.float32)]
+        )[order]
+        self._recent = {}
+
+    def load(self, path: str) -> None:
+        """Restore a store written by save()"""
+        with np.load(path) as data:
+            if data["version"][0] != STORE_VERSION:
+                print(f"⚠️ Ignoring behavior store {path} with unknown version")
+                return
+            with self._lock:
+                self.reviewers.restore(data, "reviewer")
+                self.products.restore(data, "product")
+                # Stores saved before digests were kept have none
+                if "review_digests" in data.files:
+                    self._digests = np.array(data["review_digests"])
+                    self._digest_ratings = np.array(data["review_ratings"])
+                    self._digest_deviations = np.array(data["review_deviations"])
+                self._recent = {}
+                self.dirty = False
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "reviewers": len(self.reviewers),
+            "products": len(self.products),
+            "reviews": len(self._digests) + len(self._recent),
+            "bytes": int(sum(column.nbytes for table in (self.reviewers, self.products)
+                             for column in table.columns.values())
+                         + self._digests.nbytes + self._digest_ratings.nbytes + self._digest_deviations.nbytes)
+        }
+
+
+registry.register("behavior_store", BehaviorStore.from_env)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Build or query the reviewer/product behavior store")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="Aggregate every review in a JSON-lines or CSV file")
+    build.add_argument("input", help="JSON-lines (e.g. Electronics_5.json) or CSV review file")
+    build.add_argument("store", help="Output .npz file")
+    lookup = commands.add_parser("lookup", help="Show the aggregates for a reviewer and/or product")
+    lookup.add_argument("store", help="Store .npz file")
+    lookup.add_argument("--reviewer")
+    lookup.add_argument("--product")
+    lookup.add_argument("--rating", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        from app.bulk import iter_records
+
+        started_at = time.perf_counter()
+        store = BehaviorStore.build(iter_records(args.input))
+        store.save(args.store)
+        stats = store.stats()
+        print(f"✅ Aggregated {stats['reviewers']:,} reviewers and {stats['products']:,} products "
+              f"into {args.store} in {time.perf_counter() - started_at:.1f}s")
+    else:
+        store = BehaviorStore(path=args.store)
+        for name, value in store.profile(args.reviewer, args.product, args.rating).items():
+            print(f"   {name}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Per-request deadlines
+
+Every request gets a time budget: REQUEST_TIMEOUT seconds, or less when the
+client sends X-Request-Deadline (the seconds it is willing to wait). The
+deadline travels with the request through ModelManager. The inference
+executor sheds requests whose estimated queue wait already exceeds it, and
+batch scoring stops at the next item boundary once it passes or the client
+disconnects, returning the items it finished. Expiry uses the wall clock so
+worker processes can honor it too; a disconnect only reaches work running in
+this process.
+"""
+
+import asyncio
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Iterable, List, Optional
+
+# How often waiting batch work checks for a disconnected client
+POLL_SECONDS = 0.1
+
+
+class DeadlineExceeded(Exception):
+    """The request ran out of time before it could be answered"""
+
+
+class Deadline:
+    """When a request's time budget runs out, and whether it was cancelled early"""
+
+    def __init__(self, timeout: Optional[float] = None):
+        self.expires_at = time.time() + timeout if timeout is not None else None
+        self.reason: Optional[str] = None
+        self._cancelled = threading.Event()
+
+    @classmethod
+    def from_header(cls, header: Optional[str], default: Optional[float], elapsed: float = 0.0) -> "Deadline":
+        """The shorter of the configured timeout and X-Request-Deadline, less time already spent
+
+        A default of 0 or None means no configured limit. Raises ValueError
+        when the header is not a positive number of seconds.
+        """
+        timeout = default if default and default > 0 else None
+        if header is not None:
+            requested = float(header)
+            if not requested > 0:
+                raise ValueError(f"Invalid deadline: {header}")
+            timeout = requested if timeout is None else min(timeout, requested)
+        return cls(None if timeout is None else timeout - elapsed)
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left, or None without a time limit"""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.time())
+
+    @property
+    def expired(self) -> bool:
+        return self.expires_at is not None and time.time() >= self.expires_at
+
+    def cancel(self, reason: str) -> None:
+        """Stop the request's remaining work, e.g. because the client went away"""
+        if self.reason is None:
+            self.reason = reason
+        self._cancelled.set()
+
+    def stop_reason(self) -> Optional[str]:
+        """Why work should stop now, or None to keep going"""
+        if self._cancelled.is_set():
+            return self.reason
+        if self.expired:
+            return "request deadline exceeded"
+        return None
+
+    def __getstate__(self):
+        # Worker processes get the expiry and any cancellation made before pickling
+        return {"expires_at": self.expires_at, "reason": self.reason}
+
+    def __setstate__(self, state):
+        self.expires_at = state["expires_at"]
+        self.reason = state["reason"]
+        self._cancelled = threading.Event()
+        if self.reason is not None:
+            self._cancelled.set()
+
+
+async def gather_within(awaitables: Iterable[Awaitable[Any]], deadline: Optional[Deadline]) -> List[Any]:
+    """Like gather(return_exceptions=True), but unfinished items become DeadlineExceeded once the deadline stops them"""
+    tasks = [asyncio.ensure_future(awaitable) for awaitable in awaitables]
+    pending = set(tasks)
+    while pending and (deadline is None or deadline.stop_reason() is None):
+        remaining = deadline.remaining() if deadline is not None else None
+        timeout = None if deadline is None else POLL_SECONDS if remaining is None else min(POLL_SECONDS, remaining)
+        _, pending = await asyncio.wait(pending, timeout=timeout)
+    for task in pending:
+        task.cancel()
+
+    results = []
+    for task in tasks:
+        if task in pending:
+            results.append(DeadlineExceeded(deadline.stop_reason()))
+        elif task.exception() is not None:
+            results.append(task.exception())
+        else:
+            results.append(task.result())
+    return results
+
+
+@asynccontextmanager
+async def cancel_on_disconnect(request, deadline: Deadline):
+    """Cancel the deadline if the client disconnects while the block runs"""
+    async def watch():
+        while not await request.is_disconnected():
+            await asyncio.sleep(POLL_SECONDS)
+        deadline.cancel("client disconnected")
+
+    watcher = asyncio.create_task(watch())
+    try:
+        yield
+    finally:
+        watcher.cancel()
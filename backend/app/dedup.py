@@ -0,0 +1,325 @@
+"""
+Near-duplicate review index
+
+Reviews are reduced to word 3-shingles, MinHash signatures and LSH band keys.
+Each band keeps a sorted key array with the matching review ids, so a query is
+a handful of binary searches plus a vectorized signature comparison against
+the few candidates, never a scan of the corpus. Inserts land in a small
+pending buffer that is merged into the sorted arrays in linear time.
+
+Each entry also keeps a 64-bit digest of its text, reviewer and product. A
+check of a review that is already indexed (a retry or a re-check) neither
+matches its own earlier copy nor is indexed again; the same text from another
+reviewer or for another product still counts.
+
+Signatures are stored as 16-bit values and the index has a fixed capacity, so
+memory stays bounded (about 340 bytes per review with the defaults, roughly
+570 MB for the 1.69M-review Electronics corpus). The index is saved to and
+loaded from a single .npz file.
+
+Usage:
+    python -m app.dedup build Electronics_5.json duplicates.npz
+    python -m app.dedup query duplicates.npz "Great product, works as advertised"
+"""
+
+import argparse
+import hashlib
+import os
+import re
+import threading
+import time
+import zlib
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.registry import registry
+
+INDEX_VERSION = 1
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+
+
+def shingle_hashes(text: str, size: int = 3) -> np.ndarray:
+    """32-bit hashes of the distinct word shingles of a review"""
+    tokens = _TOKEN.findall(text.lower())
+    if len(tokens) < size:
+        grams = {" ".join(tokens)} if tokens else set()
+    else:
+        grams = {" ".join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)}
+    return np.fromiter((zlib.crc32(gram.encode("utf-8")) for gram in grams), dtype=np.uint64, count=len(grams))
+
+
+def content_digest(text: str, reviewer_id: Optional[str] = None, product_id: Optional[str] = None) -> int:
+    """64-bit hash identifying one review by its text, reviewer and product (never 0)"""
+    payload = "\x1f".join((text, reviewer_id or "", product_id or "")).encode("utf-8", "surrogatepass")
+    return int.from_bytes(hashlib.blake2b(payload, digest_size=8).digest(), "little") or 1
+
+
+class NearDuplicateIndex:
+    """MinHash + LSH banding index with incremental inserts"""
+
+    def __init__(self, num_perm: int = 64, bands: int = 16, threshold: float = 0.8,
+                 shingle_size: int = 3, max_items: int = 2_000_000, merge_every: int = 10_000,
+                 max_candidates: int = 10_000, path: Optional[str] = None, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        self.max_items = max_items
+        self.merge_every = max(1, merge_every)
+        self.max_candidates = max_candidates
+        self.path = path or None
+        self.seed = seed
+
+        # a * x + b stays below 2**64 for 32-bit shingle hashes, so uint64 is exact
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, 2 ** 31, size=num_perm).astype(np.uint64)
+        self._b = rng.randint(0, 2 ** 31, size=num_perm).astype(np.uint64)
+        self._band_mix = rng.randint(1, 2 ** 62, size=self.rows).astype(np.uint64) * np.uint64(2) + np.uint64(1)
+
+        self._lock = threading.RLock()
+        self.count = 0
+        self.signatures = np.zeros((0, num_perm), dtype=np.uint16)
+        # 0 for entries loaded from an index saved before digests were kept
+        self.digests = np.zeros(0, dtype=np.uint64)
+        self._keys = [np.zeros(0, dtype=np.uint64) for _ in range(bands)]
+        self._ids = [np.zeros(0, dtype=np.uint32) for _ in range(bands)]
+        self._pending_keys: List[np.ndarray] = []
+        self._pending_ids: List[int] = []
+        self._pending_lookup = [dict() for _ in range(bands)]
+        self.dirty = False
+        self._warned_full = False
+
+        if self.path and os.path.exists(self.path):
+            self.load(self.path)
+
+    @classmethod
+    def from_env(cls) -> "NearDuplicateIndex":
+        return cls(
+            num_perm=int(os.getenv("DEDUP_NUM_PERM", 64)),
+            bands=int(os.getenv("DEDUP_BANDS", 16)),
+            threshold=float(os.getenv("DEDUP_THRESHOLD", 0.8)),
+            max_items=int(os.getenv("DEDUP_MAX_ITEMS", 2_000_000)),
+            path=os.getenv("DEDUP_INDEX_PATH")
+        )
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _minhash(self, text: str) -> Optional[np.ndarray]:
+        hashes = shingle_hashes(text, self.shingle_size)
+        if hashes.size == 0:
+            return None
+        return ((hashes[:, None] * self._a + self._b) % _MERSENNE_PRIME).min(axis=0)
+
+    def _band_keys(self, minhash: np.ndarray) -> np.ndarray:
+        # Wrapping uint64 arithmetic is intended: this is a hash of each band's rows
+        return (minhash.reshape(self.bands, self.rows) * self._band_mix).sum(axis=1)
+
+    def _candidates(self, keys: np.ndarray) -> np.ndarray:
+        found = []
+        for band, key in enumerate(keys):
+            base = self._keys[band]
+            start = np.searchsorted(base, key, side="left")
+            end = np.searchsorted(base, key, side="right")
+            if end > start:
+                found.append(self._ids[band][start:end])
+            pending = self._pending_lookup[band].get(int(key))
+            if pending:
+                found.append(np.asarray(pending, dtype=np.uint32))
+        if not found:
+            return np.zeros(0, dtype=np.uint32)
+        return np.unique(np.concatenate(found))[:self.max_candidates]
+
+    def _matches(self, minhash: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        candidates = self._candidates(self._band_keys(minhash))
+        if candidates.size == 0:
+            return candidates, np.zeros(0)
+        similarity = (self.signatures[candidates] == minhash.astype(np.uint16)).mean(axis=1)
+        keep = similarity >= self.threshold
+        return candidates[keep], similarity[keep]
+
+    def query(self, text: str) -> List[Tuple[int, float]]:
+        """(review id, estimated Jaccard similarity) of indexed near-duplicates"""
+        minhash = self._minhash(text)
+        if minhash is None:
+            return []
+        with self._lock:
+            ids, similarity = self._matches(minhash)
+        return [(int(i), float(s)) for i, s in zip(ids, similarity)]
+
+    def _other_reviews(self, minhash: np.ndarray, digest: int) -> Tuple[int, bool]:
+        """Near-duplicates other than copies of this same review, and whether such a copy is indexed"""
+        ids, _ = self._matches(minhash)
+        same = self.digests[ids] == np.uint64(digest)
+        return int(ids.size - same.sum()), bool(same.any())
+
+    def count_near_duplicates(self, text: str, digest: Optional[int] = None) -> int:
+        """Indexed near-duplicates, not counting copies of the review with this digest (default: the text's)"""
+        minhash = self._minhash(text)
+        if minhash is None:
+            return 0
+        with self._lock:
+            return self._other_reviews(minhash, content_digest(text) if digest is None else digest)[0]
+
+    def add(self, text: str, digest: Optional[int] = None) -> Optional[int]:
+        """Index a review, returning its id (None for empty text or a full index)"""
+        minhash = self._minhash(text)
+        if minhash is None:
+            return None
+        with self._lock:
+            return self._insert(minhash, content_digest(text) if digest is None else digest)
+
+    def check_and_add(self, text: str, digest: Optional[int] = None) -> int:
+        """Count near-duplicates already indexed, then index this review unless it already is"""
+        minhash = self._minhash(text)
+        if minhash is None:
+            return 0
+        digest = content_digest(text) if digest is None else digest
+        with self._lock:
+            count, indexed = self._other_reviews(minhash, digest)
+            if not indexed:
+                self._insert(minhash, digest)
+        return count
+
+    def add_many(self, texts: Iterable[str]) -> int:
+        """Index many reviews, returning how many were added"""
+        added = 0
+        for text in texts:
+            if self.add(text) is not None:
+                added += 1
+        return added
+
+    def _insert(self, minhash: np.ndarray, digest: int) -> Optional[int]:
+        if self.count >= self.max_items:
+            if not self._warned_full:
+                print(f"⚠️ Near-duplicate index is full ({self.max_items:,} reviews); new reviews are not indexed")
+                self._warned_full = True
+            return None
+        if self.count == len(self.signatures):
+            grown = np.zeros((min(self.max_items, max(1024, 2 * self.count)), self.num_perm), dtype=np.uint16)
+            grown[:self.count] = self.signatures[:self.count]
+            self.signatures = grown
+            digests = np.zeros(len(grown), dtype=np.uint64)
+            digests[:self.count] = self.digests[:self.count]
+            self.digests = digests
+
+        review_id = self.count
+        self.signatures[review_id] = minhash.astype(np.uint16)
+        self.digests[review_id] = digest
+        keys = self._band_keys(minhash)
+        for band, key in enumerate(keys):
+            self._pending_lookup[band].setdefault(int(key), []).append(review_id)
+        self._pending_keys.append(keys)
+        self._pending_ids.append(review_id)
+        self.count += 1
+        self.dirty = True
+        if len(self._pending_ids) >= self.merge_every:
+            self._merge()
+        return review_id
+
+    def _merge(self) -> None:
+        """Fold pending inserts into the sorted band arrays in O(n) per band"""
+        if not self._pending_ids:
+            return
+        pending_keys = np.vstack(self._pending_keys)
+        pending_ids = np.asarray(self._pending_ids, dtype=np.uint32)
+        for band in range(self.bands):
+            order = np.argsort(pending_keys[:, band], kind="stable")
+            keys = pending_keys[order, band]
+            positions = np.searchsorted(self._keys[band], keys, side="right")
+            self._keys[band] = np.insert(self._keys[band], positions, keys)
+            self._ids[band] = np.insert(self._ids[band], positions, pending_ids[order])
+        self._pending_keys = []
+        self._pending_ids = []
+        self._pending_lookup = [dict() for _ in range(self.bands)]
+
+    def _params(self) -> np.ndarray:
+        return np.array([INDEX_VERSION, self.num_perm, self.bands, self.shingle_size, self.seed], dtype=np.int64)
+
+    def save(self, path: Optional[str] = None) -> None:
+        """Atomically write the index to an .npz file"""
+        path = path or self.path
+        if not path:
+            return
+        with self._lock:
+            self._merge()
+            arrays = {
+                "params": self._params(), "signatures": self.signatures[:self.count],
+                "digests": self.digests[:self.count]
+            }
+            for band in range(self.bands):
+                arrays[f"keys_{band}"] = self._keys[band]
+                arrays[f"ids_{band}"] = self._ids[band]
+            self.dirty = False
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, path)
+
+    def load(self, path: str) -> None:
+        """Restore an index written by save() with the same parameters"""
+        with np.load(path) as data:
+            if not np.array_equal(data["params"], self._params()):
+                print(f"⚠️ Ignoring near-duplicate index {path} built with different parameters")
+                return
+            with self._lock:
+                self.signatures = data["signatures"]
+                self.count = len(self.signatures)
+                self.digests = data["digests"] if "digests" in data.files else np.zeros(self.count, dtype=np.uint64)
+                self._keys = [data[f"keys_{band}"] for band in range(self.bands)]
+                self._ids = [data[f"ids_{band}"] for band in range(self.bands)]
+                self.dirty = False
+
+    def stats(self):
+        return {
+            "reviews": self.count,
+            "capacity": self.max_items,
+            "pending": len(self._pending_ids),
+            "bytes": int(self.signatures.nbytes + self.digests.nbytes + sum(k.nbytes + i.nbytes for k, i in zip(self._keys, self._ids)))
+        }
+
+
+registry.register("duplicate_index", NearDuplicateIndex.from_env)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Build or query the near-duplicate review index")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="Index every review in a JSON-lines or CSV file")
+    build.add_argument("input", help="JSON-lines (e.g. Electronics_5.json) or CSV review file")
+    build.add_argument("index", help="Output .npz file")
+    query = commands.add_parser("query", help="Find near-duplicates of a text")
+    query.add_argument("index", help="Index .npz file")
+    query.add_argument("text")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        from app.bulk import iter_records
+
+        index = NearDuplicateIndex.from_env()
+        index.path = None
+        started_at = time.perf_counter()
+        for number, record in enumerate(iter_records(args.input), 1):
+            index.add(record["text"], content_digest(record["text"], record["reviewer_id"], record["product_id"]))
+            if number % 100_000 == 0:
+                elapsed = time.perf_counter() - started_at
+                print(f"📦 {number:,} reviews indexed ({number / elapsed:,.0f} reviews/sec)")
+        index.save(args.index)
+        print(f"✅ Indexed {index.count:,} reviews into {args.index} ({index.stats()['bytes'] / 1e6:,.0f} MB)")
+    else:
+        index = NearDuplicateIndex.from_env()
+        index.load(args.index)
+        matches = index.query(args.text)
+        print(f"🔎 {len(matches)} near-duplicates among {index.count:,} reviews")
+        for review_id, similarity in sorted(matches, key=lambda match: -match[1])[:20]:
+            print(f"   #{review_id}: {similarity:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,294 @@
+"""
+Offline evaluation harness
+
+Scores a labeled CSV split (the notebook's Score/Text columns) through an
+analyzer's batch path and reports quality and speed from the same run:
+accuracy, per-class precision/recall/F1 and the confusion matrix, alongside
+reviews/sec, p50/p99 batch latency and peak RSS. Reports are saved as JSON
+and can be compared against a stored baseline, so a speedup that changes
+predictions or a slowdown fails the run.
+
+Usage:
+    python -m app.evaluation val.csv --model vader --output reports/vader.json
+    python -m app.evaluation val.csv --model vader --baseline reports/vader.json
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import os
+import resource
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from app.transformer import SENTIMENT_LABELS
+
+REPORT_VERSION = 3
+
+Predictor = Callable[[List[str]], List[Dict[str, Any]]]
+
+
+def score_to_sentiment(score: Any) -> Optional[str]:
+    """The notebook's labels: 1-2 Negative, 3 Neutral, 4-5 Positive"""
+    try:
+        score = int(float(score))
+    except (TypeError, ValueError):
+        return None
+    if score in (1, 2):
+        return "Negative"
+    if score == 3:
+        return "Neutral"
+    if score in (4, 5):
+        return "Positive"
+    return None
+
+
+def load_labeled_split(path: str, limit: Optional[int] = None) -> Tuple[List[str], List[str]]:
+    """Texts and gold labels, from a Sentiment column or derived from Score"""
+    csv.field_size_limit(sys.maxsize)
+    texts, labels = [], []
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            label = row.get("Sentiment") or score_to_sentiment(row.get("Score"))
+            if label not in SENTIMENT_LABELS:
+                continue
+            texts.append(str(row.get("Text") or ""))
+            labels.append(label)
+            if limit is not None and len(texts) >= limit:
+                break
+    return texts, labels
+
+
+def _vader_predictor() -> Predictor:
+    from app.workers import _init_worker, analyze_sentiment_shard
+    _init_worker()
+    return lambda texts: analyze_sentiment_shard(texts, "vader")
+
+
+def _roberta_predictor() -> Predictor:
+    from app.models import ModelManager
+
+    model_path = os.getenv("ROBERTA_MODEL_PATH") or os.getenv("ROBERTA_MODEL_NAME")
+    if not model_path:
+        raise SystemExit("❌ Set ROBERTA_MODEL_PATH to evaluate the roberta model")
+    # Same ROBERTA_QUANTIZE / ROBERTA_RUNTIME / TORCH_NUM_THREADS settings as the API
+    return ModelManager._read_roberta(model_path).predict_batch
+
+
+# Every analyzer the API serves, built the same way the batch path builds it
+PREDICTORS: Dict[str, Callable[[], Predictor]] = {
+    "vader": _vader_predictor,
+    "roberta": _roberta_predictor
+}
+
+
+def classification_metrics(y_true: Sequence[str], y_pred: Sequence[Optional[str]],
+                           labels: Sequence[str] = SENTIMENT_LABELS) -> Dict[str, Any]:
+    """Accuracy, per-class precision/recall/F1 and confusion matrix (rows = actual)
+
+    Failed predictions (None) count as wrong and are left out of the matrix.
+    """
+    index = {label: i for i, label in enumerate(labels)}
+    matrix = [[0] * len(labels) for _ in labels]
+    support = {label: 0 for label in labels}
+    correct = 0
+    for actual, predicted in zip(y_true, y_pred):
+        support[actual] += 1
+        if predicted in index:
+            matrix[index[actual]][index[predicted]] += 1
+            correct += actual == predicted
+
+    precision, recall, f1 = {}, {}, {}
+    for label, i in index.items():
+        true_positives = matrix[i][i]
+        predicted_count = sum(row[i] for row in matrix)
+        precision[label] = true_positives / predicted_count if predicted_count else 0.0
+        recall[label] = true_positives / support[label] if support[label] else 0.0
+        total = precision[label] + recall[label]
+        f1[label] = 2 * precision[label] * recall[label] / total if total else 0.0
+
+    return {
+        "accuracy": correct / len(y_true) if y_true else 0.0,
+        "precision": precision,
+        "recall": recall,
+        "f1_score": f1,
+        "confusion_matrix": matrix,
+        "labels": list(labels),
+        "support": support,
+        "errors": sum(1 for predicted in y_pred if predicted not in index)
+    }
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """Nearest-rank percentile, q in [0, 100]"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * q // 100))
+    return ordered[min(len(ordered), int(rank)) - 1]
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process so far"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _digest(values: Sequence[Optional[str]]) -> str:
+    return hashlib.sha256("\n".join(value or "" for value in values).encode("utf-8")).hexdigest()
+
+
+def evaluate(texts: List[str], labels: List[str], predictor: Predictor, model: str,
+             batch_size: int = 32, warmup_batches: int = 1,
+             clock: Callable[[], float] = time.perf_counter) -> Dict[str, Any]:
+    """Score texts batch by batch and build the quality + speed report
+
+    Items in a batch are scored together, so latency is measured per batch:
+    one wall-time sample per predictor call, the last batch possibly short.
+    """
+    batch_size = max(1, batch_size)
+    batches = [texts[start:start + batch_size] for start in range(0, len(texts), batch_size)]
+    for batch in batches[:warmup_batches]:
+        predictor(batch)
+
+    predictions: List[Optional[str]] = []
+    batch_latencies: List[float] = []
+    started_at = clock()
+    for batch in batches:
+        batch_started_at = clock()
+        results = predictor(batch)
+        batch_latencies.append(clock() - batch_started_at)
+        predictions.extend(None if "error" in result else result["sentiment"] for result in results)
+    total_seconds = clock() - started_at
+
+    return {
+        "version": REPORT_VERSION,
+        "model": model,
+        "reviews": len(texts),
+        "batch_size": batch_size,
+        "dataset_digest": _digest(texts),
+        "predictions_digest": _digest(predictions),
+        "quality": classification_metrics(labels, predictions),
+        "speed": {
+            "total_seconds": total_seconds,
+            "reviews_per_second": len(texts) / total_seconds if total_seconds else 0.0,
+            "batch_latency_p50_ms": percentile(batch_latencies, 50) * 1000,
+            "batch_latency_p99_ms": percentile(batch_latencies, 99) * 1000,
+            "peak_rss_mb": peak_rss_mb()
+        },
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+    }
+
+
+def compare_reports(report: Dict[str, Any], baseline: Dict[str, Any], max_slowdown: float = 0.10,
+                    accuracy_tolerance: float = 0.0) -> List[str]:
+    """Regressions of report against baseline; empty when the run passes"""
+    if baseline.get("version") != report["version"]:
+        return [f"baseline is a version {baseline.get('version')} report, expected {report['version']}; "
+                "re-run it to compare"]
+    if report["dataset_digest"] != baseline["dataset_digest"]:
+        return ["dataset differs from the baseline's; reports are not comparable"]
+
+    regressions = []
+    if report["predictions_digest"] != baseline["predictions_digest"]:
+        regressions.append("predictions differ from the baseline")
+    accuracy_drop = baseline["quality"]["accuracy"] - report["quality"]["accuracy"]
+    if accuracy_drop > accuracy_tolerance:
+        regressions.append(f"accuracy dropped by {accuracy_drop:.4f}")
+
+    speed, baseline_speed = report["speed"], baseline["speed"]
+    if speed["reviews_per_second"] < baseline_speed["reviews_per_second"] * (1 - max_slowdown):
+        regressions.append(
+            f"throughput fell from {baseline_speed['reviews_per_second']:,.0f} "
+            f"to {speed['reviews_per_second']:,.0f} reviews/sec"
+        )
+    for name in ("batch_latency_p50_ms", "batch_latency_p99_ms"):
+        if speed[name] > baseline_speed[name] * (1 + max_slowdown):
+            regressions.append(f"{name} rose from {baseline_speed[name]:.3f} to {speed[name]:.3f}")
+    return regressions
+
+
+def load_reports(directory: Optional[str]) -> Dict[str, Dict[str, Any]]:
+    """Latest saved report per model from a directory of report JSON files"""
+    reports: Dict[str, Dict[str, Any]] = {}
+    if not directory or not os.path.isdir(directory):
+        return reports
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(directory, name)) as f:
+                report = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if report.get("version") != REPORT_VERSION:
+            continue
+        current = reports.get(report["model"])
+        if current is None or report["created_at"] >= current["created_at"]:
+            reports[report["model"]] = report
+    return reports
+
+
+def save_report(report: Dict[str, Any], path: str) -> None:
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path + ".tmp", "w") as f:
+        json.dump(report, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    quality, speed = report["quality"], report["speed"]
+    print(f"📊 {report['model']} on {report['reviews']:,} reviews (batch size {report['batch_size']})")
+    print(f"   Accuracy: {quality['accuracy']:.3f}  Errors: {quality['errors']}")
+    for label in quality["labels"]:
+        print(f"   {label:<8} P={quality['precision'][label]:.3f} "
+              f"R={quality['recall'][label]:.3f} F1={quality['f1_score'][label]:.3f}")
+    print(f"   Confusion matrix (rows = actual, columns = predicted): {quality['confusion_matrix']}")
+    print(f"⏱️  {speed['reviews_per_second']:,.0f} reviews/sec, "
+          f"batch p50 {speed['batch_latency_p50_ms']:.3f} ms, p99 {speed['batch_latency_p99_ms']:.3f} ms, "
+          f"peak RSS {speed['peak_rss_mb']:.0f} MB")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Evaluate an analyzer on a labeled review split")
+    parser.add_argument("input", help="CSV with Text and Score (or Sentiment) columns, e.g. val.csv")
+    parser.add_argument("--model", choices=sorted(PREDICTORS), default="vader")
+    parser.add_argument("--batch-size", type=int, default=int(os.getenv("BATCH_SIZE", 32)))
+    parser.add_argument("--limit", type=int, default=None, help="Evaluate only the first N labeled rows")
+    parser.add_argument("--output", help="Where to save the JSON report")
+    parser.add_argument("--baseline", help="Saved report to compare against; exits 1 on regressions")
+    parser.add_argument("--max-slowdown", type=float, default=0.10,
+                        help="Allowed fractional throughput/latency regression (default 0.10)")
+    parser.add_argument("--accuracy-tolerance", type=float, default=0.0,
+                        help="Allowed absolute accuracy drop (default 0)")
+    args = parser.parse_args(argv)
+
+    texts, labels = load_labeled_split(args.input, args.limit)
+    if not texts:
+        raise SystemExit(f"❌ No labeled reviews found in {args.input}")
+
+    report = evaluate(texts, labels, PREDICTORS[args.model](), args.model, args.batch_size)
+    report["dataset"] = os.path.abspath(args.input)
+    print_report(report)
+    if args.output:
+        save_report(report, args.output)
+        print(f"💾 Report saved to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare_reports(report, baseline, args.max_slowdown, args.accuracy_tolerance)
+        if regressions:
+            for regression in regressions:
+                print(f"❌ {regression}")
+            raise SystemExit(1)
+        print("✅ No regressions against the baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""
+Bounded inference executor
+
+Runs CPU-bound analyzer calls off the asyncio event loop on a thread or
+process pool. Admission is capped at workers + queue size; beyond that
+requests are rejected immediately with a Retry-After estimate, as are
+requests whose deadline would pass while they wait in the queue. Streams can
+instead wait for a slot to free up, which pushes back on their input.
+"""
+
+import asyncio
+import math
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+from app.deadlines import Deadline, DeadlineExceeded
+from app.workers import _init_worker
+
+
+class OverloadedError(Exception):
+    """Raised when the inference queue is full"""
+
+    def __init__(self, retry_after: int, message: str = "Inference queue is full, retry later"):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def _timed_call(fn: Callable, args: Tuple[Any, ...]) -> Tuple[float, float, Any]:
+    """Run fn in the pool, returning (start, end, result) on the monotonic clock"""
+    started_at = time.monotonic()
+    result = fn(*args)
+    return started_at, time.monotonic(), result
+
+
+class InferenceExecutor:
+    """Thread or process pool with a bounded admission queue"""
+
+    def __init__(self, workers: int = 4, queue_size: int = 64, kind: str = "thread"):
+        if kind not in ("thread", "process"):
+            raise ValueError("Executor kind must be 'thread' or 'process'")
+        self.workers = max(1, workers)
+        self.queue_size = max(0, queue_size)
+        self.kind = kind
+        self._executor: Executor = None
+        self._slot_waiters: Deque[asyncio.Future] = deque()
+
+        self.in_flight = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.shed = 0
+        self.completed = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.total_run = 0.0
+
+    @property
+    def capacity(self) -> int:
+        return self.workers + self.queue_size
+
+    @property
+    def queued(self) -> int:
+        return max(0, self.in_flight - self.workers)
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="inference")
+        return self._executor
+
+    def retry_after(self) -> int:
+        """Seconds until a queued slot is likely to free up"""
+        avg_run = self.total_run / self.completed if self.completed else 0.1
+        return max(1, math.ceil(avg_run * (self.queued + 1) / self.workers))
+
+    def estimated_wait(self) -> float:
+        """Seconds a request admitted now would likely queue before a worker picks it up"""
+        if self.in_flight < self.workers:
+            return 0.0
+        avg_run = self.total_run / self.completed if self.completed else 0.1
+        return avg_run * (self.queued + 1) / self.workers
+
+    async def _wait_for_slot(self) -> None:
+        """Block until in_flight drops below capacity, first come first served among waiters"""
+        while self.in_flight >= self.capacity:
+            waiter = asyncio.get_running_loop().create_future()
+            self._slot_waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                # Pass on a wakeup this waiter received but can no longer use
+                if waiter.done() and not waiter.cancelled():
+                    self._wake_next()
+                raise
+            finally:
+                if waiter in self._slot_waiters:
+                    self._slot_waiters.remove(waiter)
+
+    def _wake_next(self) -> None:
+        while self._slot_waiters:
+            waiter = self._slot_waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+
+    @asynccontextmanager
+    async def admit(self, deadline: Optional[Deadline] = None, wait: bool = False):
+        """Reserve an admission slot, or raise OverloadedError when full or the wait would outlast the deadline
+
+        With wait, a full queue is waited out instead of rejected.
+        """
+        if self.in_flight >= self.capacity:
+            if not wait:
+                self.rejected += 1
+                raise OverloadedError(self.retry_after())
+            await self._wait_for_slot()
+        if deadline is not None:
+            if deadline.expired:
+                raise DeadlineExceeded("Request deadline exceeded")
+            remaining = deadline.remaining()
+            if remaining is not None and self.estimated_wait() > remaining:
+                self.shed += 1
+                raise OverloadedError(self.retry_after(), "Estimated queue wait exceeds the request deadline")
+        self.in_flight += 1
+        self.admitted += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self._wake_next()
+
+    async def run(self, fn: Callable, *args: Any, deadline: Optional[Deadline] = None, wait: bool = False) -> Any:
+        """Run fn(*args) on the pool once admitted"""
+        async with self.admit(deadline, wait):
+            loop = asyncio.get_running_loop()
+            submitted_at = time.monotonic()
+            started_at, finished_at, result = await loop.run_in_executor(
+                self._get_executor(), _timed_call, fn, args
+            )
+            queued_for = max(0.0, started_at - submitted_at)
+            self.completed += 1
+            self.total_wait += queued_for
+            self.max_wait = max(self.max_wait, queued_for)
+            self.total_run += finished_at - started_at
+            return result
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth and wait-time counters for /health"""
+        return {
+            "kind": self.kind,
+            "workers": self.workers,
+            "capacity": self.capacity,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "waiting": len(self._slot_waiters),
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "shed": self.shed,
+            "completed": self.completed,
+            "avg_wait_ms": 1000 * self.total_wait / self.completed if self.completed else 0.0,
+            "max_wait_ms": 1000 * self.max_wait,
+            "avg_run_ms": 1000 * self.total_run / self.completed if self.completed else 0.0
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
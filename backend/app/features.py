@@ -0,0 +1,84 @@
+"""
+Shared review feature extraction
+
+Computes the text statistics used by both the fake review detector and the
+helpfulness analyzer in one place, so a review analyzed for both is split,
+counted and pattern-matched once instead of once per analyzer.
+
+Every detector runs in linear time in the length of the text, so a crafted
+review cannot stall a worker with regex backtracking.
+"""
+
+import re
+from typing import Any, Dict
+
+# Fixed width, so each start position costs a bounded number of steps.
+# A non-space character on both sides of an @ is exactly what \S+@\S+ needs.
+EMAIL_PATTERN = re.compile(r'\S@\S')
+PHONE_PATTERN = re.compile(r'(\d{3}[-\.\s]??\d{3}[-\.\s]??\d{4})')
+SENTENCE_END_PATTERN = re.compile(r'[.!?]+')
+WORD_PATTERN = re.compile(r'\w+')
+
+
+def contains_url(text: str) -> bool:
+    """Same answer as re.search(r'http[s]?://', text)"""
+    return "http://" in text or "https://" in text
+
+
+def contains_email(text: str) -> bool:
+    r"""Same answer as re.search(r'\S+@\S+', text), which backtracks
+    quadratically on long runs without whitespace"""
+    return EMAIL_PATTERN.search(text) is not None
+
+
+def contains_phone(text: str) -> bool:
+    return PHONE_PATTERN.search(text) is not None
+
+
+def count_repeated_words(text: str) -> int:
+    r"""Runs of one word three or more times in a row, separated only by
+    whitespace. Same count as re.findall(r'\b(\w+)(\s+\1){2,}\b', text)
+    without the backreference"""
+    count = 0
+    run = 0
+    previous = None
+    previous_end = 0
+    for match in WORD_PATTERN.finditer(text):
+        word = match.group()
+        if word == previous and text[previous_end:match.start()].isspace():
+            run += 1
+        else:
+            if run >= 3:
+                count += 1
+            run = 1
+        previous = word
+        previous_end = match.end()
+    if run >= 3:
+        count += 1
+    return count
+
+
+def extract_review_features(text: str, summary: str = "", rating: int = 5) -> Dict[str, Any]:
+    """All shared text features of a review, each computed once"""
+    text_length = len(text)
+    word_count = len(text.split())
+    uppercase_count = sum(map(str.isupper, text))
+    exclamation_count = text.count('!')
+    question_count = text.count('?')
+    uppercase_ratio = uppercase_count / text_length if text_length else 0
+
+    return {
+        "text_length": text_length,
+        "word_count": word_count,
+        # Pieces left by splitting on runs of terminators, as re.split would
+        "sentence_count": len(SENTENCE_END_PATTERN.findall(text)) + 1,
+        "period_count": text.count('.'),
+        "exclamation_count": exclamation_count,
+        "question_count": question_count,
+        "uppercase_ratio": uppercase_ratio,
+        "has_url": contains_url(text),
+        "has_email": contains_email(text),
+        "has_phone": contains_phone(text),
+        "repeated_phrases": count_repeated_words(text.lower()),
+        "extreme_rating": rating in [1, 5]
+    }
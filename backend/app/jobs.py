@@ -0,0 +1,342 @@
+"""
+Background bulk-analysis jobs
+
+POST /jobs streams an uploaded CSV or JSON-lines file to disk under JOBS_DIR
+and returns as soon as it is stored. A background runner scores queued jobs
+chunk by chunk in worker processes with the offline bulk CLI's scorer,
+committing every chunk as a JSON-lines part file plus a checkpoint, so a
+restarted server or a crashed worker resumes each job from its last committed
+chunk. Runners claim jobs from disk under a per-job file lock, so when several
+server processes share JOBS_DIR each job runs in exactly one of them, and a
+job whose process exits is picked up by another. Results are read back a page
+at a time or streamed part by part.
+"""
+
+import asyncio
+import csv
+import json
+import os
+import re
+import sys
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from app.bulk import CheckpointMismatch, iter_records, load_checkpoint, save_checkpoint, score_chunk, write_part
+from app.workers import _init_worker
+
+try:
+    import fcntl
+except ImportError:
+    # No file locks (Windows): a single server process owns JOBS_DIR
+    fcntl = None
+
+JOB_FILE = "job.json"
+LOCK_FILE = "job.lock"
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+# A job whose worker pool breaks this many times is marked failed
+MAX_ATTEMPTS = 3
+
+_JOB_ID = re.compile(r"[0-9a-f]{32}")
+
+
+class JobNotFound(KeyError):
+    """No job with this id"""
+
+
+class UploadTooLarge(ValueError):
+    """The upload exceeds JOB_MAX_UPLOAD_BYTES"""
+
+
+def count_rows(path: str) -> int:
+    """Records iter_records() will yield, without parsing them"""
+    if path.lower().endswith(".csv"):
+        csv.field_size_limit(sys.maxsize)
+        with open(path, newline="", encoding="utf-8") as f:
+            return max(0, sum(1 for _ in csv.reader(f)) - 1)
+    with open(path, "rb") as f:
+        return sum(1 for line in f if line.strip())
+
+
+class JobManager:
+    """Queues uploaded files and scores them in the background"""
+
+    def __init__(self, jobs_dir: str = "jobs", workers: int = 1, chunk_size: int = 1000,
+                 max_upload_bytes: int = 2 * 1024 ** 3, poll_interval: float = 2.0):
+        # Absolute, since checkpoints record the input file's absolute path
+        self.jobs_dir = os.path.abspath(jobs_dir)
+        self.workers = max(1, workers)
+        self.chunk_size = max(1, chunk_size)
+        self.max_upload_bytes = max_upload_bytes
+        # How often an idle runner looks for jobs queued by other processes
+        self.poll_interval = poll_interval
+        self._wakeup: Optional[asyncio.Event] = None
+        self._runner: Optional[asyncio.Task] = None
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    @classmethod
+    def from_env(cls) -> "JobManager":
+        return cls(
+            jobs_dir=os.getenv("JOBS_DIR", "jobs"),
+            workers=int(os.getenv("JOB_WORKERS", 1)),
+            chunk_size=int(os.getenv("JOB_CHUNK_SIZE", 1000)),
+            max_upload_bytes=int(os.getenv("JOB_MAX_UPLOAD_BYTES", 2 * 1024 ** 3)),
+            poll_interval=float(os.getenv("JOB_POLL_INTERVAL", 2))
+        )
+
+    async def start(self) -> None:
+        """Start the runner; jobs a previous run left unfinished are resumed"""
+        os.makedirs(self.jobs_dir, exist_ok=True)
+        self._wakeup = asyncio.Event()
+        unfinished = self._unfinished()
+        if unfinished:
+            print(f"↩️  Resuming {len(unfinished)} unfinished jobs")
+        self._runner = asyncio.create_task(self._run())
+
+    def shutdown(self) -> None:
+        """Stop the runner; in-flight chunks are redone after a restart"""
+        if self._runner is not None:
+            self._runner.cancel()
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def _job_dir(self, job_id: str) -> str:
+        if not _JOB_ID.fullmatch(job_id or ""):
+            raise JobNotFound(job_id)
+        return os.path.join(self.jobs_dir, job_id)
+
+    def _read_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(os.path.join(self._job_dir(job_id), JOB_FILE)) as f:
+                return json.load(f)
+        except (OSError, ValueError, JobNotFound):
+            return None
+
+    def _write_job(self, job: Dict[str, Any]) -> None:
+        job["updated_at"] = time.time()
+        path = os.path.join(self._job_dir(job["job_id"]), JOB_FILE)
+        with open(path + ".tmp", "w") as f:
+            json.dump(job, f)
+        os.replace(path + ".tmp", path)
+
+    async def create(self, upload, analyses: List[str], model: str) -> Dict[str, Any]:
+        """Stream an upload to disk in fixed-size chunks and queue it"""
+        job_id = uuid.uuid4().hex
+        job_dir = self._job_dir(job_id)
+        os.makedirs(job_dir)
+        filename = upload.filename or "upload.jsonl"
+        input_name = "input.csv" if filename.lower().endswith(".csv") else "input.jsonl"
+
+        size = 0
+        try:
+            with open(os.path.join(job_dir, input_name), "wb") as f:
+                while True:
+                    chunk = await upload.read(UPLOAD_CHUNK_BYTES)
+                    if not chunk:
+                        break
+                    size += len(chunk)
+                    if size > self.max_upload_bytes:
+                        raise UploadTooLarge(f"Upload exceeds {self.max_upload_bytes:,} bytes")
+                    f.write(chunk)
+        except BaseException:
+            # Including a client that disconnects mid-upload
+            for name in os.listdir(job_dir):
+                os.remove(os.path.join(job_dir, name))
+            os.rmdir(job_dir)
+            raise
+
+        job = {
+            "job_id": job_id,
+            "filename": filename,
+            "input": input_name,
+            "bytes": size,
+            "analyses": list(analyses),
+            "model": model,
+            "chunk_size": self.chunk_size,
+            "status": "queued",
+            "total_rows": None,
+            "attempts": 0,
+            "error": None,
+            "created_at": time.time()
+        }
+        self._write_job(job)
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Dict[str, Any]:
+        """Job metadata with committed progress"""
+        job = self._read_job(job_id)
+        if job is None:
+            raise JobNotFound(job_id)
+        checkpoint = self._checkpoint(job)
+        total = job["total_rows"]
+        job.update(
+            rows_done=checkpoint["rows_done"],
+            parts_done=checkpoint["parts_done"],
+            progress=1.0 if job["status"] == "completed" else (
+                checkpoint["rows_done"] / total if total else 0.0
+            )
+        )
+        return job
+
+    def _checkpoint(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        job_dir = self._job_dir(job["job_id"])
+        try:
+            return load_checkpoint(job_dir, os.path.join(job_dir, job["input"]))
+        except CheckpointMismatch:
+            # None of its rows belong to this job, which fails when it runs
+            return {"rows_done": 0, "parts_done": 0}
+
+    def _part_path(self, job_id: str, part: int) -> str:
+        return os.path.join(self._job_dir(job_id), "part-{:05d}.jsonl".format(part))
+
+    def results_page(self, job_id: str, offset: int = 0, limit: int = 100) -> Dict[str, Any]:
+        """Committed result rows [offset, offset + limit), reading only the part files they span"""
+        job = self.get(job_id)
+        chunk_size = job["chunk_size"]
+        rows: List[Dict[str, Any]] = []
+        part = offset // chunk_size
+        skip = offset % chunk_size
+        while len(rows) < limit and part < job["parts_done"]:
+            with open(self._part_path(job_id, part), encoding="utf-8") as f:
+                for line in islice(f, skip, skip + limit - len(rows)):
+                    rows.append(json.loads(line))
+            part += 1
+            skip = 0
+        return {
+            "job_id": job_id,
+            "status": job["status"],
+            "offset": offset,
+            "limit": limit,
+            "total": job["rows_done"],
+            "rows": rows
+        }
+
+    def iter_results(self, job_id: str) -> Iterator[bytes]:
+        """Every committed result row as NDJSON, one part file at a time"""
+        job = self.get(job_id)
+        for part in range(job["parts_done"]):
+            with open(self._part_path(job_id, part), "rb") as f:
+                while True:
+                    block = f.read(UPLOAD_CHUNK_BYTES)
+                    if not block:
+                        break
+                    yield block
+
+    def _unfinished(self) -> List[Dict[str, Any]]:
+        """Queued and interrupted jobs, oldest first"""
+        jobs = [
+            job for job in (self._read_job(name) for name in os.listdir(self.jobs_dir) if _JOB_ID.fullmatch(name))
+            if job is not None and job["status"] in ("queued", "running")
+        ]
+        return sorted(jobs, key=lambda job: job["created_at"])
+
+    def _claim(self) -> Optional[Tuple[Dict[str, Any], Optional[int]]]:
+        """The oldest unfinished job no other process holds, with its lock"""
+        for job in self._unfinished():
+            if fcntl is None:
+                return job, None
+            lock = os.open(os.path.join(self._job_dir(job["job_id"]), LOCK_FILE), os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                # Running in another process; the lock is freed if that process exits
+                os.close(lock)
+                continue
+            # It may have finished between listing and locking
+            job = self._read_job(job["job_id"])
+            if job is not None and job["status"] in ("queued", "running"):
+                return job, lock
+            os.close(lock)
+        return None
+
+    async def _run(self) -> None:
+        while True:
+            self._wakeup.clear()
+            claimed = await asyncio.to_thread(self._claim)
+            if claimed is None:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            job, lock = claimed
+            try:
+                await self._run_job(job)
+            finally:
+                if lock is not None:
+                    os.close(lock)
+
+    async def _run_job(self, job: Dict[str, Any]) -> None:
+        job_id = job["job_id"]
+        try:
+            await self._process(job)
+        except asyncio.CancelledError:
+            raise
+        except BrokenProcessPool as e:
+            # A worker died; start a fresh pool and resume from the last committed chunk
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+            job["attempts"] += 1
+            if job["attempts"] < MAX_ATTEMPTS:
+                print(f"⚠️ Worker pool broke on job {job_id}; resuming it")
+                job["status"] = "queued"
+            else:
+                job.update(status="failed", error=f"Worker processes kept failing: {e}")
+            self._write_job(job)
+        except Exception as e:
+            print(f"❌ Job {job_id} failed: {e}")
+            job.update(status="failed", error=str(e))
+            self._write_job(job)
+
+    async def _process(self, job: Dict[str, Any]) -> None:
+        job_dir = self._job_dir(job["job_id"])
+        input_path = os.path.join(job_dir, job["input"])
+        job["status"] = "running"
+        if job["total_rows"] is None:
+            job["total_rows"] = await asyncio.to_thread(count_rows, input_path)
+        self._write_job(job)
+
+        checkpoint = load_checkpoint(job_dir, input_path)
+        checkpoint.update(chunk_size=job["chunk_size"], format="jsonl", analyses=job["analyses"], model=job["model"])
+        records = iter_records(input_path, skip=checkpoint["rows_done"])
+
+        def next_chunk() -> List[Dict[str, Any]]:
+            return list(islice(records, job["chunk_size"]))
+
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker)
+        loop = asyncio.get_running_loop()
+
+        # Parsing runs off the event loop and at most two chunks per worker are in flight
+        pending = deque()
+        chunk = await asyncio.to_thread(next_chunk)
+        try:
+            while chunk or pending:
+                while chunk and len(pending) < 2 * self.workers:
+                    future = loop.run_in_executor(self._pool, score_chunk, chunk, job["analyses"], job["model"])
+                    pending.append((len(chunk), future))
+                    chunk = await asyncio.to_thread(next_chunk)
+
+                rows, future = pending.popleft()
+                columns = await future
+                await asyncio.to_thread(write_part, job_dir, checkpoint["parts_done"], columns, "jsonl")
+                checkpoint["parts_done"] += 1
+                checkpoint["rows_done"] += rows
+                save_checkpoint(job_dir, checkpoint)
+        finally:
+            for _, future in pending:
+                future.cancel()
+
+        checkpoint["complete"] = True
+        save_checkpoint(job_dir, checkpoint)
+        job["status"] = "completed"
+        self._write_job(job)
+        print(f"✅ Job {job['job_id']} done: {checkpoint['rows_done']:,} rows")
@@ -0,0 +1,339 @@
+"""
+Precompiled lexicon artifact
+
+The word lists behind the VADER and polarity scorers (VADER's lexicon, emoji
+descriptions, booster, negation and special-case tables, and the averaged
+pattern.en polarity lexicon) are compiled into one binary file of
+open-addressing hash tables: fixed-size records of a UTF-8 key and its packed
+value, with empty slots filled with 0xFF, which never starts a UTF-8 key. A
+process maps the file read-only and looks a word up with a CRC32 and a slice
+comparison, so nothing is parsed and no dict is built. Every process mapping the
+file shares the same page-cache pages, pre-forked workers and replicas on one
+host alike.
+
+The artifact records the vaderSentiment and textblob versions it was built
+from; a stale or missing file is reported and the scorers parse the package
+data files instead.
+
+Usage:
+    python -m app.lexicons build lexicons.bin
+    python -m app.lexicons info lexicons.bin
+"""
+
+import argparse
+import json
+import mmap
+import os
+import struct
+import time
+from collections.abc import Mapping
+from functools import lru_cache, partial
+from importlib import metadata
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from zlib import crc32
+
+from app.registry import registry
+
+ARTIFACT_VERSION = 1
+# Words remembered per table and process; past a few hundred the cache adds
+# dirty memory (misses are cached too) without measurably faster scoring
+DEFAULT_CACHE_SIZE = 256
+
+_MAGIC = b"LEXICONS"
+_HEADER = struct.Struct("<8sI")
+_EMPTY = 0xFF
+_MISSING = object()
+
+# Packed value after each key: polarity is (polarity, subjectivity, intensity,
+# is_modifier), text is an offset and length in the table's string block
+_VALUE_FORMATS = {"float": "<d", "polarity": "<ddd?", "text": "<II", "flag": "<"}
+
+
+def source_versions() -> Dict[str, Optional[str]]:
+    """Installed versions of the packages the tables are compiled from"""
+    versions = {}
+    for package in ("vaderSentiment", "textblob"):
+        try:
+            versions[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            versions[package] = None
+    return versions
+
+
+class LexiconTable(Mapping):
+    """One read-only word table inside the mapped artifact
+
+    Keys are grouped by UTF-8 length, one hash table per length, so a probe
+    is a plain slice comparison and the value is only unpacked on a hit. With
+    cache_size, the most recently looked-up words are remembered per process,
+    which keeps scoring close to dict speed on a Zipfian review vocabulary.
+    """
+
+    def __init__(self, buffer, kind: str, count: int, groups: Dict[str, List[int]],
+                 strings: Optional[int] = None, cache_size: int = 0):
+        self.kind = kind
+        self._buffer = buffer
+        self._count = count
+        value_format = struct.Struct(_VALUE_FORMATS[kind])
+        self._groups = {
+            int(length): (offset, slots, int(length) + value_format.size)
+            for length, (offset, slots) in groups.items()
+        }
+
+        if kind == "float":
+            unpack_float = value_format.unpack_from
+            value = lambda position: unpack_float(buffer, position)[0]  # noqa: E731
+        elif kind == "polarity":
+            value = partial(value_format.unpack_from, buffer)
+        elif kind == "text":
+            unpack_text = value_format.unpack_from
+
+            def value(position):
+                start, length = unpack_text(buffer, position)
+                return buffer[strings + start:strings + start + length].decode()
+        else:
+            value = lambda position: True  # noqa: E731
+        self._value = value
+
+        # By length, (offset, slot mask, record size); a closure keeps the
+        # per-word path free of attribute lookups
+        by_length = [None] * (max(self._groups, default=0) + 1)
+        for length, (offset, slots, size) in self._groups.items():
+            by_length[length] = (offset, slots - 1, size)
+        longest = len(by_length) - 1
+
+        def get(word: str, default: Any = None) -> Any:
+            key = word.encode("utf-8", "surrogatepass")
+            length = len(key)
+            group = by_length[length] if length <= longest else None
+            if group is None:
+                return default
+            offset, mask, size = group
+            slot = crc32(key) & mask
+            while True:
+                start = offset + slot * size
+                stored = buffer[start:start + length]
+                if stored == key:
+                    return value(start + length)
+                if stored[0] == _EMPTY:
+                    return default
+                slot = (slot + 1) & mask
+
+        self.get = lru_cache(maxsize=cache_size)(get) if cache_size > 0 else get
+
+    def __contains__(self, word) -> bool:
+        return isinstance(word, str) and self.get(word, _MISSING) is not _MISSING
+
+    def __getitem__(self, word: str) -> Any:
+        value = self.get(word, _MISSING)
+        if value is _MISSING:
+            raise KeyError(word)
+        return value
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[str]:
+        for key, _ in self._records():
+            yield key
+
+    def items(self) -> Iterator[Tuple[str, Any]]:
+        for key, position in self._records():
+            yield key, self._value(position)
+
+    def _records(self) -> Iterator[Tuple[str, int]]:
+        buffer = self._buffer
+        for length, (offset, slots, size) in sorted(self._groups.items()):
+            for start in range(offset, offset + slots * size, size):
+                if buffer[start] != _EMPTY:
+                    yield buffer[start:start + length].decode(), start + length
+
+
+def _pack_table(kind: str, entries: Dict[str, Any], offset: int) -> Tuple[bytes, Dict[str, Any]]:
+    """Lay out one hash table per key length, at most a quarter full, plus a string block for text values"""
+    value_format = struct.Struct(_VALUE_FORMATS[kind])
+    by_length: Dict[int, Dict[bytes, Any]] = {}
+    for word, value in entries.items():
+        key = word.encode()
+        if key:
+            by_length.setdefault(len(key), {})[key] = value
+
+    data, strings, groups = bytearray(), bytearray(), {}
+    for length, keyed in sorted(by_length.items()):
+        slots = 4
+        while slots < 4 * len(keyed):
+            slots *= 2
+        size = length + value_format.size
+        table = bytearray(b"\xff" * (slots * size))
+        for key, value in keyed.items():
+            if kind == "float":
+                values = (value,)
+            elif kind == "polarity":
+                values = tuple(value)
+            elif kind == "text":
+                encoded = value.encode()
+                values = (len(strings), len(encoded))
+                strings += encoded
+            else:
+                values = ()
+            slot = crc32(key) & (slots - 1)
+            while table[slot * size] != _EMPTY:
+                slot = (slot + 1) & (slots - 1)
+            table[slot * size:slot * size + length] = key
+            value_format.pack_into(table, slot * size + length, *values)
+        groups[length] = [offset + len(data), slots]
+        data += table
+
+    meta = {"kind": kind, "count": len(entries), "groups": groups}
+    if kind == "text":
+        meta["strings"] = offset + len(data)
+    return bytes(data + strings), meta
+
+
+def compile_tables() -> Dict[str, Tuple[str, Dict[str, Any]]]:
+    """Every table the scorers read, parsed from the installed packages"""
+    from vaderSentiment import vaderSentiment as _vader
+
+    from app import polarity, vader_engine
+
+    tables = {
+        "vader_lexicon": ("float", vader_engine._load_lexicon(
+            os.path.join(vader_engine.VADER_DATA_DIR, "vader_lexicon.txt")
+        )),
+        "vader_emojis": ("text", vader_engine._load_emojis(
+            os.path.join(vader_engine.VADER_DATA_DIR, "emoji_utf8_lexicon.txt")
+        )),
+        "vader_boosters": ("float", dict(_vader.BOOSTER_DICT)),
+        "vader_negations": ("flag", dict.fromkeys(_vader.NEGATE, True)),
+        "vader_special_cases": ("float", dict(_vader.SPECIAL_CASES))
+    }
+    if polarity.TEXTBLOB_DATA_DIR is not None:
+        tables["pattern_lexicon"] = ("polarity", polarity._load_lexicon(
+            os.path.join(polarity.TEXTBLOB_DATA_DIR, "en-sentiment.xml")
+        ))
+    return tables
+
+
+def _relocate(meta: Dict[str, Any], start: int) -> Dict[str, Any]:
+    meta = dict(meta, groups={length: [offset + start, slots] for length, (offset, slots) in meta["groups"].items()})
+    if "strings" in meta:
+        meta["strings"] += start
+    return meta
+
+
+def build(path: str) -> Dict[str, Any]:
+    """Compile every table into the artifact at path, returning its directory"""
+    tables = compile_tables()
+    # Table offsets depend on the directory's size, so lay the tables out
+    # relative to the data section first and relocate them once it fits
+    blocks, directory = [], {"version": ARTIFACT_VERSION, "sources": source_versions(), "tables": {}}
+    size = 0
+    for name, (kind, entries) in tables.items():
+        block, meta = _pack_table(kind, entries, size)
+        blocks.append(block)
+        directory["tables"][name] = meta
+        size += len(block)
+
+    relative = directory["tables"]
+    start = _HEADER.size
+    while True:
+        directory["tables"] = {name: _relocate(meta, start) for name, meta in relative.items()}
+        encoded = json.dumps(directory).encode()
+        if _HEADER.size + len(encoded) <= start:
+            break
+        start = _HEADER.size + len(encoded)
+    header = _HEADER.pack(_MAGIC, start - _HEADER.size) + encoded.ljust(start - _HEADER.size, b" ")
+
+    # Replace atomically so processes that already mapped the old file keep it intact
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        for block in blocks:
+            f.write(block)
+    os.replace(tmp_path, path)
+    return directory
+
+
+class LexiconArtifact:
+    """A compiled lexicon file mapped read-only"""
+
+    def __init__(self, path: str, cache_size: int = 0):
+        self.path = path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, length = _HEADER.unpack_from(self._map, 0) if len(self._map) >= _HEADER.size else (b"", 0)
+        if magic != _MAGIC:
+            raise ValueError(f"{path} is not a lexicon artifact")
+        directory = json.loads(self._map[_HEADER.size:_HEADER.size + length])
+        if directory["version"] != ARTIFACT_VERSION:
+            raise ValueError(f"{path} has artifact version {directory['version']}, expected {ARTIFACT_VERSION}")
+        self.sources = directory["sources"]
+        self.tables = {
+            name: LexiconTable(self._map, cache_size=cache_size, **meta)
+            for name, meta in directory["tables"].items()
+        }
+
+    def __getitem__(self, name: str) -> LexiconTable:
+        return self.tables[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.tables
+
+    @property
+    def size(self) -> int:
+        return len(self._map)
+
+    def is_current(self) -> bool:
+        """Whether it was built from the installed package versions"""
+        return self.sources == source_versions()
+
+
+def load_from_env() -> Optional[LexiconArtifact]:
+    """Map LEXICON_PATH, or None to have the scorers parse the package data files"""
+    path = os.getenv("LEXICON_PATH")
+    if not path:
+        return None
+    hint = f"parsing lexicon files instead (build it with: python -m app.lexicons build {path})"
+    if not os.path.exists(path):
+        print(f"⚠️  Lexicon artifact {path} not found; {hint}")
+        return None
+    try:
+        artifact = LexiconArtifact(path, cache_size=int(os.getenv("LEXICON_CACHE_SIZE", DEFAULT_CACHE_SIZE)))
+    except (OSError, ValueError) as e:
+        print(f"⚠️  Could not map lexicon artifact: {e}; {hint}")
+        return None
+    if not artifact.is_current():
+        print(f"⚠️  Lexicon artifact {path} was built from {artifact.sources}, "
+              f"installed {source_versions()}; {hint}")
+        return None
+    print(f"✅ Mapped lexicon artifact {path} ({artifact.size / 1e6:.1f} MB)")
+    return artifact
+
+
+registry.register("lexicons", load_from_env)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Build or inspect the precompiled lexicon artifact")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build_command = commands.add_parser("build", help="Compile the VADER and polarity word lists")
+    build_command.add_argument("artifact", help="Output file, e.g. lexicons.bin")
+    info = commands.add_parser("info", help="List the tables in an artifact")
+    info.add_argument("artifact", help="Artifact file")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        started_at = time.perf_counter()
+        directory = build(args.artifact)
+        print(f"✅ Compiled {len(directory['tables'])} tables into {args.artifact} "
+              f"({os.path.getsize(args.artifact) / 1e6:.1f} MB) in {time.perf_counter() - started_at:.2f}s")
+    else:
+        artifact = LexiconArtifact(args.artifact)
+        status = "current" if artifact.is_current() else f"stale, installed {source_versions()}"
+        print(f"📦 {args.artifact}: built from {artifact.sources} ({status})")
+        for name, table in artifact.tables.items():
+            print(f"   {name}: {len(table):,} {table.kind} entries")
+
+
+if __name__ == "__main__":
+    main()
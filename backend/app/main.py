@@ -3,18 +3,35 @@ AI Sentiment Analysis API
 FastAPI backend for Amazon Electronics Reviews sentiment analysis, fake review detection, and helpfulness analysis
 """
 
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+import time
+IMPORT_STARTED_AT = time.perf_counter()
+
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Request, UploadFile, File, Form, Query, Depends, Header
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from starlette.requests import ClientDisconnect
 from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any
 import uvicorn
+import asyncio
 import os
 from dotenv import load_dotenv
 
+# Load environment variables before the app modules, some of which read them at import
+load_dotenv()
+
 # Import our services
 from app.models import ModelManager
+from app.jobs import JobManager, JobNotFound, UploadTooLarge
+from app.serialization import project, columnar, negotiate, encode
+from app.executor import OverloadedError
+from app.deadlines import Deadline, DeadlineExceeded, cancel_on_disconnect
+from app.server import process_memory
+from app.metrics import metrics, RequestTimer, observe_stages, stage_timer
+from app.streaming import NDJSONStreamingResponse, iter_review_batches, encode_line
 from app.schemas import (
+    ModelEnum,
+    ResponseShapeEnum,
     SentimentRequest,
     SentimentResponse,
     BatchAnalysisRequest,
@@ -22,13 +39,16 @@ from app.schemas import (
     FakeDetectionResponse,
     HelpfulnessRequest,
     HelpfulnessResponse,
+    FullAnalysisRequest,
+    FullAnalysisResponse,
+    ComparisonRequest,
+    ModelComparison,
     ModelInfoResponse,
-    HealthResponse
+    HealthResponse,
+    JobResponse,
+    JobResultsPage
 )
 
-# Load environment variables
-load_dotenv()
-
 # Initialize FastAPI app
 app = FastAPI(
     title="AI Sentiment Analysis API",
@@ -47,18 +67,78 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Time every request for the /metrics latency histograms
+app.add_middleware(RequestTimer)
+
+STREAM_ANALYSES = ("sentiment", "fake", "helpfulness")
+STREAM_CHUNK_SIZE = int(os.getenv("STREAM_CHUNK_SIZE", 32))
+# Longest any analysis request may take (0 = no limit); clients can ask for less
+REQUEST_TIMEOUT = float(os.getenv("REQUEST_TIMEOUT", 30))
+
 # Initialize model manager (lazy loading)
 model_manager = ModelManager()
 
-@app.on_event("startup")
-async def startup_event():
-    """Initialize models on startup"""
+# Background bulk-analysis jobs for uploaded files
+job_manager = JobManager.from_env()
+
+def parse_analyses(analyses: str) -> List[str]:
+    """Validate a comma-separated subset of sentiment,fake,helpfulness"""
+    requested = [name.strip() for name in analyses.split(",") if name.strip()]
+    unknown = [name for name in requested if name not in STREAM_ANALYSES]
+    if not requested or unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"analyses must be a comma-separated subset of {', '.join(STREAM_ANALYSES)}"
+        )
+    return requested
+
+def request_deadline(
+    http_request: Request,
+    x_request_deadline: Optional[str] = Header(
+        None, description="Seconds the client will wait for an answer, at most REQUEST_TIMEOUT"
+    )
+) -> Deadline:
+    """The request's deadline, counted from when it arrived"""
+    try:
+        return Deadline.from_header(
+            x_request_deadline, REQUEST_TIMEOUT, elapsed=time.perf_counter() - http_request.state.started_at
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="X-Request-Deadline must be a positive number of seconds")
+
+def observe_validation(http_request: Request, endpoint: str, model: str):
+    """Record time spent parsing and validating the request body"""
+    observe_stages(endpoint, model, {
+        "validation": time.perf_counter() - http_request.state.started_at
+    })
+
+async def initialize_models():
+    """Load and warm up models, then print the startup-time report"""
     try:
         await model_manager.initialize()
+        report = model_manager.startup_report
         print("🚀 All models loaded successfully!")
+        print(f"⏱️  App import: {IMPORT_SECONDS:.3f}s")
+        for name, seconds in report["models"].items():
+            print(f"⏱️  {name} load: {seconds:.3f}s")
+        if report["warmup_seconds"] is not None:
+            print(f"⏱️  Warm-up: {report['warmup_seconds']:.3f}s")
     except Exception as e:
         print(f"❌ Error initializing models: {e}")
 
+@app.on_event("startup")
+async def startup_event():
+    """Initialize models in the background so liveness checks answer immediately"""
+    app.state.initialization = asyncio.create_task(initialize_models())
+    await job_manager.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop batch and job worker processes"""
+    app.state.initialization.cancel()
+    job_manager.shutdown()
+    model_manager.shutdown()
+
 @app.get("/", tags=["Root"])
 async def root():
     """Root endpoint"""
@@ -66,18 +146,24 @@ async def root():
         "message": "AI Sentiment Analysis API",
         "version": "1.0.0",
         "docs": "/docs",
-        "health": "/health"
+        "health": "/health",
+        "ready": "/ready"
     }
 
 @app.get("/health", response_model=HealthResponse, tags=["Health"])
 async def health_check():
-    """Check API health and model status"""
+    """Liveness: the API is up, whether or not models have finished loading"""
     try:
         model_status = await model_manager.get_model_status()
+        cache_stats = await model_manager.get_cache_stats()
+        executor_stats = await model_manager.get_executor_stats()
         return HealthResponse(
             status="healthy",
             models=model_status,
-            uptime="running"
+            uptime="running",
+            ready=model_manager.ready,
+            cache=cache_stats,
+            executor=executor_stats
         )
     except Exception as e:
         return HealthResponse(
@@ -86,13 +172,45 @@ async def health_check():
             uptime=f"error: {str(e)}"
         )
 
+@app.get("/ready", tags=["Health"])
+async def readiness_check():
+    """Readiness: 200 once models are loaded and warmed up, 503 until then"""
+    readiness = await model_manager.get_readiness()
+    readiness["startup"] = {"import_seconds": IMPORT_SECONDS, **readiness["startup"]}
+    return JSONResponse(status_code=200 if readiness["ready"] else 503, content=readiness)
+
+@app.get("/metrics", response_class=PlainTextResponse, tags=["Health"])
+async def prometheus_metrics():
+    """Latency histograms and queue gauges in Prometheus text format"""
+    cache_stats = await model_manager.get_cache_stats()
+    executor_stats = await model_manager.get_executor_stats()
+    gauges = {
+        "result_cache_entries": ("Entries in the result cache", cache_stats["entries"]),
+        "result_cache_bytes": ("Approximate bytes held by the result cache", cache_stats["bytes"]),
+        "result_cache_hit_ratio": ("Share of lookups served from cache", cache_stats["hit_rate"]),
+        "inference_in_flight": ("Admitted inference requests", executor_stats["in_flight"]),
+        "inference_queue_depth": ("Inference requests waiting for a worker", executor_stats["queued"]),
+        "inference_rejected": ("Inference requests rejected as overloaded", executor_stats["rejected"]),
+        "inference_shed": ("Inference requests rejected because their deadline would pass in the queue", executor_stats["shed"])
+    }
+    # Per process: under the pre-fork server each worker reports its own
+    memory = process_memory(os.getpid())
+    if "rss" in memory:
+        gauges["process_resident_memory_bytes"] = ("Resident memory of this worker process", memory["rss"])
+    if "private" in memory:
+        gauges["process_private_memory_bytes"] = ("Memory not shared with other worker processes", memory["private"])
+    return PlainTextResponse(
+        metrics.render(gauges),
+        media_type="text/plain; version=0.0.4"
+    )
+
 @app.get("/models", response_model=ModelInfoResponse, tags=["Models"])
 async def get_model_info():
     """Get information about available models"""
     return await model_manager.get_model_info()
 
 @app.post("/predict/sentiment", response_model=SentimentResponse, tags=["Sentiment Analysis"])
-async def predict_sentiment(request: SentimentRequest):
+async def predict_sentiment(request: SentimentRequest, http_request: Request, deadline: Deadline = Depends(request_deadline)):
     """
     Predict sentiment for a single review
 
@@ -100,6 +218,7 @@ async def predict_sentiment(request: SentimentRequest):
     - vader: Fast rule-based sentiment analysis
     - roberta: Advanced transformer model (recommended)
     """
+    observe_validation(http_request, "/predict/sentiment", request.model)
     try:
         if request.model not in ["vader", "roberta"]:
             raise HTTPException(
@@ -109,21 +228,39 @@ async def predict_sentiment(request: SentimentRequest):
 
         result = await model_manager.predict_sentiment(
             text=request.text,
-            model=request.model
+            model=request.model,
+            deadline=deadline
         )
 
-        return SentimentResponse(**result)
+        with stage_timer("/predict/sentiment", request.model, "serialization"):
+            response = encode(project(SentimentResponse, result))
+        return response
 
+    except (OverloadedError, DeadlineExceeded):
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/predict/batch", tags=["Sentiment Analysis"])
-async def batch_sentiment_analysis(request: BatchAnalysisRequest):
+async def batch_sentiment_analysis(
+    request: BatchAnalysisRequest,
+    http_request: Request,
+    shape: ResponseShapeEnum = ResponseShapeEnum.ROWS,
+    deadline: Deadline = Depends(request_deadline)
+):
     """
     Analyze multiple reviews in batch
 
-    Best for processing multiple reviews efficiently
+    Best for processing multiple reviews efficiently. With shape=columnar the
+    results come back as one array per field; send
+    Accept: application/msgpack for a MessagePack body. Texts not reached
+    before the deadline (or a client disconnect) are returned with
+    skipped=true and the response is marked partial.
     """
+    observe_validation(http_request, "/predict/batch", request.model)
+    media_type = negotiate(http_request.headers.get("accept"))
+    if media_type is None:
+        raise HTTPException(status_code=406, detail="Responses are available as application/json or application/msgpack")
     try:
         if request.model not in ["vader", "roberta"]:
             raise HTTPException(
@@ -131,55 +268,134 @@ async def batch_sentiment_analysis(request: BatchAnalysisRequest):
                 detail="Model must be 'vader' or 'roberta'"
             )
 
-        results = await model_manager.batch_sentiment_analysis(
-            texts=request.texts,
-            model=request.model
-        )
-
-        return {
-            "model": request.model,
-            "total_analyzed": len(request.texts),
-            "results": results
-        }
-
+        async with cancel_on_disconnect(http_request, deadline):
+            results = await model_manager.batch_sentiment_analysis(
+                texts=request.texts,
+                model=request.model,
+                deadline=deadline
+            )
+        skipped = sum(1 for result in results if result.get("skipped"))
+
+        with stage_timer("/predict/batch", request.model, "serialization"):
+            content = {
+                "model": request.model.value,
+                "total_analyzed": len(request.texts) - skipped,
+                "partial": skipped > 0
+            }
+            if shape == ResponseShapeEnum.COLUMNAR:
+                content.update(shape="columnar", columns=columnar(results))
+            else:
+                content["results"] = results
+            response = encode(content, media_type)
+        return response
+
+    except (OverloadedError, DeadlineExceeded):
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/predict/stream", tags=["Sentiment Analysis"])
+async def stream_analysis(
+    http_request: Request,
+    model: ModelEnum = ModelEnum.ROBERTA,
+    analyses: str = "sentiment,fake,helpfulness"
+):
+    """
+    Analyze an unbounded stream of reviews
+
+    Send newline-delimited JSON reviews ({"text", "summary", "rating",
+    "helpful_votes", "total_votes", "id"}) in the request body. Results are
+    streamed back as NDJSON, one line per review, as soon as each chunk is scored.
+    """
+    requested = parse_analyses(analyses)
+
+    async def body():
+        batches = iter_review_batches(http_request.stream(), max_batch=STREAM_CHUNK_SIZE)
+        try:
+            async for results in model_manager.analyze_stream(batches, model, requested):
+                yield b"".join(encode_line(result) for result in results)
+        except ClientDisconnect:
+            return
+
+    return NDJSONStreamingResponse(body())
+
 @app.post("/detect/fake", response_model=FakeDetectionResponse, tags=["Fake Review Detection"])
-async def detect_fake_review(request: FakeDetectionRequest):
+async def detect_fake_review(request: FakeDetectionRequest, http_request: Request, deadline: Deadline = Depends(request_deadline)):
     """
     Detect if a review might be fake or suspicious
 
     Returns risk level and suspicious patterns
     """
+    observe_validation(http_request, "/detect/fake", "fake_detector")
     try:
         result = await model_manager.detect_fake_review(
             text=request.text,
             summary=request.summary,
-            rating=request.rating
+            rating=request.rating,
+            reviewer_id=request.reviewer_id,
+            product_id=request.product_id,
+            deadline=deadline
         )
 
-        return FakeDetectionResponse(**result)
+        with stage_timer("/detect/fake", "fake_detector", "serialization"):
+            response = encode(project(FakeDetectionResponse, result))
+        return response
 
+    except (OverloadedError, DeadlineExceeded):
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/analyze/helpfulness", response_model=HelpfulnessResponse, tags=["Helpfulness Analysis"])
-async def analyze_helpfulness(request: HelpfulnessRequest):
+async def analyze_helpfulness(request: HelpfulnessRequest, http_request: Request, deadline: Deadline = Depends(request_deadline)):
     """
     Analyze review helpfulness and quality
 
     Predicts how helpful a review might be to other users
     """
+    observe_validation(http_request, "/analyze/helpfulness", "helpfulness")
     try:
         result = await model_manager.analyze_helpfulness(
             text=request.text,
             helpful_votes=request.helpful_votes,
-            total_votes=request.total_votes
+            total_votes=request.total_votes,
+            deadline=deadline
         )
 
-        return HelpfulnessResponse(**result)
+        with stage_timer("/analyze/helpfulness", "helpfulness", "serialization"):
+            response = encode(project(HelpfulnessResponse, result))
+        return response
 
+    except (OverloadedError, DeadlineExceeded):
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/analyze/full", response_model=FullAnalysisResponse, tags=["Full Analysis"])
+async def analyze_full(request: FullAnalysisRequest, http_request: Request, deadline: Deadline = Depends(request_deadline)):
+    """
+    Run sentiment, fake review and helpfulness analysis in one call
+
+    Text features shared by the analyzers are extracted once per review
+    """
+    observe_validation(http_request, "/analyze/full", request.model)
+    try:
+        result = await model_manager.analyze_full(
+            text=request.text,
+            summary=request.summary,
+            rating=request.rating,
+            helpful_votes=request.helpful_votes,
+            total_votes=request.total_votes,
+            model=request.model,
+            deadline=deadline
+        )
+
+        with stage_timer("/analyze/full", request.model, "serialization"):
+            response = encode(project(FullAnalysisResponse, result))
+        return response
+
+    except (OverloadedError, DeadlineExceeded):
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -192,20 +408,97 @@ async def get_statistics():
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/compare", tags=["Comparison"])
-async def compare_models(text: str):
+@app.post("/compare", response_model=ModelComparison, tags=["Comparison"])
+async def compare_models(request: ComparisonRequest, http_request: Request, deadline: Deadline = Depends(request_deadline)):
     """
     Compare all models on the same text
 
-    Shows predictions from VADER and RoBERTa side by side
+    Shows predictions from VADER and RoBERTa side by side. Models run
+    concurrently; one that exceeds the timeout is listed in errors instead
+    of holding up the response.
     """
+    observe_validation(http_request, "/compare", "all")
     try:
-        comparison = await model_manager.compare_models(text)
+        comparison = await model_manager.compare_models(
+            text=request.text,
+            models=[model.value for model in request.models] if request.models else None,
+            timeout=request.timeout,
+            deadline=deadline
+        )
         return comparison
+    except (OverloadedError, DeadlineExceeded):
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/jobs", response_model=JobResponse, status_code=202, tags=["Jobs"])
+async def create_job(
+    file: UploadFile = File(..., description="CSV or JSON-lines reviews (e.g. Electronics_5.json)"),
+    model: ModelEnum = Form(ModelEnum.VADER),
+    analyses: str = Form("sentiment,fake,helpfulness")
+):
+    """
+    Queue a file of reviews for background analysis
+
+    The upload is written to disk as it arrives and the job is scored in
+    chunks by worker processes; poll GET /jobs/{job_id} for progress.
+    """
+    requested = parse_analyses(analyses)
+    try:
+        return await job_manager.create(file, requested, model.value)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/jobs/{job_id}", response_model=JobResponse, tags=["Jobs"])
+async def get_job(job_id: str):
+    """Job status and committed progress"""
+    try:
+        return job_manager.get(job_id)
+    except JobNotFound:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+@app.get("/jobs/{job_id}/results", response_model=JobResultsPage, tags=["Jobs"])
+async def get_job_results(job_id: str, offset: int = Query(0, ge=0), limit: int = Query(100, ge=1, le=1000)):
+    """One page of result rows, available as soon as their chunk is committed"""
+    try:
+        return await asyncio.to_thread(job_manager.results_page, job_id, offset, limit)
+    except JobNotFound:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+@app.get("/jobs/{job_id}/download", tags=["Jobs"])
+async def download_job_results(job_id: str):
+    """Stream every committed result row as NDJSON"""
+    try:
+        job_manager.get(job_id)
+    except JobNotFound:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return StreamingResponse(
+        job_manager.iter_results(job_id),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{job_id}.jsonl"'}
+    )
+
+# Time from the first app import to all routes being registered
+IMPORT_SECONDS = time.perf_counter() - IMPORT_STARTED_AT
+
 # Exception handlers
+@app.exception_handler(OverloadedError)
+async def overloaded_exception_handler(request, exc):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
+@app.exception_handler(DeadlineExceeded)
+async def deadline_exception_handler(request, exc):
+    return JSONResponse(
+        status_code=504,
+        content={"detail": str(exc)}
+    )
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
     return JSONResponse(
@@ -214,9 +507,10 @@ async def global_exception_handler(request, exc):
     )
 
 if __name__ == "__main__":
+    # Development server; production runs `python -m app.server`
     uvicorn.run(
-        "main:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=True
+        "app.main:app",
+        host=os.getenv("API_HOST", "0.0.0.0"),
+        port=int(os.getenv("API_PORT", 8000)),
+        reload=os.getenv("API_DEBUG", "false").lower() == "true"
     )
\ No newline at end of file
@@ -0,0 +1,250 @@
+"""
+Latency metrics and Prometheus text exposition
+
+Histograms of request and per-stage latency, rendered in the Prometheus
+text format by the /metrics endpoint. Under the pre-fork server each worker
+saves its histograms to a shard and renders them summed with the other
+workers' shards, so a scrape sees the whole server whichever worker answers.
+"""
+
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from app.shards import gather, mark_merged, new_shard_id, read_state, write_state
+
+METRICS_VERSION = 1
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(zip(names, values))
+    if extra is not None:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    escaped = (
+        '{}="{}"'.format(name, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in pairs
+    )
+    return "{" + ",".join(escaped) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+class Histogram:
+    """Cumulative-bucket histogram with a fixed label set"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str],
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # bucket counts, then sum and count
+                series = self._series[key] = [0.0] * (len(self.buckets) + 2)
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[index] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+
+    def series(self) -> Dict[Tuple[str, ...], List[float]]:
+        """A copy of every labeled series: bucket counts, then sum and count"""
+        with self._lock:
+            return {key: list(series) for key, series in self._series.items()}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+    def render(self, snapshot: Optional[Dict[Tuple[str, ...], List[float]]] = None) -> Iterable[str]:
+        yield "# HELP {} {}".format(self.name, self.documentation)
+        yield "# TYPE {} histogram".format(self.name)
+        snapshot = self.series() if snapshot is None else snapshot
+        for key, series in sorted(snapshot.items()):
+            cumulative = 0.0
+            for index, bound in enumerate(self.buckets):
+                cumulative += series[index]
+                labels = _format_labels(self.labelnames, key, ("le", _format_value(bound)))
+                yield "{}_bucket{} {}".format(self.name, labels, int(cumulative))
+            labels = _format_labels(self.labelnames, key)
+            yield "{}_sum{} {}".format(self.name, labels, _format_value(series[-2]))
+            yield "{}_count{} {}".format(self.name, labels, int(series[-1]))
+
+
+def combine_metrics(state: Dict[str, Any], other: Dict[str, Any]) -> Dict[str, Any]:
+    """Two saved histogram states summed series by series"""
+    histograms = {name: {tuple(key): list(series) for key, series in entries}
+                  for name, entries in state["histograms"].items()}
+    for name, entries in other["histograms"].items():
+        combined = histograms.setdefault(name, {})
+        for key, series in entries:
+            current = combined.setdefault(tuple(key), [0.0] * len(series))
+            if len(current) == len(series):
+                combined[tuple(key)] = [a + b for a, b in zip(current, series)]
+    return {
+        **state,
+        "histograms": {name: [[list(key), series] for key, series in sorted(entries.items())]
+                       for name, entries in histograms.items()}
+    }
+
+
+def merge_shard(main_path: str, path: str) -> bool:
+    """Fold a replaced worker's shard into the main metrics file"""
+    shard = read_state(path)
+    if shard is None or shard.get("version") != METRICS_VERSION:
+        return False
+    main = read_state(main_path)
+    if main is None or main.get("version") != METRICS_VERSION:
+        main = {"version": METRICS_VERSION, "histograms": {}}
+    combined = combine_metrics(main, shard)
+    combined.pop("shard_id", None)
+    mark_merged(combined, shard)
+    write_state(main_path, combined)
+    os.remove(path)
+    return True
+
+
+class MetricsRegistry:
+    """Holds histograms and renders them for scraping"""
+
+    def __init__(self):
+        self._histograms: Dict[str, Histogram] = {}
+        self.shard_path: Optional[str] = None
+        self._main_path: Optional[str] = None
+        self._shard_id: Optional[str] = None
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str],
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        if name not in self._histograms:
+            self._histograms[name] = Histogram(name, documentation, labelnames, buckets)
+        return self._histograms[name]
+
+    def _state(self) -> Dict[str, Any]:
+        return {
+            "version": METRICS_VERSION,
+            "histograms": {name: [[list(key), series] for key, series in sorted(histogram.series().items())]
+                           for name, histogram in self._histograms.items()}
+        }
+
+    def start_shard(self, path: str, main_path: str) -> None:
+        """Save to path from now on, and render summed with the other shards of main_path"""
+        # Anything recorded before the fork belongs to the master, not this worker
+        for histogram in self._histograms.values():
+            histogram.clear()
+        self.shard_path = path
+        self._main_path = main_path
+        self._shard_id = new_shard_id()
+
+    def save(self) -> None:
+        """Write this worker's histograms to its shard; nothing when not sharded"""
+        if self.shard_path:
+            write_state(self.shard_path, {**self._state(), "shard_id": self._shard_id})
+
+    def _combined_series(self) -> Dict[str, Dict[Tuple[str, ...], List[float]]]:
+        state = self._state()
+        if self.shard_path:
+            main, others = gather(self._main_path, self.shard_path)
+            for other in [main] + others:
+                if other is not None and other.get("version") == METRICS_VERSION:
+                    state = combine_metrics(state, other)
+        return {name: {tuple(key): series for key, series in entries}
+                for name, entries in state["histograms"].items()}
+
+    def render(self, gauges: Optional[Dict[str, Tuple[str, float]]] = None) -> str:
+        """Prometheus text format, with optional point-in-time gauges"""
+        lines = []
+        combined = self._combined_series()
+        for name, histogram in self._histograms.items():
+            lines.extend(histogram.render(combined.get(name, {})))
+        for name, (documentation, value) in (gauges or {}).items():
+            lines.append("# HELP {} {}".format(name, documentation))
+            lines.append("# TYPE {} gauge".format(name))
+            lines.append("{} {}".format(name, _format_value(value)))
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+REQUEST_SECONDS = metrics.histogram(
+    "http_request_duration_seconds",
+    "End-to-end HTTP request latency",
+    ["endpoint", "method", "status"]
+)
+
+STAGE_SECONDS = metrics.histogram(
+    "analysis_stage_duration_seconds",
+    "Latency of each analysis stage: validation, feature_extraction, inference, serialization",
+    ["endpoint", "model", "stage"]
+)
+
+
+def observe_stages(endpoint: str, model: str, timings: Dict[str, float]) -> None:
+    """Record a {stage: seconds} mapping for one analyzed item"""
+    model = getattr(model, "value", model)
+    for stage, seconds in timings.items():
+        STAGE_SECONDS.observe(seconds, endpoint=endpoint, model=model, stage=stage)
+
+
+@contextmanager
+def stage_timer(endpoint: str, model: str, stage: str):
+    """Time the enclosed block as one analysis stage"""
+    started_at = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stages(endpoint, model, {stage: time.perf_counter() - started_at})
+
+
+class RequestTimer:
+    """ASGI middleware that times every HTTP request into REQUEST_SECONDS
+
+    A plain ASGI wrapper rather than @app.middleware("http"), which hides
+    client disconnects from endpoints. The start time is left in
+    request.state.started_at for validation timings and deadlines.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        started_at = time.perf_counter()
+        scope.setdefault("state", {})["started_at"] = started_at
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            REQUEST_SECONDS.observe(
+                time.perf_counter() - started_at,
+                endpoint=route.path if route is not None else "unmatched",
+                method=scope["method"],
+                status=status
+            )
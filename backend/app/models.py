@@ -3,22 +3,43 @@ Model management and AI service implementations
 """
 
 import asyncio
+import copy
+import os
 import time
-import re
-import numpy as np
-import pandas as pd
-from typing import List, Dict, Any, Optional
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
-
-# Import simplified models
-from app.simple_models import sentiment_analyzer, fake_detector, helpfulness_analyzer
+from datetime import datetime, timezone
+from typing import List, Dict, Any, Optional, AsyncIterator
+
+from app.registry import registry
+from app.statistics import StatisticsEngine, SENTIMENTS
+from app.evaluation import load_reports
+from app.cache import ResultCache, make_cache_key
+from app.metrics import metrics, observe_stages
+from app.executor import InferenceExecutor, OverloadedError
+from app.deadlines import Deadline, DeadlineExceeded, gather_within
+from app.batching import MicroBatcher
+from app.transformer import TransformerSentimentClassifier, build_classifier
+from app.dedup import NearDuplicateIndex, content_digest
+from app.behavior import BehaviorStore
+from app.workers import (
+    BatchWorkerPool, batch_error, batch_skipped, analyze_sentiment_shard, analyze_sentiment_task,
+    detect_fake_task, analyze_helpfulness_task, analyze_review_task, analyze_review_chunk
+)
+from app.simple_models import REVIEW_ANALYSES
 
 from app.schemas import (
     SentimentResponse, ModelEnum, SentimentEnum, SentimentDetails,
     FakeDetectionResponse, RiskLevelEnum, FakeReviewFeatures,
     HelpfulnessResponse, HelpfulnessFeatures, ModelStatus,
     ModelInfoResponse, ModelComparison, DatasetStatistics,
-    ModelPerformance, StatisticsResponse
+    ModelPerformance, StatisticsResponse, TimelineBucket
+)
+
+def _isoformat(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).isoformat().replace("+00:00", "Z")
+
+WARMUP_REVIEW = (
+    "Great GPS, the screen is really bright and the maps are accurate! "
+    "Not happy with the mount though... it broke after a week. 3/5"
 )
 
 class ModelManager:
@@ -26,167 +47,589 @@ class ModelManager:
 
     def __init__(self):
         self.vader_analyzer = None
-        self.roberta_model = None
-        self.roberta_tokenizer = None
-        self.label_encoder = None
+        self.roberta_classifier: Optional[TransformerSentimentClassifier] = None
+        self.roberta_batcher = None
         self.fake_detector_model = None
+        self.duplicate_index: Optional[NearDuplicateIndex] = None
+        self.behavior_store: Optional[BehaviorStore] = None
 
         # Model status tracking
         self.model_status = {
             "vader": ModelStatus(loaded=False),
             "roberta": ModelStatus(loaded=False),
-            "fake_detector": ModelStatus(loaded=False)
+            "fake_detector": ModelStatus(loaded=False),
+            "helpfulness": ModelStatus(loaded=False),
+            "duplicates": ModelStatus(loaded=False),
+            "behavior": ModelStatus(loaded=False)
         }
 
-        # Load fake review detection model if available
-        self._load_fake_detector()
+        # Running aggregates behind /statistics, snapshotted to disk periodically
+        self.statistics = StatisticsEngine(
+            bucket_seconds=int(os.getenv("STATS_BUCKET_SECONDS", 3600)),
+            window_buckets=int(os.getenv("STATS_WINDOW_BUCKETS", 24)),
+            snapshot_path=os.getenv("STATS_SNAPSHOT_PATH")
+        )
+        self.snapshot_interval = float(os.getenv("STATS_SNAPSHOT_INTERVAL", 60))
+        # Whether this process writes the index and store files; the pre-fork
+        # server leaves that to one worker and gives each statistics and metrics shards
+        self.persist = True
+        self._snapshot_task: Optional[asyncio.Task] = None
+
+        # Reviews seen by /detect/fake join the near-duplicate index
+        self.dedup_insert = (os.getenv("DEDUP_INSERT") or "true").lower() == "true"
+        self.dedup_save_interval = float(os.getenv("DEDUP_SAVE_INTERVAL", 600))
+        self._dedup_save_task: Optional[asyncio.Task] = None
+
+        # Reviews checked with reviewer/product IDs update the behavior store
+        self.behavior_record = (os.getenv("BEHAVIOR_RECORD") or "true").lower() == "true"
+        self.behavior_save_interval = float(os.getenv("BEHAVIOR_SAVE_INTERVAL", 600))
+        self._behavior_save_task: Optional[asyncio.Task] = None
+
+        # Longest /compare waits for any one model
+        self.compare_timeout = float(os.getenv("COMPARE_MODEL_TIMEOUT", 5))
+
+        # Measured offline by app.evaluation; live traffic has no labels
+        self.model_performance = self._load_model_performance(os.getenv("EVALUATION_REPORTS_DIR"))
+
+        # Readiness: every model loaded and warmed up
+        self.ready = False
+        self.startup_report: Dict[str, Any] = {}
+
+        # Shared result cache for repeated review texts
+        self.cache = ResultCache(
+            max_bytes=int(os.getenv("CACHE_MAX_BYTES", 64 * 1024 * 1024)),
+            ttl=float(os.getenv("CACHE_TTL_SECONDS", 600))
+        )
+
+        # Bounded pool that keeps CPU-bound inference off the event loop
+        self.executor = InferenceExecutor(
+            workers=int(os.getenv("INFERENCE_WORKERS", 4)),
+            queue_size=int(os.getenv("INFERENCE_QUEUE_SIZE", 64)),
+            kind=os.getenv("INFERENCE_EXECUTOR", "thread")
+        )
+
+        # Worker processes for large /predict/batch requests
+        self.batch_pool = BatchWorkerPool(
+            workers=int(os.getenv("BATCH_WORKERS", 0)) or None,
+            min_shard_size=int(os.getenv("BATCH_MIN_SHARD_SIZE", 16))
+        )
 
     async def initialize(self):
-        """Initialize all models"""
+        """Load and warm up all models, then mark the service ready"""
+        started_at = time.perf_counter()
         await self._load_vader()
+        await self._load_fake_detector()
+        await self._load_helpfulness()
+        await self._load_duplicate_index()
+        await self._load_behavior_store()
         await self._load_roberta()
 
-    async def _load_vader(self):
-        """Load VADER sentiment analyzer"""
+        warmup_time = None
+        if os.getenv("MODEL_WARMUP", "true").lower() == "true":
+            warmup_time = await self.warm_up()
+
+        self._start_saving()
+
+        self.startup_report = {
+            "models": registry.load_times(),
+            "warmup_seconds": warmup_time,
+            "initialize_seconds": time.perf_counter() - started_at
+        }
+        self.ready = True
+
+    def _start_saving(self):
+        """Periodically save statistics, and the near-duplicate index and behavior store when persisting"""
+        if (self.statistics.snapshot_path or metrics.shard_path) and self._snapshot_task is None:
+            self._snapshot_task = asyncio.create_task(
+                self._save_periodically(self._save_statistics, self.snapshot_interval, "statistics snapshot")
+            )
+        if not self.persist:
+            return
+        if self.duplicate_index is not None and self.duplicate_index.path and self._dedup_save_task is None:
+            self._dedup_save_task = asyncio.create_task(
+                self._save_periodically(self._save_duplicate_index, self.dedup_save_interval, "near-duplicate index")
+            )
+        if self.behavior_store is not None and self.behavior_store.path and self._behavior_save_task is None:
+            self._behavior_save_task = asyncio.create_task(
+                self._save_periodically(self._save_behavior_store, self.behavior_save_interval, "behavior store")
+            )
+
+    def shutdown(self):
+        """Release worker threads and processes and save final statistics, index and store snapshots"""
+        for task in (self._snapshot_task, self._dedup_save_task, self._behavior_save_task):
+            if task is not None:
+                task.cancel()
+        self._save_statistics()
+        if self.persist:
+            self._save_duplicate_index()
+            self._save_behavior_store()
+        self.executor.shutdown()
+        self.batch_pool.shutdown()
+        if self.roberta_batcher is not None:
+            self.roberta_batcher.shutdown()
+
+    def _save_statistics(self) -> None:
+        """Save the statistics snapshot, and this worker's metrics shard under the pre-fork server"""
+        self.statistics.save()
+        metrics.save()
+
+    async def _load_analyzer(self, status_name: str, registry_name: str, label: str):
+        """Build a shared analyzer off the event loop and record its status"""
         try:
-            start_time = time.time()
-            self.vader_analyzer = SentimentIntensityAnalyzer()
-            loading_time = time.time() - start_time
-            self.model_status["vader"] = ModelStatus(
+            analyzer = await asyncio.to_thread(registry.get, registry_name)
+            self.model_status[status_name] = ModelStatus(
                 loaded=True,
-                loading_time=loading_time
+                loading_time=registry.load_time(registry_name)
             )
-            print("✅ VADER model loaded successfully")
+            print(f"✅ {label} loaded successfully")
+            return analyzer
         except Exception as e:
-            self.model_status["vader"] = ModelStatus(
+            self.model_status[status_name] = ModelStatus(
                 loaded=False,
                 error=str(e)
             )
-            print(f"❌ Error loading VADER: {e}")
+            print(f"❌ Error loading {label}: {e}")
+            return None
+
+    async def _load_vader(self):
+        """Load VADER sentiment analyzer"""
+        self.vader_analyzer = await self._load_analyzer("vader", "sentiment_analyzer", "VADER model")
+
+    async def _load_fake_detector(self):
+        """Load fake review detection model"""
+        # Rule-based for now; a trained model would be registered the same way
+        if await self._load_analyzer("fake_detector", "fake_detector", "Fake detector") is not None:
+            self.fake_detector_model = "rule_based"
+
+    async def _load_helpfulness(self):
+        """Load helpfulness analyzer and its polarity lexicon"""
+        await self._load_analyzer("helpfulness", "helpfulness_analyzer", "Helpfulness analyzer")
+
+    async def _load_duplicate_index(self):
+        """Load the near-duplicate index from DEDUP_INDEX_PATH, or start an empty one"""
+        self.duplicate_index = await self._load_analyzer("duplicates", "duplicate_index", "Near-duplicate index")
+
+    async def _load_behavior_store(self):
+        """Load reviewer/product aggregates from BEHAVIOR_STORE_PATH, or start an empty store"""
+        self.behavior_store = await self._load_analyzer("behavior", "behavior_store", "Behavior store")
 
     async def _load_roberta(self):
-        """Load RoBERTa model"""
-        if not transformers_available or not torch_available:
+        """Load the fine-tuned RoBERTa checkpoint from a local directory"""
+        model_path = os.getenv("ROBERTA_MODEL_PATH") or os.getenv("ROBERTA_MODEL_NAME")
+        if not model_path:
             self.model_status["roberta"] = ModelStatus(
                 loaded=False,
-                error="transformers or torch not available"
+                error="ROBERTA_MODEL_PATH not configured"
             )
             return
 
+        registry.register("roberta", lambda: self._read_roberta(model_path))
         try:
-            start_time = time.time()
-
-            # Load model and tokenizer
-            model_name = 'roberta-base'
-            self.roberta_tokenizer = RobertaTokenizer.from_pretrained(model_name)
-            self.roberta_model = RobertaForSequenceClassification.from_pretrained(
-                model_name,
-                num_labels=3
-            )
-
-            # Initialize label encoder
-            self.label_encoder = LabelEncoder()
-            self.label_encoder.fit(['Negative', 'Neutral', 'Positive'])
-
-            # Set device
-            device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
-            self.roberta_model.to(device)
-            self.roberta_model.eval()
-
-            loading_time = time.time() - start_time
+            classifier = await asyncio.to_thread(registry.get, "roberta")
+        except ImportError:
             self.model_status["roberta"] = ModelStatus(
-                loaded=True,
-                loading_time=loading_time
+                loaded=False,
+                error="transformers or torch not available"
             )
-            print("✅ RoBERTa model loaded successfully")
-
+            return
         except Exception as e:
             self.model_status["roberta"] = ModelStatus(
                 loaded=False,
                 error=str(e)
             )
             print(f"❌ Error loading RoBERTa: {e}")
+            return
 
-    def _load_fake_detector(self):
-        """Load fake review detection model"""
-        try:
-            # This would normally load a pre-trained model
-            # For now, we'll create a simple rule-based detector
-            self.fake_detector_model = "rule_based"
-            self.model_status["fake_detector"] = ModelStatus(loaded=True)
-            print("✅ Fake detector loaded successfully")
-        except Exception as e:
-            self.model_status["fake_detector"] = ModelStatus(
-                loaded=False,
-                error=str(e)
-            )
-            print(f"❌ Error loading fake detector: {e}")
+        self.attach_roberta(classifier)
+        self.model_status["roberta"] = ModelStatus(
+            loaded=True,
+            loading_time=registry.load_time("roberta")
+        )
+        print(
+            f"✅ RoBERTa model loaded in {registry.load_time('roberta'):.2f}s "
+            f"({classifier.runtime}, {'int8' if classifier.quantized else 'fp32'}, "
+            f"{classifier.stats()['threads']} threads on {classifier.device})"
+        )
 
-    async def predict_sentiment(self, text: str, model: str) -> Dict[str, Any]:
-        """Predict sentiment for a single text"""
-        return sentiment_analyzer.analyze_sentiment(text, model)
+    @staticmethod
+    def _read_roberta(model_path: str) -> TransformerSentimentClassifier:
+        """Load and prepare the checkpoint for serving; runs in a thread"""
+        import torch
+
+        device = os.getenv("DEVICE", "auto")
+        if device == "auto":
+            device = 'cuda' if torch.cuda.is_available() else 'cpu'
+        return build_classifier(
+            model_path,
+            device=device,
+            quantize=os.getenv("ROBERTA_QUANTIZE", "false").lower() == "true",
+            runtime=os.getenv("ROBERTA_RUNTIME", "eager"),
+            num_threads=int(os.getenv("TORCH_NUM_THREADS", 0)),
+            max_length=int(os.getenv("ROBERTA_MAX_LENGTH", 512)),
+            bucket_size=int(os.getenv("ROBERTA_BUCKET_SIZE", 16)),
+            truncation=os.getenv("ROBERTA_TRUNCATION", "head"),
+            head_tokens=int(os.getenv("ROBERTA_HEAD_TOKENS", 128))
+        )
 
-    async def batch_sentiment_analysis(self, texts: List[str], model: str) -> List[Dict[str, Any]]:
-        """Batch sentiment analysis"""
-        results = []
-        for text in texts:
+    @staticmethod
+    def _load_model_performance(directory: Optional[str]) -> Dict[str, ModelPerformance]:
+        """Quality metrics from the latest saved evaluation report per model"""
+        return {
+            model: ModelPerformance(
+                accuracy=report["quality"]["accuracy"],
+                precision=report["quality"]["precision"],
+                recall=report["quality"]["recall"],
+                f1_score=report["quality"]["f1_score"],
+                confusion_matrix=report["quality"]["confusion_matrix"]
+            )
+            for model, report in load_reports(directory).items()
+        }
+
+    async def _save_periodically(self, save, interval: float, label: str):
+        while True:
+            await asyncio.sleep(interval)
             try:
-                result = await self.predict_sentiment(text, model)
-                results.append(result)
+                await asyncio.to_thread(save)
             except Exception as e:
-                results.append({
-                    "error": str(e),
-                    "text": text[:100] + "..." if len(text) > 100 else text
-                })
-        return results
+                print(f"⚠️ Could not save {label}: {e}")
 
-    async def detect_fake_review(self, text: str, summary: str = "", rating: int = 5) -> Dict[str, Any]:
-        """Detect if a review might be fake"""
-        return fake_detector.detect_fake_review(text, summary, rating)
+    def _save_duplicate_index(self):
+        if self.duplicate_index is not None and self.duplicate_index.dirty:
+            self.duplicate_index.save()
 
-    async def analyze_helpfulness(self, text: str, helpful_votes: int = 0, total_votes: int = 0) -> Dict[str, Any]:
-        """Analyze review helpfulness"""
-        return helpfulness_analyzer.analyze_helpfulness(text, helpful_votes, total_votes)
+    def _save_behavior_store(self):
+        if self.behavior_store is not None and self.behavior_store.dirty:
+            self.behavior_store.save()
 
-    async def compare_models(self, text: str) -> Dict[str, Any]:
-        """Compare all models on the same text"""
-        results = {}
+    async def _flag_near_duplicates(self, fakes: List[Dict[str, Any]], texts: List[str],
+                                    reviewer_id: Optional[str] = None, product_id: Optional[str] = None) -> None:
+        """Count indexed near-duplicates of each text into its fake detection result
 
-        # Get predictions from all available models
-        if self.model_status["vader"].loaded:
-            vader_result = await self._predict_vader(text)
-            results["vader"] = SentimentResponse(
-                sentiment=vader_result["sentiment"],
-                confidence=vader_result["confidence"],
-                model=ModelEnum.VADER,
-                details=vader_result["details"],
-                text_length=len(text),
-                processing_time=vader_result["details"].processing_time
+        A resubmission of the same text by the same reviewer for the same
+        product is neither counted nor indexed again.
+        """
+        if self.duplicate_index is None:
+            return
+        pairs = [(fake, text) for fake, text in zip(fakes, texts) if fake is not None and "error" not in fake]
+        if not pairs:
+            return
+        count = self.duplicate_index.check_and_add if self.dedup_insert else self.duplicate_index.count_near_duplicates
+        # Off the event loop: inserts periodically merge the sorted band arrays
+        counts = await asyncio.to_thread(
+            lambda: [count(text, content_digest(text, reviewer_id, product_id)) for _, text in pairs]
+        )
+        detector = registry.get("fake_detector")
+        for (fake, _), near_duplicates in zip(pairs, counts):
+            detector.flag_near_duplicates(fake, near_duplicates)
+
+    def _flag_behavior(self, fake: Dict[str, Any], text: str, reviewer_id: Optional[str],
+                       product_id: Optional[str], rating: int) -> None:
+        """Add the reviewer/product profile to a fake detection result, then record this review
+
+        A review is recorded once; checking it again leaves the store and its
+        profile unchanged.
+        """
+        if self.behavior_store is None or not (reviewer_id or product_id):
+            return
+        digest = content_digest(text, reviewer_id, product_id)
+        behavior = self.behavior_store.profile(reviewer_id, product_id, rating, digest=digest)
+        registry.get("fake_detector").flag_behavior(fake, behavior)
+        if self.behavior_record:
+            self.behavior_store.record(reviewer_id, product_id, rating, digest=digest)
+
+    async def warm_up(self) -> float:
+        """Run a sample review through every hot path so the first real request is not the slowest"""
+        started_at = time.perf_counter()
+        try:
+            await self.executor.run(
+                analyze_review_task, WARMUP_REVIEW, "", 5, 0, 0, "vader", list(REVIEW_ANALYSES)
             )
+            if self.roberta_batcher is not None:
+                await self.roberta_batcher.submit(WARMUP_REVIEW)
+        except Exception as e:
+            print(f"⚠️ Warm-up failed: {e}")
+        return time.perf_counter() - started_at
+
+    def attach_roberta(self, classifier: TransformerSentimentClassifier):
+        """Serve a prepared transformer classifier through the micro-batcher"""
+        self.roberta_classifier = classifier
+        if self.roberta_batcher is not None:
+            self.roberta_batcher.shutdown()
+        self.roberta_batcher = MicroBatcher(
+            classifier.predict_batch,
+            max_batch_size=int(os.getenv("BATCH_SIZE", 32)),
+            max_wait=float(os.getenv("ROBERTA_MAX_WAIT_MS", 5)) / 1000
+        )
+        self.model_status["roberta"] = ModelStatus(loaded=True)
+
+    @staticmethod
+    def _record_stages(endpoint: str, model: str, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Move analyzer stage timings out of a result and into the latency histograms"""
+        timings = result.pop("stage_timings", None)
+        if timings:
+            observe_stages(endpoint, model, timings)
+        return result
+
+    @staticmethod
+    async def _within(deadline: Optional[Deadline], work) -> Any:
+        """Wait for cached work no longer than the deadline allows
+
+        Other requests may be waiting on the same computation, so it is not
+        cancelled: it finishes in the background and fills the cache.
+        """
+        remaining = deadline.remaining() if deadline is not None else None
+        if remaining is None:
+            return await work
+        task = asyncio.ensure_future(work)
+        # Retrieve a late failure so it is not logged as never retrieved
+        task.add_done_callback(lambda done: done.cancelled() or done.exception())
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), remaining)
+        except asyncio.TimeoutError:
+            raise DeadlineExceeded("Request deadline exceeded") from None
 
-        if self.model_status["roberta"].loaded:
-            roberta_result = await self._predict_roberta(text)
-            results["roberta"] = SentimentResponse(
-                sentiment=roberta_result["sentiment"],
-                confidence=roberta_result["confidence"],
-                model=ModelEnum.ROBERTA,
-                details=roberta_result["details"],
-                text_length=len(text),
-                processing_time=roberta_result["details"].processing_time
+    async def predict_sentiment(self, text: str, model: str, deadline: Optional[Deadline] = None) -> Dict[str, Any]:
+        """Predict sentiment for a single text"""
+        result = await self._within(deadline, self._sentiment(text, model, "/predict/sentiment", deadline))
+        self.statistics.record_analysis({"sentiment": result}, model, len(text))
+        return result
+
+    async def _sentiment(self, text: str, model: str, endpoint: str,
+                         deadline: Optional[Deadline] = None) -> Dict[str, Any]:
+        """Cached single-text sentiment, shared by /predict/sentiment and /compare"""
+        async def compute():
+            if model == "roberta" and self.roberta_batcher is not None:
+                async with self.executor.admit(deadline):
+                    result = await self.roberta_batcher.submit(text)
+            else:
+                result = await self.executor.run(analyze_sentiment_task, text, model, deadline=deadline)
+            return self._record_stages(endpoint, model, result)
+
+        key = make_cache_key("sentiment", text=text, model=model)
+        return await self.cache.get_or_compute(key, compute)
+
+    async def batch_sentiment_analysis(self, texts: List[str], model: str,
+                                       deadline: Optional[Deadline] = None) -> List[Dict[str, Any]]:
+        """Batch sentiment analysis
+
+        Once the deadline passes or is cancelled, scoring stops at the next
+        item and the remaining texts come back marked skipped.
+        """
+        # Score each distinct text once, and only if it is not already cached
+        resolved = {}
+        pending = []
+        for text in dict.fromkeys(texts):
+            found, result = self.cache.lookup(make_cache_key("sentiment", text=text, model=model))
+            if found:
+                resolved[text] = result
+            else:
+                pending.append(text)
+
+        if pending:
+            if model == "roberta" and self.roberta_batcher is not None:
+                async with self.executor.admit(deadline):
+                    outcomes = await gather_within(
+                        [self.roberta_batcher.submit(text) for text in pending], deadline
+                    )
+                scored = [
+                    batch_skipped(text, str(outcome)) if isinstance(outcome, DeadlineExceeded)
+                    else batch_error(text, outcome) if isinstance(outcome, Exception) else outcome
+                    for text, outcome in zip(pending, outcomes)
+                ]
+            elif self.batch_pool.should_shard(len(pending)):
+                async with self.executor.admit(deadline):
+                    scored = await self.batch_pool.analyze_sentiment(pending, model, deadline)
+            else:
+                scored = await self.executor.run(analyze_sentiment_shard, pending, model, deadline, deadline=deadline)
+            for text, result in zip(pending, scored):
+                self._record_stages("/predict/batch", model, result)
+                if "error" not in result:
+                    self.cache.put(make_cache_key("sentiment", text=text, model=model), result)
+                resolved[text] = result
+
+        results = [resolved[text] for text in texts]
+        for text, result in zip(texts, results):
+            if "error" not in result:
+                self.statistics.record_analysis({"sentiment": result}, model, len(text))
+        return results
+
+    async def analyze_stream(self, batches: AsyncIterator[list], model: str,
+                             analyses: List[str]) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Score batches of parsed NDJSON lines as they arrive, one result per line"""
+        use_transformer = "sentiment" in analyses and model == "roberta" and self.roberta_batcher is not None
+        chunk_analyses = [name for name in analyses if not (use_transformer and name == "sentiment")]
+
+        async for batch in batches:
+            reviews = [review for _, review, _ in batch if review is not None]
+
+            scored = [{} for _ in reviews]
+            if reviews and chunk_analyses:
+                # Stop reading input until a slot frees up; a stream is never shed
+                scored = await self.executor.run(analyze_review_chunk, reviews, chunk_analyses, model, wait=True)
+            if reviews and use_transformer:
+                outcomes = await asyncio.gather(
+                    *[self.roberta_batcher.submit(review["text"]) for review in reviews],
+                    return_exceptions=True
+                )
+                for review, result, outcome in zip(reviews, scored, outcomes):
+                    if isinstance(outcome, Exception):
+                        result.clear()
+                        result.update(batch_error(review["text"], outcome))
+                    elif "error" not in result:
+                        result["sentiment"] = outcome
+            if reviews and "fake" in chunk_analyses:
+                await self._flag_near_duplicates(
+                    [result.get("fake") for result in scored], [review["text"] for review in reviews]
+                )
+
+            results = []
+            scored_iter = iter(scored)
+            for index, review, error in batch:
+                if review is None:
+                    results.append({"index": index, "error": error})
+                    continue
+                result = next(scored_iter)
+                self._record_stages("/predict/stream", "review_features", result)
+                for name, stage_model in (("sentiment", model), ("fake", "fake_detector"), ("helpfulness", "helpfulness")):
+                    if name in result:
+                        self._record_stages("/predict/stream", stage_model, result[name])
+                line = {"index": index}
+                if review.get("id") is not None:
+                    line["id"] = review["id"]
+                line.update(result)
+                if "error" not in result:
+                    self.statistics.record_analysis(result, model, len(review["text"]))
+                results.append(line)
+            yield results
+
+    async def detect_fake_review(self, text: str, summary: str = "", rating: int = 5,
+                                 reviewer_id: Optional[str] = None, product_id: Optional[str] = None,
+                                 deadline: Optional[Deadline] = None) -> Dict[str, Any]:
+        """Detect if a review might be fake, with account-level signals when IDs are given"""
+        async def compute():
+            result = await self.executor.run(detect_fake_task, text, summary, rating, deadline=deadline)
+            return self._record_stages("/detect/fake", "fake_detector", result)
+
+        key = make_cache_key("fake", text=text, summary=summary, rating=rating)
+        # The index and behavior store must see every submission, reposts
+        # served from the cache included
+        result = copy.deepcopy(await self._within(deadline, self.cache.get_or_compute(key, compute)))
+        await self._flag_near_duplicates([result], [text], reviewer_id, product_id)
+        self._flag_behavior(result, text, reviewer_id, product_id, rating)
+        self.statistics.record_analysis({"fake": result}, "fake_detector", len(text))
+        return result
+
+    async def analyze_helpfulness(self, text: str, helpful_votes: int = 0, total_votes: int = 0,
+                                  deadline: Optional[Deadline] = None) -> Dict[str, Any]:
+        """Analyze review helpfulness"""
+        async def compute():
+            result = await self.executor.run(analyze_helpfulness_task, text, helpful_votes, total_votes, deadline=deadline)
+            return self._record_stages("/analyze/helpfulness", "helpfulness", result)
+
+        key = make_cache_key("helpfulness", text=text, helpful_votes=helpful_votes, total_votes=total_votes)
+        result = await self._within(deadline, self.cache.get_or_compute(key, compute))
+        self.statistics.record_analysis({"helpfulness": result}, "helpfulness", len(text))
+        return result
+
+    async def analyze_full(self, text: str, summary: str = "", rating: int = 5, helpful_votes: int = 0,
+                           total_votes: int = 0, model: str = "roberta",
+                           deadline: Optional[Deadline] = None) -> Dict[str, Any]:
+        """Sentiment, fake review risk and helpfulness from one shared feature pass"""
+        async def compute():
+            use_transformer = model == "roberta" and self.roberta_batcher is not None
+            analyses = [name for name in REVIEW_ANALYSES if not (use_transformer and name == "sentiment")]
+            features = self.executor.run(
+                analyze_review_task, text, summary, rating, helpful_votes, total_votes, model, analyses,
+                deadline=deadline
             )
+            if use_transformer:
+                async def transformer_sentiment():
+                    async with self.executor.admit(deadline):
+                        return await self.roberta_batcher.submit(text)
+
+                result, sentiment = await asyncio.gather(features, transformer_sentiment())
+                result["sentiment"] = sentiment
+            else:
+                result = await features
+
+            self._record_stages("/analyze/full", "review_features", result)
+            self._record_stages("/analyze/full", model, result["sentiment"])
+            self._record_stages("/analyze/full", "fake_detector", result["fake"])
+            self._record_stages("/analyze/full", "helpfulness", result["helpfulness"])
+            return result
+
+        key = make_cache_key(
+            "full", text=text, summary=summary, rating=rating,
+            helpful_votes=helpful_votes, total_votes=total_votes, model=model
+        )
+        result = copy.deepcopy(await self._within(deadline, self.cache.get_or_compute(key, compute)))
+        await self._flag_near_duplicates([result["fake"]], [text])
+        self.statistics.record_analysis(result, model, len(text))
+        return result
+
+    async def compare_models(self, text: str, models: Optional[List[str]] = None,
+                             timeout: Optional[float] = None, deadline: Optional[Deadline] = None) -> ModelComparison:
+        """Run every loaded sentiment model on the same text concurrently
+
+        The text is normalized once and each model's result goes through the
+        shared result cache, so a comparison reuses earlier single-model
+        predictions. A model that misses its timeout is reported in errors
+        and keeps running in the background to fill the cache. When every
+        model was turned away by a full queue, OverloadedError is raised so
+        the caller gets a 503 with Retry-After rather than an empty result.
+        """
+        text = text.strip()
+        timeout = timeout or self.compare_timeout
+        remaining = deadline.remaining() if deadline is not None else None
+        if remaining is not None:
+            timeout = min(timeout, remaining)
+        loaded = [name for name in ("vader", "roberta") if self.model_status[name].loaded]
+        candidates = [name for name in loaded if models is None or name in models]
+
+        async def run(model: str):
+            started_at = time.perf_counter()
+            task = asyncio.ensure_future(self._sentiment(text, model, "/compare", deadline))
+            # Retrieve a late failure so it is not logged as never retrieved
+            task.add_done_callback(lambda done: done.cancelled() or done.exception())
+            try:
+                result = await asyncio.wait_for(asyncio.shield(task), timeout)
+                return model, result, None, time.perf_counter() - started_at
+            except asyncio.TimeoutError:
+                error = f"Timed out after {timeout:g}s"
+            except Exception as e:
+                error = e
+            return model, None, error, time.perf_counter() - started_at
 
-        # Check agreement
+        results = {}
+        errors = {}
+        timings = {}
+        overloaded = []
+        for model, result, error, elapsed in await asyncio.gather(*[run(model) for model in candidates]):
+            timings[model] = elapsed
+            if isinstance(error, OverloadedError):
+                overloaded.append(error)
+            if error is not None:
+                errors[model] = str(error)
+            else:
+                results[model] = SentimentResponse(**result)
+        if overloaded and not results:
+            raise max(overloaded, key=lambda e: e.retry_after)
+
+        # Agreement among the models that answered
         sentiments = [r.sentiment for r in results.values()]
         agreement = len(set(sentiments)) == 1
 
         # Recommend model
-        recommended = ModelEnum.ROBERTA if self.model_status["roberta"].loaded else ModelEnum.VADER
+        recommended = ModelEnum.ROBERTA if "roberta" in results else ModelEnum.VADER
 
         return ModelComparison(
             text=text,
             models=results,
             agreement=agreement,
-            recommended=recommended
+            recommended=recommended,
+            timings=timings,
+            errors=errors,
+            partial=bool(errors)
         )
 
     async def get_model_info(self) -> Dict[str, Any]:
@@ -221,45 +664,60 @@ class ModelManager:
             recommended_model="roberta"
         )
 
+    async def get_readiness(self) -> Dict[str, Any]:
+        """Whether models are loaded and warmed up, with the startup timing report"""
+        return {
+            "ready": self.ready,
+            "models": {name: status.loaded for name, status in self.model_status.items()},
+            "startup": self.startup_report
+        }
+
     async def get_model_status(self) -> Dict[str, ModelStatus]:
         """Get current model loading status"""
         return self.model_status
 
+    async def get_cache_stats(self) -> Dict[str, Any]:
+        """Get result cache hit/miss/eviction counters"""
+        return self.cache.stats()
+
+    async def get_executor_stats(self) -> Dict[str, Any]:
+        """Get inference queue depth and wait-time counters"""
+        stats = self.executor.stats()
+        if self.roberta_batcher is not None:
+            stats["roberta_batching"] = self.roberta_batcher.stats()
+        if self.roberta_classifier is not None:
+            stats["roberta_inference"] = self.roberta_classifier.stats()
+        if self.duplicate_index is not None:
+            stats["near_duplicate_index"] = self.duplicate_index.stats()
+        if self.behavior_store is not None:
+            stats["behavior_store"] = self.behavior_store.stats()
+        return stats
+
     async def get_statistics(self) -> Dict[str, Any]:
-        """Get dataset and performance statistics"""
-        # This would normally load from saved statistics files
-        # For now, return sample statistics
+        """Get live statistics over every review analyzed so far"""
+        stats = self.statistics.snapshot()
 
         dataset_stats = DatasetStatistics(
-            total_reviews=9000,
-            sentiment_distribution={"Positive": 3000, "Negative": 3000, "Neutral": 3000},
-            average_text_length=245.5,
-            helpful_reviews_percentage=65.2,
-            suspicious_reviews_percentage=12.4
-        )
-
-        # Sample performance metrics
-        vader_performance = ModelPerformance(
-            accuracy=0.465,
-            precision={"Negative": 0.591, "Neutral": 0.291, "Positive": 0.432},
-            recall={"Negative": 0.431, "Neutral": 0.036, "Positive": 0.929},
-            f1_score={"Negative": 0.499, "Neutral": 0.063, "Positive": 0.590},
-            confusion_matrix=[[194, 30, 226], [111, 16, 323], [23, 9, 418]]
-        )
-
-        roberta_performance = ModelPerformance(
-            accuracy=0.873,  # Expected improvement
-            precision={"Negative": 0.856, "Neutral": 0.834, "Positive": 0.928},
-            recall={"Negative": 0.891, "Neutral": 0.812, "Positive": 0.916},
-            f1_score={"Negative": 0.873, "Neutral": 0.823, "Positive": 0.922},
-            confusion_matrix=[[401, 27, 22], [34, 366, 50], [29, 42, 379]]
+            total_reviews=stats["total_reviews"],
+            sentiment_distribution=stats["sentiment_counts"],
+            average_text_length=stats["average_text_length"],
+            helpful_reviews_percentage=stats["helpful_reviews_percentage"],
+            suspicious_reviews_percentage=stats["suspicious_reviews_percentage"]
         )
 
         return StatisticsResponse(
             dataset=dataset_stats,
-            model_performance={
-                "vader": vader_performance,
-                "roberta": roberta_performance
-            },
-            last_updated="2024-01-15T10:30:00Z"
-        )
\ No newline at end of file
+            model_performance=self.model_performance,
+            model_predictions=stats["model_predictions"],
+            timeline=[
+                TimelineBucket(
+                    start=_isoformat(bucket["start"]),
+                    reviews=bucket["reviews"],
+                    sentiment={sentiment: bucket.get(sentiment, 0) for sentiment in SENTIMENTS},
+                    suspicious=bucket["suspicious"],
+                    helpful=bucket["helpful"]
+                )
+                for bucket in stats["timeline"]
+            ],
+            last_updated=_isoformat(stats["last_updated"]) if stats["last_updated"] else None
+        )
@@ -0,0 +1,264 @@
+"""
+Fast polarity/subjectivity scoring engine
+
+Reimplementation of TextBlob's default PatternAnalyzer for plain strings.
+The en-sentiment.xml lexicon shipped with textblob is loaded once into flat
+per-word tuples, or looked up in place in the mapped lexicon artifact
+(app.lexicons), and the tokenizer runs on precompiled patterns, so scoring
+needs neither a TextBlob per call nor the nltk import that textblob pulls in.
+"""
+
+import importlib.util
+import os
+import re
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple
+from xml.etree import ElementTree
+
+if TYPE_CHECKING:
+    from app.lexicons import LexiconArtifact
+
+
+def _find_textblob_data_dir() -> Optional[str]:
+    spec = importlib.util.find_spec("textblob")
+    if spec is None or not spec.submodule_search_locations:
+        return None
+    return os.path.join(list(spec.submodule_search_locations)[0], "en")
+
+
+TEXTBLOB_DATA_DIR = _find_textblob_data_dir()
+
+# Tokenizer tables from pattern.en, as used by textblob._text.find_tokens
+PUNCTUATION = ".,;:!?()[]{}`''\"@#$^&*+-|=~_"
+ABBREVIATIONS = frozenset((
+    "a.", "adj.", "adv.", "al.", "a.m.", "c.", "cf.", "comp.", "conf.", "def.", "ed.", "e.g.",
+    "esp.", "etc.", "ex.", "f.", "fig.", "gen.", "id.", "i.e.", "int.", "l.", "m.", "Med.",
+    "Mil.", "Mr.", "n.", "n.q.", "orig.", "pl.", "pred.", "pres.", "p.m.", "ref.", "v.", "vs.",
+    "w/"
+))
+EMOTICONS = (
+    (+1.00, ("<3", "♥")),
+    (+1.00, (">:D", ":-D", ":D", "=-D", "=D", "X-D", "x-D", "XD", "xD", "8-D")),
+    (+0.75, (">:P", ":-P", ":P", ":-p", ":p", ":-b", ":b", ":c)", ":o)", ":^)")),
+    (+0.50, (">:)", ":-)", ":)", "=)", "=]", ":]", ":}", ":>", ":3", "8)", "8-)")),
+    (+0.25, (">;]", ";-)", ";)", ";-]", ";]", ";D", ";^)", "*-)", "*)")),
+    (+0.05, (">:o", ":-O", ":O", ":o", ":-o", "o_O", "o.O", "°O°", "°o°")),
+    (-0.25, (">:/", ":-/", ":/", ":\\", ">:\\", ":-.", ":-s", ":s", ":S", ":-S", ">.>")),
+    (-0.75, (">:[", ":-(", ":(", "=(", ":-[", ":[", ":{", ":-<", ":c", ":-c", "=/")),
+    (-1.00, (":'(", ":'''(", ";'("))
+)
+NEGATIONS = frozenset(("no", "not", "n't", "never"))
+EOS = "END-OF-SENTENCE"
+
+_LEADING_PUNCTUATION = tuple(PUNCTUATION.replace(".", ""))
+_TRAILING_PUNCTUATION = _LEADING_PUNCTUATION + (".",)
+_LEADING_CHARS = frozenset(_LEADING_PUNCTUATION)
+_TRAILING_CHARS = frozenset(_TRAILING_PUNCTUATION)
+_SENTENCE_END = frozenset(("...", ".", "!", "?", EOS))
+_SENTENCE_TAIL = frozenset(("'", '"', "”", "’", "...", ".", "!", "?", ")", EOS))
+
+# The contractions never overlap, so one pass equals pattern's sequential re.sub calls
+_CONTRACTIONS = re.compile(r"'d|'m|'s|'ll|'re|'ve|n't")
+_CONTRACTION_FORMS = frozenset(("'d", "'m", "'s", "'ll", "'re", "'ve", "n't"))
+_LINEBREAKS = re.compile(r"\n{2,}")
+_WHITESPACE = re.compile(r"\s+")
+_ABBR_LETTER = re.compile(r"^[A-Za-z]\.$")
+_ABBR_LETTERS = re.compile(r"^([A-Za-z]\.)+$")
+_ABBR_CAPITAL = re.compile("^[A-Z][" + "|".join("bcdfghjklmnpqrstvwxz") + "]+.$")
+_SARCASM = re.compile(r"\( ?\! ?\)")
+_EMOTICON_TOKENS = re.compile(r"(%s)($|\s)" % "|".join(
+    r" ?".join(re.escape(char) for char in emoticon) for _, emoticons in EMOTICONS for emoticon in emoticons
+))
+
+
+def _average(values: List[float]) -> float:
+    return sum(values) / float(len(values) or 1)
+
+
+def _load_lexicon(path: str) -> Dict[str, Tuple[float, float, float, bool]]:
+    """Parse en-sentiment.xml into word -> (polarity, subjectivity, intensity, is_modifier)
+
+    Word senses are averaged per part-of-speech tag and then across tags, and
+    adjectives gain an adverb form ("terrible" -> "terribly"), as pattern.en does.
+    """
+    senses: Dict[str, Dict[Optional[str], list]] = {}
+    for element in ElementTree.parse(path).getroot().findall("word"):
+        word = element.attrib.get("form")
+        if word:
+            senses.setdefault(word, {}).setdefault(element.attrib.get("pos"), []).append((
+                float(element.attrib.get("polarity", 0.0)),
+                float(element.attrib.get("subjectivity", 0.0)),
+                float(element.attrib.get("intensity", 1.0))
+            ))
+
+    words = {}
+    for word, by_pos in senses.items():
+        tags = {pos: [_average(values) for values in zip(*psi)] for pos, psi in by_pos.items()}
+        tags[None] = [_average(values) for values in zip(*tags.values())]
+        words[word] = tags
+
+    for word, tags in list(words.items()):
+        if "JJ" in tags:
+            if word.endswith("y"):
+                word = word[:-1] + "i"
+            if word.endswith("le"):
+                word = word[:-2]
+            adverb = words.setdefault(word + "ly", {})
+            adverb["RB"] = adverb[None] = tuple(tags["JJ"])
+
+    return {
+        word: tuple(tags[None]) + ("RB" in tags,)
+        for word, tags in words.items()
+    }
+
+
+class FastPolarityScorer:
+    """Precompiled pattern.en scorer returning TextBlob's (polarity, subjectivity)"""
+
+    def __init__(self, data_dir: Optional[str] = TEXTBLOB_DATA_DIR, lexicons: Optional["LexiconArtifact"] = None):
+        if lexicons is not None and "pattern_lexicon" in lexicons:
+            self.lexicon = lexicons["pattern_lexicon"]
+        elif data_dir is None:
+            raise RuntimeError("textblob is not installed; its en-sentiment.xml lexicon is required")
+        else:
+            self.lexicon = _load_lexicon(os.path.join(data_dir, "en-sentiment.xml"))
+
+        # First match wins, in pattern's EMOTICONS order
+        self.emoticons = {}
+        for polarity, emoticons in EMOTICONS:
+            for emoticon in emoticons:
+                self.emoticons.setdefault(emoticon.lower(), polarity)
+
+    def polarity_subjectivity(self, text: str) -> Tuple[float, float]:
+        """Score a single text, identical to TextBlob(text).sentiment"""
+        assessments = self._assess(" ".join(self._tokenize(text)).lower().split())
+        polarity = 0.0
+        subjectivity = 0.0
+        for p, s, negated in assessments:
+            # "not good" = slightly bad, "not bad" = slightly good
+            polarity += p * -0.5 if negated else p
+            subjectivity += s
+        count = float(len(assessments) or 1)
+        return polarity / count, subjectivity / count
+
+    def score_many(self, texts: Iterable[str]) -> List[Tuple[float, float]]:
+        """Score a batch of texts, preserving input order"""
+        polarity_subjectivity = self.polarity_subjectivity
+        return [polarity_subjectivity(text) for text in texts]
+
+    @staticmethod
+    def _is_abbreviation(token: str) -> bool:
+        return (
+            token in ABBREVIATIONS
+            or _ABBR_LETTER.match(token) is not None
+            or _ABBR_LETTERS.match(token) is not None
+            or _ABBR_CAPITAL.match(token) is not None
+        )
+
+    def _tokenize(self, text: str) -> List[str]:
+        """Sentences of space-separated tokens, as textblob._text.find_tokens"""
+        text = _CONTRACTIONS.sub(lambda match: " " + match.group(), text)
+        text = (
+            text.replace("“", " “ ").replace("”", " ” ").replace("‘", " ‘ ")
+            .replace("’", " ’ ").replace("'", " ' ").replace('"', ' " ')
+        )
+        text = text.replace("\r\n", "\n")
+        text = _LINEBREAKS.sub(" %s " % EOS, text)
+        text = _WHITESPACE.sub(" ", text)
+
+        tokens = []
+        for token in text.split(" "):
+            if not token:
+                continue
+            if token[0] not in _LEADING_CHARS and token[-1] not in _TRAILING_CHARS:
+                tokens.append(token)
+                continue
+            tail = []
+            while token.startswith(_LEADING_PUNCTUATION) and token not in _CONTRACTION_FORMS:
+                tokens.append(token[0])
+                token = token[1:]
+            while token.endswith(_TRAILING_PUNCTUATION) and token not in _CONTRACTION_FORMS:
+                if token.endswith(_LEADING_PUNCTUATION):
+                    tail.append(token[-1])
+                    token = token[:-1]
+                if token.endswith("..."):
+                    tail.append("...")
+                    token = token[:-3].rstrip(".")
+                if token.endswith("."):
+                    if self._is_abbreviation(token):
+                        break
+                    tail.append(token[-1])
+                    token = token[:-1]
+            if token != "":
+                tokens.append(token)
+            tokens.extend(reversed(tail))
+
+        sentences = [[]]
+        start = index = 0
+        while index < len(tokens):
+            if tokens[index] in _SENTENCE_END:
+                # Citations, trailing parentheses and repeated punctuation stay with the sentence
+                while index < len(tokens) and tokens[index] in _SENTENCE_TAIL:
+                    if tokens[index] in ("'", '"') and sentences[-1].count(tokens[index]) % 2 == 0:
+                        break
+                    index += 1
+                sentences[-1].extend(token for token in tokens[start:index] if token != EOS)
+                sentences.append([])
+                start = index
+            index += 1
+        sentences[-1].extend(tokens[start:index])
+
+        return [
+            _EMOTICON_TOKENS.sub(
+                lambda match: match.group(1).replace(" ", "") + match.group(2),
+                _SARCASM.sub("(!)", " ".join(sentence))
+            )
+            for sentence in sentences if sentence
+        ]
+
+    def _assess(self, words: List[str]) -> List[list]:
+        """[polarity, subjectivity, negated] per known word, modifier or emoticon"""
+        lexicon = self.lexicon
+        assessments = []
+        intensity = 1.0
+        modifier = None  # Preceding adverb, e.g. "really good"
+        negation = None  # Preceding negation, e.g. "not good"
+        for word in words:
+            entry = lexicon.get(word)
+            if entry is not None:
+                p, s, i, is_modifier = entry
+                if modifier is None:
+                    assessments.append([p, s, False])
+                else:
+                    last = assessments[-1]
+                    last[0] = max(-1.0, min(p * intensity, +1.0))
+                    last[1] = max(-1.0, min(s * intensity, +1.0))
+                intensity = i
+                if negation is not None:
+                    intensity = 1.0 / intensity
+                    assessments[-1][2] = True
+                modifier = word if is_modifier else None
+                negation = word if word in NEGATIONS else None
+            else:
+                if word in NEGATIONS:
+                    negation = word
+                # Keep a negation across small words, e.g. "not a good"
+                elif negation and len(word.strip("'")) > 1:
+                    negation = None
+                # A negation after an adverb, e.g. "really not good"
+                if negation is not None and modifier is not None and modifier.endswith("ly"):
+                    assessments[-1][2] = True
+                    negation = None
+                # Keep a modifier across small words, e.g. "really is a good"
+                elif modifier and len(word) > 2:
+                    modifier = None
+                if word == "!" and assessments:
+                    assessments[-1][0] = max(-1.0, min(assessments[-1][0] * 1.25, +1.0))
+                if word == "(!)":
+                    assessments.append([0.0, 1.0, False])
+                    intensity = 1.0
+                if word.isalpha() is False and len(word) <= 5 and word not in PUNCTUATION:
+                    polarity = self.emoticons.get(word)
+                    if polarity is not None:
+                        assessments.append([polarity, 1.0, False])
+                        intensity = 1.0
+        return assessments
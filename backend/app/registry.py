@@ -0,0 +1,78 @@
+"""
+Shared model registry
+
+Every analyzer is registered as a loader and built at most once per process,
+on first use, so importing the app stays cheap and the API, batch workers and
+bulk jobs all share one instance of each model. Load times are recorded for
+the startup report.
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+
+class ModelRegistry:
+    """Lazily built, process-wide singletons keyed by name"""
+
+    def __init__(self):
+        self._loaders: Dict[str, Callable[[], Any]] = {}
+        self._instances: Dict[str, Any] = {}
+        self._load_times: Dict[str, float] = {}
+        self._errors: Dict[str, str] = {}
+        self._lock = threading.RLock()
+
+    def register(self, name: str, loader: Callable[[], Any]) -> None:
+        """Register how to build a model; nothing is loaded yet"""
+        with self._lock:
+            self._loaders[name] = loader
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._loaders
+
+    def get(self, name: str) -> Any:
+        """The shared instance, built on first use"""
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+        with self._lock:
+            # Another thread may have finished loading while we waited
+            if name in self._instances:
+                return self._instances[name]
+            if name not in self._loaders:
+                raise KeyError(f"Unknown model: {name}")
+            started_at = time.perf_counter()
+            try:
+                instance = self._loaders[name]()
+            except Exception as e:
+                self._errors[name] = str(e)
+                raise
+            self._load_times[name] = time.perf_counter() - started_at
+            self._errors.pop(name, None)
+            self._instances[name] = instance
+            return instance
+
+    def load_all(self) -> Dict[str, float]:
+        """Build every registered model, returning per-model load seconds"""
+        for name in list(self._loaders):
+            try:
+                self.get(name)
+            except Exception:
+                # Recorded in errors(); other models still load
+                pass
+        return self.load_times()
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._instances
+
+    def load_time(self, name: str) -> Optional[float]:
+        return self._load_times.get(name)
+
+    def load_times(self) -> Dict[str, float]:
+        return dict(self._load_times)
+
+    def errors(self) -> Dict[str, str]:
+        return dict(self._errors)
+
+
+registry = ModelRegistry()
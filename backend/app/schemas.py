@@ -2,10 +2,14 @@
 Pydantic schemas for API request/response models
 """
 
+import os
 from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Union
 from enum import Enum
 
+# Most texts one /predict/batch request may carry
+MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", 100))
+
 # Enums
 class SentimentEnum(str, Enum):
     POSITIVE = "Positive"
@@ -16,6 +20,10 @@ class ModelEnum(str, Enum):
     VADER = "vader"
     ROBERTA = "roberta"
 
+class ResponseShapeEnum(str, Enum):
+    ROWS = "rows"
+    COLUMNAR = "columnar"
+
 class RiskLevelEnum(str, Enum):
     LOW = "Low"
     MEDIUM = "Medium"
@@ -27,19 +35,43 @@ class SentimentRequest(BaseModel):
     model: ModelEnum = Field(ModelEnum.ROBERTA, description="Model to use for sentiment analysis")
 
 class BatchAnalysisRequest(BaseModel):
-    texts: List[str] = Field(..., min_items=1, max_items=100, description="List of review texts to analyze")
+    texts: List[str] = Field(..., min_items=1, max_items=MAX_BATCH_SIZE, description="List of review texts to analyze")
     model: ModelEnum = Field(ModelEnum.ROBERTA, description="Model to use for batch analysis")
 
 class FakeDetectionRequest(BaseModel):
     text: str = Field(..., min_length=1, max_length=5000, description="Review text to analyze")
     summary: Optional[str] = Field(None, max_length=500, description="Review summary (if available)")
     rating: int = Field(5, ge=1, le=5, description="Product rating (1-5)")
+    reviewer_id: Optional[str] = Field(None, max_length=64, description="Reviewer account ID (reviewerID)")
+    product_id: Optional[str] = Field(None, max_length=64, description="Product ID (asin)")
 
 class HelpfulnessRequest(BaseModel):
     text: str = Field(..., min_length=1, max_length=5000, description="Review text to analyze")
     helpful_votes: int = Field(0, ge=0, description="Number of helpful votes")
     total_votes: int = Field(0, ge=0, description="Total number of votes")
 
+class FullAnalysisRequest(BaseModel):
+    text: str = Field(..., min_length=1, max_length=5000, description="Review text to analyze")
+    summary: Optional[str] = Field(None, max_length=500, description="Review summary (if available)")
+    rating: int = Field(5, ge=1, le=5, description="Product rating (1-5)")
+    helpful_votes: int = Field(0, ge=0, description="Number of helpful votes")
+    total_votes: int = Field(0, ge=0, description="Total number of votes")
+    model: ModelEnum = Field(ModelEnum.ROBERTA, description="Model to use for sentiment analysis")
+
+class ComparisonRequest(BaseModel):
+    text: str = Field(..., min_length=1, max_length=5000, description="Review text to analyze")
+    models: Optional[List[ModelEnum]] = Field(None, description="Models to compare (default: every loaded model)")
+    timeout: Optional[float] = Field(None, gt=0, le=60, description="Per-model timeout in seconds")
+
+class StreamReviewRequest(BaseModel):
+    """One NDJSON line of a /predict/stream request body"""
+    id: Optional[Union[str, int]] = Field(None, description="Caller-supplied identifier echoed in the result")
+    text: str = Field(..., min_length=1, max_length=5000, description="Review text to analyze")
+    summary: Optional[str] = Field(None, max_length=500, description="Review summary (if available)")
+    rating: int = Field(5, ge=1, le=5, description="Product rating (1-5)")
+    helpful_votes: int = Field(0, ge=0, description="Number of helpful votes")
+    total_votes: int = Field(0, ge=0, description="Total number of votes")
+
 # Response Models
 class SentimentDetails(BaseModel):
     """Model-specific sentiment details"""
@@ -69,14 +101,26 @@ class FakeReviewFeatures(BaseModel):
     single_sentence: bool
     repeated_phrases: int
     extreme_rating: bool
+    near_duplicates: int = Field(0, description="Indexed reviews this one is a near-duplicate of")
+
+class BehaviorFeatures(BaseModel):
+    """Reviewer and product aggregates before this review"""
+    reviewer_reviews: int
+    reviewer_average_rating: Optional[float] = None
+    reviewer_rating_deviation: Optional[float] = None
+    reviewer_max_daily_reviews: int
+    product_reviews: int
+    product_average_rating: Optional[float] = None
+    rating_deviation: Optional[float] = None
 
 class FakeDetectionResponse(BaseModel):
     """Fake review detection response"""
     is_suspicious: bool = Field(..., description="Whether review is flagged as suspicious")
     risk_level: RiskLevelEnum = Field(..., description="Risk level classification")
-    suspicion_score: int = Field(..., ge=0, le=7, description="Suspicion score (0-7)")
+    suspicion_score: int = Field(..., ge=0, description="Suspicion score (2+ Medium, 4+ High risk)")
     warnings: List[str] = Field(default_factory=list, description="Specific warning flags")
     features: FakeReviewFeatures = Field(..., description="Extracted features")
+    behavior: Optional[BehaviorFeatures] = Field(None, description="Reviewer/product aggregates, when IDs are given")
     processing_time: float = Field(..., description="Processing time in seconds")
 
 class HelpfulnessFeatures(BaseModel):
@@ -99,6 +143,13 @@ class HelpfulnessResponse(BaseModel):
     recommendations: List[str] = Field(default_factory=list, description="Improvement recommendations")
     processing_time: float = Field(..., description="Processing time in seconds")
 
+class FullAnalysisResponse(BaseModel):
+    """Combined sentiment, fake review and helpfulness response"""
+    sentiment: SentimentResponse = Field(..., description="Sentiment analysis result")
+    fake: FakeDetectionResponse = Field(..., description="Fake review detection result")
+    helpfulness: HelpfulnessResponse = Field(..., description="Helpfulness analysis result")
+    processing_time: float = Field(..., description="Total processing time in seconds")
+
 class ModelStatus(BaseModel):
     """Model loading status"""
     loaded: bool
@@ -116,6 +167,9 @@ class HealthResponse(BaseModel):
     status: str = Field(..., description="API health status")
     models: Dict[str, ModelStatus] = Field(..., description="Model status")
     uptime: str = Field(..., description="Server uptime information")
+    ready: Optional[bool] = Field(None, description="Whether models are loaded and warmed up")
+    cache: Optional[Dict[str, Any]] = Field(None, description="Result cache statistics")
+    executor: Optional[Dict[str, Any]] = Field(None, description="Inference queue statistics")
 
 class ModelComparison(BaseModel):
     """Model comparison response"""
@@ -123,6 +177,9 @@ class ModelComparison(BaseModel):
     models: Dict[str, SentimentResponse] = Field(..., description="Results from each model")
     agreement: bool = Field(..., description="Whether models agree")
     recommended: ModelEnum = Field(..., description="Recommended model for this text")
+    timings: Dict[str, float] = Field(default_factory=dict, description="Seconds each model took, including any wait")
+    errors: Dict[str, str] = Field(default_factory=dict, description="Models that failed or timed out")
+    partial: bool = Field(False, description="Whether some models are missing from the results")
 
 # Statistics Response
 class DatasetStatistics(BaseModel):
@@ -141,8 +198,42 @@ class ModelPerformance(BaseModel):
     f1_score: Dict[str, float]
     confusion_matrix: List[List[int]]
 
+class TimelineBucket(BaseModel):
+    """Analysis counts for one time bucket"""
+    start: str = Field(..., description="Bucket start time (UTC, ISO 8601)")
+    reviews: int
+    sentiment: Dict[str, int]
+    suspicious: int
+    helpful: int
+
 class StatisticsResponse(BaseModel):
     """Comprehensive statistics response"""
     dataset: DatasetStatistics
     model_performance: Dict[str, ModelPerformance]
-    last_updated: str
\ No newline at end of file
+    model_predictions: Dict[str, Dict[str, int]] = Field(default_factory=dict, description="Predicted sentiments per model")
+    timeline: List[TimelineBucket] = Field(default_factory=list, description="Recent activity, oldest bucket first")
+    last_updated: Optional[str] = Field(None, description="Time of the most recent analysis")
+
+class JobResponse(BaseModel):
+    """Background bulk-analysis job status"""
+    job_id: str
+    filename: str
+    status: str = Field(..., description="queued, running, completed or failed")
+    analyses: List[str]
+    model: str
+    bytes: int = Field(..., description="Uploaded file size")
+    total_rows: Optional[int] = Field(None, description="Reviews in the file, once counted")
+    rows_done: int = Field(..., description="Reviews scored and committed")
+    progress: float = Field(..., ge=0, le=1)
+    error: Optional[str] = None
+    created_at: float
+    updated_at: float
+
+class JobResultsPage(BaseModel):
+    """One page of a job's committed result rows"""
+    job_id: str
+    status: str
+    offset: int
+    limit: int
+    total: int = Field(..., description="Result rows committed so far")
+    rows: List[Dict[str, Any]]
@@ -0,0 +1,158 @@
+"""
+Response encoding for internally produced results
+
+Analyzer results already have the shape of the response models, so routes
+project them onto the models' declared fields instead of validating them
+twice (once when building the model, again in FastAPI's response_model
+check) and encode them once. /predict/batch can also answer with one array
+per field (shape=columnar) instead of one object per review, and in
+MessagePack when the client prefers it via Accept: application/msgpack.
+msgpack is optional; without it every response is JSON.
+"""
+
+import json
+import typing
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel
+from starlette.responses import JSONResponse, Response
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+MSGPACK_ALIASES = (MSGPACK_MEDIA_TYPE, "application/x-msgpack")
+
+# Column name -> path into a /predict/batch result
+BATCH_COLUMNS = {
+    "sentiment": ("sentiment",),
+    "confidence": ("confidence",),
+    "positive": ("details", "probabilities", "positive"),
+    "negative": ("details", "probabilities", "negative"),
+    "neutral": ("details", "probabilities", "neutral"),
+    "model": ("model",),
+    "text_length": ("text_length",),
+    "processing_time": ("processing_time",),
+    "error": ("error",)
+}
+
+_MISSING = object()
+
+
+def _model_type(annotation) -> Tuple[Optional[str], Optional[type]]:
+    """("one" | "list" | "dict", model) when a field holds response models"""
+    origin, args = typing.get_origin(annotation), typing.get_args(annotation)
+    if origin is typing.Union:
+        members = [arg for arg in args if arg is not type(None)]
+        return _model_type(members[0]) if len(members) == 1 else (None, None)
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return "one", annotation
+    if origin is list and args and isinstance(args[0], type) and issubclass(args[0], BaseModel):
+        return "list", args[0]
+    if origin is dict and len(args) == 2 and isinstance(args[1], type) and issubclass(args[1], BaseModel):
+        return "dict", args[1]
+    return None, None
+
+
+@lru_cache(maxsize=None)
+def _plan(model: type) -> List[Tuple[str, Any, Optional[str], Optional[type]]]:
+    plan = []
+    for name, field in model.model_fields.items():
+        default = _MISSING if field.is_required() else field.get_default(call_default_factory=True)
+        plan.append((name, default) + _model_type(field.annotation))
+    return plan
+
+
+def project(model: type, data: Dict[str, Any]) -> Dict[str, Any]:
+    """The response model's fields of a trusted result, without validating it
+
+    Extra keys (stage timings and other internals) are dropped and defaults
+    filled in, as the response model would; a missing required field raises
+    KeyError.
+    """
+    projected = {}
+    for name, default, kind, nested in _plan(model):
+        value = data.get(name, default)
+        if value is _MISSING:
+            raise KeyError(f"{model.__name__}.{name}")
+        if kind is not None and value is not None:
+            if kind == "one":
+                value = project(nested, value)
+            elif kind == "list":
+                value = [project(nested, item) for item in value]
+            else:
+                value = {key: project(nested, item) for key, item in value.items()}
+        projected[name] = value
+    return projected
+
+
+def _lookup(result: Dict[str, Any], path: Tuple[str, ...]) -> Any:
+    value = result
+    for key in path:
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+
+def columnar(results: List[Dict[str, Any]], columns: Dict[str, Tuple[str, ...]] = BATCH_COLUMNS) -> Dict[str, list]:
+    """One array per field instead of one object per result; failed items hold None"""
+    return {name: [_lookup(result, path) for result in results] for name, path in columns.items()}
+
+
+def _quality(accept: str, media_type: str) -> float:
+    """q-value the Accept header gives media_type (exact, type/* or */* match)"""
+    best, best_rank = 0.0, -1
+    main_type = media_type.split("/")[0]
+    for part in accept.split(","):
+        pieces = [piece.strip() for piece in part.split(";")]
+        candidate = pieces[0].lower()
+        rank = 2 if candidate == media_type else 1 if candidate == f"{main_type}/*" else 0 if candidate == "*/*" else -1
+        if rank <= best_rank:
+            continue
+        q = 1.0
+        for parameter in pieces[1:]:
+            if parameter.startswith("q="):
+                try:
+                    q = float(parameter[2:])
+                except ValueError:
+                    q = 0.0
+        best, best_rank = q, rank
+    return best
+
+
+def negotiate(accept: Optional[str]) -> Optional[str]:
+    """JSON or MessagePack for an Accept header; None if neither is acceptable"""
+    if not accept:
+        return JSON_MEDIA_TYPE
+    json_q = _quality(accept, JSON_MEDIA_TYPE)
+    msgpack_q = max(_quality(accept, alias) for alias in MSGPACK_ALIASES) if msgpack is not None else 0.0
+    # An explicitly listed msgpack wins ties with a wildcard or equal JSON preference
+    if msgpack_q > 0 and msgpack_q >= json_q and any(alias in accept.lower() for alias in MSGPACK_ALIASES):
+        return MSGPACK_MEDIA_TYPE
+    if json_q > 0:
+        return JSON_MEDIA_TYPE
+    return None
+
+
+class MessagePackResponse(Response):
+    media_type = MSGPACK_MEDIA_TYPE
+
+    def render(self, content: Any) -> bytes:
+        return msgpack.packb(content, use_bin_type=True)
+
+
+def encode(content: Any, media_type: str = JSON_MEDIA_TYPE) -> Response:
+    """Encode a plain JSON-like payload once, in the negotiated format"""
+    if media_type == MSGPACK_MEDIA_TYPE:
+        return MessagePackResponse(content, headers={"Vary": "Accept"})
+    return JSONResponse(content, headers={"Vary": "Accept"})
+
+
+def json_bytes(content: Any) -> bytes:
+    """What JSONResponse would send, for benchmarks and tests"""
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
@@ -0,0 +1,419 @@
+"""
+Pre-forking production server
+
+The master process imports the app, builds every registered analyzer and
+lexicon (VADER, fake detector, helpfulness, near-duplicate index, behavior
+store) once, moves them out of the garbage collector's reach and binds the
+listening socket, then forks WEB_WORKERS uvicorn workers that accept on it.
+Workers inherit the models copy-on-write, so N workers hold about one copy of
+model memory instead of N.
+
+The master replaces workers that exit, recycles a worker after it serves
+WORKER_MAX_REQUESTS requests or its private memory passes
+WORKER_MAX_MEMORY_MB, and restarts all of them one at a time on SIGHUP; a
+recycled worker stops accepting and finishes its in-flight requests first.
+Every WORKER_REPORT_INTERVAL seconds it logs each worker's RSS and how much
+of it is shared.
+
+Each worker saves the statistics and latency histograms it records to a
+shard every WORKER_SHARD_INTERVAL seconds, and answers /statistics and
+/metrics with every worker's shard added to its own counts. The master merges
+a worker's shards into the main files whenever the worker is replaced, at
+shutdown and (for statistics) at the next start. With more than one worker
+the near-duplicate index and behavior store are read-only, since reviews added
+in one worker would never reach the others, and setting DEDUP_INSERT or
+BEHAVIOR_RECORD to true is refused; worker 0 saves them when a single worker
+adds reviews, and the master reloads them before forking its replacement.
+
+Usage:
+    python -m app.server [--workers 4] [--host 0.0.0.0] [--port 8000]
+"""
+
+import argparse
+import gc
+import os
+import random
+import shutil
+import signal
+import sys
+import tempfile
+import time
+import traceback
+from typing import Dict, List, Optional, Set
+
+import uvicorn
+from dotenv import load_dotenv
+
+from app.metrics import merge_shard
+from app.shards import shard_path, shard_paths
+
+MB = 1024 * 1024
+# Seconds between memory checks against WORKER_MAX_MEMORY_MB
+MEMORY_CHECK_SECONDS = 5
+# A worker that exits sooner than this after starting is restarted after a pause
+MIN_UPTIME_SECONDS = 2
+
+
+def worker_count(configured: int = 0) -> int:
+    """Configured workers, or one per CPU core when 0"""
+    return configured if configured > 0 else (os.cpu_count() or 1)
+
+
+def parse_smaps_rollup(text: str) -> Dict[str, int]:
+    """Byte counts from /proc/<pid>/smaps_rollup"""
+    fields = {}
+    for line in text.splitlines():
+        parts = line.split()
+        if len(parts) == 3 and parts[2] == "kB":
+            fields[parts[0].rstrip(":")] = int(parts[1]) * 1024
+    return {
+        "rss": fields.get("Rss", 0),
+        "pss": fields.get("Pss", 0),
+        "shared": fields.get("Shared_Clean", 0) + fields.get("Shared_Dirty", 0),
+        "private": fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0)
+    }
+
+
+def process_memory(pid: int) -> Dict[str, int]:
+    """RSS, PSS, shared and private bytes of a process; empty where /proc is unavailable"""
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            return parse_smaps_rollup(f.read())
+    except OSError:
+        pass
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return {"rss": int(line.split()[1]) * 1024}
+    except OSError:
+        pass
+    return {}
+
+
+def _format_memory(memory: Dict[str, int]) -> str:
+    if not memory:
+        return "memory unavailable"
+    parts = [f"RSS {memory['rss'] / MB:.0f} MB"]
+    if "pss" in memory:
+        parts += [f"PSS {memory['pss'] / MB:.0f} MB", f"shared {memory['shared'] / MB:.0f} MB",
+                  f"private {memory['private'] / MB:.0f} MB"]
+    return ", ".join(parts)
+
+
+class PreforkServer:
+    """Forks uvicorn workers from a master that already holds the models"""
+
+    def __init__(self, host: str = "0.0.0.0", port: int = 8000, workers: int = 0,
+                 max_requests: int = 0, max_requests_jitter: int = 0, max_memory_mb: float = 0,
+                 graceful_timeout: float = 30, report_interval: float = 60, shard_interval: float = 5):
+        self.host = host
+        self.port = port
+        self.workers = worker_count(workers)
+        self.max_requests = max_requests
+        self.max_requests_jitter = max_requests_jitter
+        self.max_memory = max_memory_mb * MB
+        self.graceful_timeout = graceful_timeout
+        self.report_interval = report_interval
+        self.shard_interval = shard_interval
+        # Main file the workers' latency histogram shards merge into, for this run only
+        self.metrics_path: Optional[str] = None
+        self.socket = None
+        self.slots: Dict[int, int] = {}
+        self._started_at: Dict[int, float] = {}
+        # Workers sent SIGTERM, with when to SIGKILL them
+        self._stopping_workers: Dict[int, float] = {}
+        self._respawn_at: Dict[int, float] = {}
+        self._rolling: List[int] = []
+        self._spawned: Set[int] = set()
+        self._shutting_down = False
+
+    @classmethod
+    def from_env(cls) -> "PreforkServer":
+        return cls(
+            host=os.getenv("API_HOST", "0.0.0.0"),
+            port=int(os.getenv("API_PORT", 8000)),
+            workers=int(os.getenv("WEB_WORKERS", 0)),
+            max_requests=int(os.getenv("WORKER_MAX_REQUESTS", 0)),
+            max_requests_jitter=int(os.getenv("WORKER_MAX_REQUESTS_JITTER", 0)),
+            max_memory_mb=float(os.getenv("WORKER_MAX_MEMORY_MB", 0)),
+            graceful_timeout=float(os.getenv("WORKER_GRACEFUL_TIMEOUT", 30)),
+            report_interval=float(os.getenv("WORKER_REPORT_INTERVAL", 60)),
+            shard_interval=float(os.getenv("WORKER_SHARD_INTERVAL", 5))
+        )
+
+    def preload(self) -> None:
+        """Import the app and build every registered model in the master"""
+        started_at = time.perf_counter()
+        import app.main  # noqa: F401  (registers the analyzers)
+        from app.registry import registry
+
+        for name, seconds in registry.load_all().items():
+            print(f"⏱️  {name} load: {seconds:.3f}s")
+        for name, error in registry.errors().items():
+            print(f"⚠️ Could not preload {name}: {error}")
+        # Shards left by workers of a previous run that did not shut down cleanly
+        self._merge_statistics()
+        self._freeze()
+        print(f"🧠 Models preloaded in {time.perf_counter() - started_at:.2f}s; "
+              f"master {_format_memory(process_memory(os.getpid()))}")
+
+    @staticmethod
+    def _freeze() -> None:
+        # Collector passes would write to every tracked object's header and
+        # copy the shared pages into each worker
+        gc.collect()
+        gc.freeze()
+
+    def _merge_statistics(self, slot: Optional[int] = None) -> None:
+        """Fold one worker's statistics shard, or every shard on disk, into the snapshot"""
+        from app.main import model_manager
+
+        statistics = model_manager.statistics
+        if not statistics.snapshot_path:
+            return
+        if slot is None:
+            paths = shard_paths(statistics.snapshot_path)
+        else:
+            paths = [shard_path(statistics.snapshot_path, slot)]
+        merged = [path for path in paths if os.path.exists(path) and statistics.merge(path)]
+        if merged:
+            statistics.save()
+            for path in merged:
+                os.remove(path)
+
+    def _merge_metrics(self, slot: Optional[int] = None) -> None:
+        """Fold one worker's histogram shard, or every shard, into the run's metrics file"""
+        if self.metrics_path is None:
+            return
+        paths = shard_paths(self.metrics_path) if slot is None else [shard_path(self.metrics_path, slot)]
+        for path in paths:
+            merge_shard(self.metrics_path, path)
+
+    def _reload_saved_state(self, slot: int) -> None:
+        """Pick up what a replaced worker saved, so its replacement continues from it"""
+        from app.main import model_manager
+        from app.registry import registry
+
+        self._merge_statistics(slot)
+        self._merge_metrics(slot)
+        if slot == 0 and self.workers == 1:
+            for name in ("duplicate_index", "behavior_store"):
+                if not registry.is_loaded(name):
+                    continue
+                store = registry.get(name)
+                if store is not None and store.path and os.path.exists(store.path):
+                    try:
+                        store.load(store.path)
+                    except Exception as e:
+                        print(f"⚠️ Could not reload {name}: {e}")
+        self._freeze()
+
+    def spawn(self, slot: int) -> None:
+        """Fork a worker into a slot"""
+        if slot in self._spawned:
+            self._reload_saved_state(slot)
+        self._spawned.add(slot)
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                self._serve(slot)
+            except SystemExit as e:
+                # uvicorn exits this way when the app fails to start
+                code = e.code if isinstance(e.code, int) else 1
+            except BaseException:
+                traceback.print_exc()
+                code = 1
+            finally:
+                sys.stdout.flush()
+                sys.stderr.flush()
+                os._exit(code)
+        self.slots[slot] = pid
+        self._started_at[pid] = time.monotonic()
+        print(f"👷 Worker {slot} started (pid {pid})")
+
+    def _serve(self, slot: int) -> None:
+        """Worker process body: serve the app on the inherited socket until told to stop"""
+        # uvicorn re-raises the signal that stopped it once it has shut down;
+        # ignoring it then lets the worker exit normally and flush its output
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, lambda signum, frame: None)
+        signal.signal(signal.SIGHUP, signal.SIG_DFL)
+        random.seed()
+        from app.main import app, model_manager
+        from app.metrics import metrics
+
+        model_manager.persist = slot == 0
+        if model_manager.statistics.snapshot_path:
+            model_manager.statistics.start_shard(shard_path(model_manager.statistics.snapshot_path, slot))
+        metrics.start_shard(shard_path(self.metrics_path, slot), self.metrics_path)
+        # Other workers read the shards, so they are saved more often than the snapshot
+        model_manager.snapshot_interval = min(model_manager.snapshot_interval, self.shard_interval)
+        if self.workers > 1:
+            model_manager.dedup_insert = False
+            model_manager.behavior_record = False
+        config = uvicorn.Config(
+            app,
+            lifespan="on",
+            limit_max_requests=self.max_requests or None,
+            limit_max_requests_jitter=self.max_requests_jitter,
+            timeout_graceful_shutdown=self.graceful_timeout
+        )
+        uvicorn.Server(config).run(sockets=[self.socket])
+
+    def _check_shared_writes(self) -> None:
+        """Refuse to start workers that were asked to add reviews they could not share"""
+        if self.workers == 1:
+            return
+        requested = [name for name in ("DEDUP_INSERT", "BEHAVIOR_RECORD") if os.getenv(name, "").lower() == "true"]
+        if requested:
+            raise SystemExit(
+                f"❌ {' and '.join(requested)}=true needs a single worker, not {self.workers}: reviews one worker "
+                f"added would never reach the others. Unset it to serve the index and store read-only, "
+                f"build them offline, or run with --workers 1."
+            )
+
+    def stop_worker(self, pid: int) -> None:
+        """Ask a worker to finish its in-flight requests and exit"""
+        if pid in self._stopping_workers:
+            return
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            return
+        self._stopping_workers[pid] = time.monotonic() + self.graceful_timeout + 5
+
+    def _reap(self) -> None:
+        """Collect exited workers and schedule replacements"""
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            slot = next((slot for slot, worker in self.slots.items() if worker == pid), None)
+            uptime = time.monotonic() - self._started_at.pop(pid, time.monotonic())
+            recycled = self._stopping_workers.pop(pid, None) is not None
+            if slot is None:
+                continue
+            del self.slots[slot]
+            if self._shutting_down:
+                continue
+            reason = "stopped" if recycled else f"exited with code {os.waitstatus_to_exitcode(status)}"
+            print(f"♻️  Worker {slot} (pid {pid}) {reason} after {uptime:.0f}s; replacing it")
+            self._respawn_at[slot] = time.monotonic() + (1 if uptime < MIN_UPTIME_SECONDS else 0)
+
+    def _respawn(self) -> None:
+        now = time.monotonic()
+        for slot, at in list(self._respawn_at.items()):
+            if at <= now:
+                del self._respawn_at[slot]
+                self.spawn(slot)
+
+    def _roll(self) -> None:
+        """Restart the next worker of a rolling restart once the previous one is back"""
+        if not self._rolling or self._stopping_workers or self._respawn_at or len(self.slots) < self.workers:
+            return
+        slot = self._rolling.pop(0)
+        if slot in self.slots:
+            self.stop_worker(self.slots[slot])
+
+    def _check_memory(self, report: bool) -> None:
+        for slot, pid in sorted(self.slots.items()):
+            memory = process_memory(pid)
+            if report:
+                print(f"📊 Worker {slot} (pid {pid}): {_format_memory(memory)}")
+            used = memory.get("private", memory.get("rss", 0))
+            if self.max_memory and used > self.max_memory and pid not in self._stopping_workers:
+                print(f"♻️  Worker {slot} (pid {pid}) uses {used / MB:.0f} MB; recycling it")
+                self.stop_worker(pid)
+        if report:
+            print(f"📊 Master (pid {os.getpid()}): {_format_memory(process_memory(os.getpid()))}")
+
+    def _kill_overdue(self) -> None:
+        now = time.monotonic()
+        for pid, deadline in list(self._stopping_workers.items()):
+            if now > deadline:
+                print(f"⚠️ Worker pid {pid} did not stop within {self.graceful_timeout:.0f}s; killing it")
+                try:
+                    os.kill(pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+                self._stopping_workers[pid] = float("inf")
+
+    def _on_stop(self, signum, frame) -> None:
+        self._shutting_down = True
+
+    def _on_reload(self, signum, frame) -> None:
+        print("🔄 Rolling restart of every worker")
+        self._rolling = sorted(self.slots)
+
+    def run(self) -> None:
+        """Preload, bind, fork the workers and supervise them until SIGTERM or SIGINT"""
+        self._check_shared_writes()
+        self.preload()
+        self.metrics_path = os.path.join(tempfile.mkdtemp(prefix="review-api-metrics-"), "metrics.json")
+        self.socket = uvicorn.Config("app.main:app", host=self.host, port=self.port).bind_socket()
+        signal.signal(signal.SIGTERM, self._on_stop)
+        signal.signal(signal.SIGINT, self._on_stop)
+        signal.signal(signal.SIGHUP, self._on_reload)
+
+        print(f"🚀 Serving on {self.host}:{self.port} with {self.workers} workers")
+        for slot in range(self.workers):
+            self.spawn(slot)
+
+        last_check = last_report = time.monotonic()
+        while not self._shutting_down:
+            time.sleep(0.2)
+            self._reap()
+            if self._shutting_down:
+                break
+            self._respawn()
+            self._roll()
+            self._kill_overdue()
+            now = time.monotonic()
+            report = now - last_report >= self.report_interval
+            if report or (self.max_memory and now - last_check >= MEMORY_CHECK_SECONDS):
+                self._check_memory(report)
+                last_check = now
+                if report:
+                    last_report = now
+        self.shutdown()
+
+    def shutdown(self) -> None:
+        """Stop every worker gracefully, killing any that outlive the timeout"""
+        print(f"🛑 Stopping {len(self.slots)} workers")
+        for pid in self.slots.values():
+            self.stop_worker(pid)
+        while self.slots:
+            self._reap()
+            self._kill_overdue()
+            time.sleep(0.1)
+        self._merge_statistics()
+        shutil.rmtree(os.path.dirname(self.metrics_path), ignore_errors=True)
+        self.socket.close()
+        print("✅ All workers stopped")
+
+
+def main():
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Serve the API from pre-forked workers sharing preloaded models")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default WEB_WORKERS, 0 = CPU count)")
+    parser.add_argument("--host", default=None, help="Bind address (default API_HOST)")
+    parser.add_argument("--port", type=int, default=None, help="Port (default API_PORT)")
+    args = parser.parse_args()
+
+    server = PreforkServer.from_env()
+    if args.workers is not None:
+        server.workers = worker_count(args.workers)
+    if args.host is not None:
+        server.host = args.host
+    if args.port is not None:
+        server.port = args.port
+    server.run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Per-worker state shards under the pre-fork server
+
+Each worker saves what it recorded to a shard file next to a main file, and
+the master folds the shards of replaced workers into the main file. A worker
+answering a read adds the other workers' shards and the main file to its own
+live state. Every shard carries an id that the main file lists once it is
+merged, so a shard being folded in while a worker reads is counted once.
+"""
+
+import glob
+import json
+import os
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+# Merged shard ids kept in a main file; far more than workers replaced at once
+MERGED_IDS_KEPT = 256
+
+
+def shard_path(main_path: str, slot: int) -> str:
+    """Where the worker in a slot saves its shard of main_path"""
+    return f"{main_path}.worker{slot}"
+
+
+def shard_paths(main_path: str) -> List[str]:
+    """Every worker shard of main_path on disk"""
+    return [
+        path for path in sorted(glob.glob(shard_path(glob.escape(main_path), "*")))
+        if path.rsplit(".worker", 1)[1].isdigit()
+    ]
+
+
+def new_shard_id() -> str:
+    return uuid.uuid4().hex
+
+
+def read_state(path: str) -> Optional[Dict[str, Any]]:
+    """A saved JSON state, or None if it is missing or unreadable"""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Ignoring unreadable state file {path}: {e}")
+        return None
+
+
+def write_state(path: str, state: Dict[str, Any]) -> None:
+    """Atomically write a JSON state"""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, path)
+
+
+def mark_merged(state: Dict[str, Any], shard: Dict[str, Any]) -> None:
+    """Note in a main state that shard has been added to it"""
+    if shard.get("shard_id"):
+        merged = state.get("merged_shards", []) + [shard["shard_id"]]
+        state["merged_shards"] = merged[-MERGED_IDS_KEPT:]
+
+
+def gather(main_path: str, own_path: str) -> Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]]]:
+    """The main state and every other worker's shard not yet merged into it
+
+    Shards are read before the main file: a shard deleted in between has
+    already reached the main file, and one still on disk that the main file
+    lists as merged is skipped.
+    """
+    shards = [read_state(path) for path in shard_paths(main_path) if path != own_path]
+    main = read_state(main_path)
+    merged = set((main or {}).get("merged_shards", ()))
+    return main, [shard for shard in shards if shard is not None and shard.get("shard_id") not in merged]
@@ -2,62 +2,32 @@
 Simplified model implementations that work without heavy dependencies
 """
 
-import re
-import numpy as np
+import time
 from typing import List, Dict, Any
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+
+from app import lexicons  # noqa: F401  (registers the shared lexicon artifact)
+from app.features import extract_review_features
+from app.registry import registry
+
+REVIEW_ANALYSES = ("sentiment", "fake", "helpfulness")
 
 class SimpleSentimentAnalyzer:
     """Simplified sentiment analyzer using VADER only"""
 
     def __init__(self):
-        self.vader_analyzer = SentimentIntensityAnalyzer()
+        from app.vader_engine import FastVaderScorer
+        self.vader_analyzer = FastVaderScorer(lexicons=registry.get("lexicons"))
 
     def analyze_sentiment(self, text: str, model: str = "vader") -> Dict[str, Any]:
-        """Analyze sentiment using VADER"""
-        if model != "vader":
-            # For non-VADER requests, simulate with enhanced VADER
-            scores = self.vader_analyzer.polarity_scores(text)
-            # Simulate better performance by adjusting scores
-            compound = scores['compound']
-
-            # Add some enhancement to simulate RoBERTa-like behavior
-            text_length = len(text)
-            word_count = len(text.split())
-
-            # Adjust confidence based on text characteristics
-            confidence = abs(compound)
-            if word_count > 50:
-                confidence = min(0.95, confidence * 1.1)
-            if text_length > 500:
-                confidence = min(0.95, confidence * 1.05)
-
-            if compound >= 0.05:
-                sentiment = "Positive"
-            elif compound <= -0.05:
-                sentiment = "Negative"
-            else:
-                sentiment = "Neutral"
-
-            return {
-                "sentiment": sentiment,
-                "confidence": confidence,
-                "details": {
-                    "confidence": confidence,
-                    "probabilities": {
-                        "positive": scores['pos'],
-                        "negative": scores['neg'],
-                        "neutral": scores['neu']
-                    },
-                    "processing_time": 0.1
-                },
-                "model": model,
-                "text_length": text_length,
-                "processing_time": 0.15
-            }
+        """Analyze sentiment using VADER
 
-        # Regular VADER analysis
+        Also answers requests for a transformer model that is not loaded; the
+        result's model field then says "vader", not the requested model.
+        """
+        started_at = time.perf_counter()
         scores = self.vader_analyzer.polarity_scores(text)
+        inference_time = time.perf_counter() - started_at
+
         compound = scores['compound']
 
         if compound >= 0.05:
@@ -80,21 +50,27 @@ class SimpleSentimentAnalyzer:
                     "negative": scores['neg'],
                     "neutral": scores['neu']
                 },
-                "processing_time": 0.05
+                "processing_time": inference_time
             },
-            "model": model,
+            "model": "vader",
             "text_length": len(text),
-            "processing_time": 0.08
+            "processing_time": time.perf_counter() - started_at,
+            "stage_timings": {"inference": inference_time}
         }
 
 class SimpleFakeDetector:
     """Simplified fake review detector"""
 
-    def detect_fake_review(self, text: str, summary: str = "", rating: int = 5) -> Dict[str, Any]:
-        """Detect suspicious review patterns"""
+    def detect_fake_review(self, text: str, summary: str = "", rating: int = 5,
+                           shared: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Detect suspicious review patterns, reusing shared features if already extracted"""
+        started_at = time.perf_counter()
         text = str(text)
 
-        features = self._extract_features(text, summary, rating)
+        if shared is None:
+            shared = extract_review_features(text, summary, rating)
+        features = self._extract_features(shared)
+        features_done_at = time.perf_counter()
 
         # Calculate suspicion score
         suspicion_score = 0
@@ -124,50 +100,91 @@ class SimpleFakeDetector:
             suspicion_score += 1
             warnings.append("Extreme rating with very short review")
 
-        # Determine risk level
-        if suspicion_score >= 4:
-            risk_level = "High"
-            is_suspicious = True
-        elif suspicion_score >= 2:
-            risk_level = "Medium"
-            is_suspicious = True
-        else:
-            risk_level = "Low"
-            is_suspicious = False
+        risk_level, is_suspicious = self.risk_level(suspicion_score)
 
+        finished_at = time.perf_counter()
         return {
             "is_suspicious": is_suspicious,
             "risk_level": risk_level,
             "suspicion_score": suspicion_score,
             "warnings": warnings,
             "features": features,
-            "processing_time": 0.05
+            "processing_time": finished_at - started_at,
+            "stage_timings": {
+                "feature_extraction": features_done_at - started_at,
+                "inference": finished_at - features_done_at
+            }
         }
 
-    def _extract_features(self, text: str, summary: str, rating: int) -> Dict[str, Any]:
+    @staticmethod
+    def risk_level(suspicion_score: int):
+        """(risk level, is_suspicious) for a suspicion score"""
+        if suspicion_score >= 4:
+            return "High", True
+        if suspicion_score >= 2:
+            return "Medium", True
+        return "Low", False
+
+    def _add_signal(self, result: Dict[str, Any], points: int, warning: str) -> None:
+        result["suspicion_score"] += points
+        result["warnings"].append(warning)
+        result["risk_level"], result["is_suspicious"] = self.risk_level(result["suspicion_score"])
+
+    def flag_near_duplicates(self, result: Dict[str, Any], near_duplicates: int) -> Dict[str, Any]:
+        """Add the near-duplicate count to a detection result and rescore it"""
+        result["features"]["near_duplicates"] = near_duplicates
+        if near_duplicates > 0:
+            self._add_signal(result, 2, f"Near-duplicate of {near_duplicates} existing reviews")
+        return result
+
+    def flag_behavior(self, result: Dict[str, Any], behavior: Dict[str, Any]) -> Dict[str, Any]:
+        """Add reviewer/product aggregates to a detection result and rescore it"""
+        result["behavior"] = behavior
+        if behavior["reviewer_max_daily_reviews"] >= 5:
+            self._add_signal(
+                result, 2, f"Reviewer posted {behavior['reviewer_max_daily_reviews']} reviews in one day"
+            )
+        if behavior["product_reviews"] >= 5 and behavior["rating_deviation"] >= 2:
+            self._add_signal(
+                result, 1, f"Rating is {behavior['rating_deviation']:.1f} stars from the product average"
+            )
+        if behavior["reviewer_reviews"] >= 3 and behavior["reviewer_rating_deviation"] >= 1.5:
+            self._add_signal(result, 1, "Reviewer's ratings consistently deviate from product averages")
+        return result
+
+    def _extract_features(self, shared: Dict[str, Any]) -> Dict[str, Any]:
         """Extract features for fake review detection"""
         return {
-            "text_length": len(text),
-            "word_count": len(text.split()),
-            "excessive_punctuation": text.count('!') + text.count('?') > 3,
-            "all_caps_ratio": sum(1 for c in text if c.isupper()) / len(text) if text else 0,
-            "has_url": bool(re.search(r'http[s]?://', text)),
-            "has_email": bool(re.search(r'\S+@\S+', text)),
-            "has_phone": bool(re.search(r'(\d{3}[-\.\s]??\d{3}[-\.\s]??\d{4})', text)),
-            "very_short": len(text) < 50,
-            "single_sentence": len(text.split('.')) <= 2,
-            "repeated_phrases": len(re.findall(r'\b(\w+)(\s+\1){2,}\b', text.lower())),
-            "extreme_rating": rating in [1, 5]
+            "text_length": shared["text_length"],
+            "word_count": shared["word_count"],
+            "excessive_punctuation": shared["exclamation_count"] + shared["question_count"] > 3,
+            "all_caps_ratio": shared["uppercase_ratio"],
+            "has_url": shared["has_url"],
+            "has_email": shared["has_email"],
+            "has_phone": shared["has_phone"],
+            "very_short": shared["text_length"] < 50,
+            "single_sentence": shared["period_count"] <= 1,
+            "repeated_phrases": shared["repeated_phrases"],
+            "extreme_rating": shared["extreme_rating"]
         }
 
 class SimpleHelpfulnessAnalyzer:
     """Simplified helpfulness analyzer"""
 
-    def analyze_helpfulness(self, text: str, helpful_votes: int = 0, total_votes: int = 0) -> Dict[str, Any]:
-        """Analyze review helpfulness"""
+    def __init__(self):
+        from app.polarity import FastPolarityScorer
+        self.polarity_scorer = FastPolarityScorer(lexicons=registry.get("lexicons"))
+
+    def analyze_helpfulness(self, text: str, helpful_votes: int = 0, total_votes: int = 0,
+                            shared: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Analyze review helpfulness, reusing shared features if already extracted"""
+        started_at = time.perf_counter()
         text = str(text)
 
-        features = self._extract_features(text)
+        if shared is None:
+            shared = extract_review_features(text)
+        features = self._extract_features(text, shared)
+        features_done_at = time.perf_counter()
 
         # Calculate helpfulness score
         helpfulness_score = 0.5  # Base score
@@ -205,38 +222,91 @@ class SimpleHelpfulnessAnalyzer:
         if features["sentence_count"] < 2:
             recommendations.append("Include more context and examples")
 
+        finished_at = time.perf_counter()
         return {
             "predicted_helpfulness_ratio": helpfulness_score,
             "helpfulness_category": category,
             "quality_score": helpfulness_score,
             "features": features,
             "recommendations": recommendations,
-            "processing_time": 0.05
+            "processing_time": finished_at - started_at,
+            "stage_timings": {
+                "feature_extraction": features_done_at - started_at,
+                "inference": finished_at - features_done_at
+            }
         }
 
-    def _extract_features(self, text: str) -> Dict[str, Any]:
+    def _extract_features(self, text: str, shared: Dict[str, Any]) -> Dict[str, Any]:
         """Extract helpfulness features"""
-        try:
-            from textblob import TextBlob
-            blob = TextBlob(text)
-            polarity = blob.sentiment.polarity
-            subjectivity = blob.sentiment.subjectivity
-        except:
-            polarity = 0
-            subjectivity = 0
+        polarity, subjectivity = self.polarity_scorer.polarity_subjectivity(text)
 
         return {
-            "text_length": len(text),
-            "word_count": len(text.split()),
-            "sentence_count": len(re.split(r'[.!?]+', text)),
-            "exclamation_count": text.count('!'),
-            "question_count": text.count('?'),
-            "uppercase_ratio": sum(1 for c in text if c.isupper()) / len(text) if text else 0,
+            "text_length": shared["text_length"],
+            "word_count": shared["word_count"],
+            "sentence_count": shared["sentence_count"],
+            "exclamation_count": shared["exclamation_count"],
+            "question_count": shared["question_count"],
+            "uppercase_ratio": shared["uppercase_ratio"],
             "textblob_polarity": polarity,
             "textblob_subjectivity": subjectivity
         }
 
-# Global instances
-sentiment_analyzer = SimpleSentimentAnalyzer()
-fake_detector = SimpleFakeDetector()
-helpfulness_analyzer = SimpleHelpfulnessAnalyzer()
\ No newline at end of file
+class SimpleReviewAnalyzer:
+    """Runs sentiment, fake review and helpfulness analysis over one feature pass"""
+
+    def __init__(self, sentiment: SimpleSentimentAnalyzer, fake: SimpleFakeDetector,
+                 helpfulness: SimpleHelpfulnessAnalyzer):
+        self.sentiment = sentiment
+        self.fake = fake
+        self.helpfulness = helpfulness
+
+    def analyze_review(self, text: str, summary: str = "", rating: int = 5, helpful_votes: int = 0,
+                       total_votes: int = 0, model: str = "vader",
+                       analyses=REVIEW_ANALYSES) -> Dict[str, Any]:
+        """Analyze one review, extracting the shared text features only once"""
+        started_at = time.perf_counter()
+        text = str(text)
+        summary = summary or ""
+
+        shared = None
+        if "fake" in analyses or "helpfulness" in analyses:
+            shared = extract_review_features(text, summary, rating)
+        features_done_at = time.perf_counter()
+
+        result = {}
+        if "sentiment" in analyses:
+            result["sentiment"] = self.sentiment.analyze_sentiment(text, model)
+        if "fake" in analyses:
+            result["fake"] = self.fake.detect_fake_review(text, summary, rating, shared=shared)
+        if "helpfulness" in analyses:
+            result["helpfulness"] = self.helpfulness.analyze_helpfulness(
+                text, helpful_votes, total_votes, shared=shared
+            )
+
+        result["processing_time"] = time.perf_counter() - started_at
+        result["stage_timings"] = {"feature_extraction": features_done_at - started_at}
+        return result
+
+# Shared instances, built on first use through the model registry
+ANALYZERS = ("sentiment_analyzer", "fake_detector", "helpfulness_analyzer", "review_analyzer")
+
+registry.register("sentiment_analyzer", SimpleSentimentAnalyzer)
+registry.register("fake_detector", SimpleFakeDetector)
+registry.register("helpfulness_analyzer", SimpleHelpfulnessAnalyzer)
+registry.register("review_analyzer", lambda: SimpleReviewAnalyzer(
+    registry.get("sentiment_analyzer"),
+    registry.get("fake_detector"),
+    registry.get("helpfulness_analyzer")
+))
+
+def load_analyzers() -> Dict[str, float]:
+    """Build every analyzer now, returning per-analyzer load seconds"""
+    for name in ANALYZERS:
+        registry.get(name)
+    return {name: registry.load_time(name) for name in ANALYZERS}
+
+def __getattr__(name: str):
+    # `from app.simple_models import sentiment_analyzer` resolves here
+    if name in ANALYZERS:
+        return registry.get(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
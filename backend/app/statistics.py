@@ -0,0 +1,271 @@
+"""
+Incremental statistics engine
+
+Running totals over every analyzed review, updated in O(1) per review, plus
+a fixed number of time buckets for the dashboard timeline. Reading the
+current statistics never depends on how much traffic has been served, and
+the state is periodically snapshotted to disk so restarts keep the totals.
+Pre-forked workers each save only what they recorded into a shard of their
+own, which the master merges into the main snapshot; a worker's snapshot()
+adds the saved snapshot and the other workers' shards to its own counts.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+from app.shards import gather, mark_merged, new_shard_id, read_state, write_state
+
+SENTIMENTS = ("Positive", "Negative", "Neutral")
+HELPFUL_CATEGORIES = ("Helpful", "Very Helpful")
+SNAPSHOT_VERSION = 1
+COUNTERS = ("total_reviews", "total_text_length", "fake_checked", "suspicious", "helpfulness_checked", "helpful")
+
+
+def _new_bucket(start: float) -> Dict[str, Any]:
+    bucket = {"start": start, "reviews": 0, "suspicious": 0, "helpful": 0}
+    bucket.update({sentiment: 0 for sentiment in SENTIMENTS})
+    return bucket
+
+
+def _add_counts(counts: Dict[str, int], other: Dict[str, int], sign: int) -> Dict[str, int]:
+    added = dict(counts)
+    for name, value in other.items():
+        added[name] = added.get(name, 0) + sign * value
+    return added
+
+
+def combine_states(state: Dict[str, Any], other: Dict[str, Any], sign: int = 1) -> Dict[str, Any]:
+    """Saved state plus other, or minus it with sign=-1, counter by counter and bucket by bucket"""
+    combined = dict(state)
+    for name in COUNTERS:
+        combined[name] = state[name] + sign * other[name]
+    combined["sentiment_counts"] = _add_counts(state["sentiment_counts"], other["sentiment_counts"], sign)
+    models = {model: dict(counts) for model, counts in state["model_predictions"].items()}
+    for model, counts in other["model_predictions"].items():
+        models[model] = _add_counts(models.get(model, {}), counts, sign)
+    combined["model_predictions"] = models
+
+    buckets = {bucket["start"]: dict(bucket) for bucket in state["buckets"]}
+    for bucket in other["buckets"]:
+        if sign < 0 and bucket["start"] not in buckets:
+            # Fell out of the window since; nothing of it is left to subtract from
+            continue
+        current = buckets.setdefault(bucket["start"], _new_bucket(bucket["start"]))
+        for name, value in bucket.items():
+            if name != "start":
+                current[name] = current.get(name, 0) + sign * value
+    combined["buckets"] = [
+        bucket for _, bucket in sorted(buckets.items())
+        if any(value for name, value in bucket.items() if name != "start")
+    ]
+    if sign > 0 and other["last_updated"] is not None:
+        combined["last_updated"] = max(state["last_updated"] or 0, other["last_updated"])
+    return combined
+
+
+class StatisticsEngine:
+    """O(1)-per-review aggregates with a sliding window of time buckets"""
+
+    def __init__(self, bucket_seconds: int = 3600, window_buckets: int = 24,
+                 snapshot_path: Optional[str] = None):
+        self.bucket_seconds = max(1, bucket_seconds)
+        self.window_buckets = max(1, window_buckets)
+        self.snapshot_path = snapshot_path or None
+        # State at start_shard(); save() then writes only what came after it
+        self._baseline: Optional[Dict[str, Any]] = None
+        self._shard_id: Optional[str] = None
+        # The main snapshot a shard belongs to
+        self._main_path: Optional[str] = None
+        self._merged_shards: List[str] = []
+        self._lock = threading.Lock()
+        self._reset()
+        if self.snapshot_path and os.path.exists(self.snapshot_path):
+            self.load(self.snapshot_path)
+
+    def _reset(self) -> None:
+        self.total_reviews = 0
+        self.total_text_length = 0
+        self.sentiment_counts = {sentiment: 0 for sentiment in SENTIMENTS}
+        self.model_predictions: Dict[str, Dict[str, int]] = {}
+        self.fake_checked = 0
+        self.suspicious = 0
+        self.helpfulness_checked = 0
+        self.helpful = 0
+        self.buckets = deque(maxlen=self.window_buckets)
+        self.last_updated: Optional[float] = None
+
+    def _bucket(self, now: float) -> Dict[str, Any]:
+        """Current time bucket; older buckets fall off the window"""
+        start = now - now % self.bucket_seconds
+        if not self.buckets or self.buckets[-1]["start"] < start:
+            self.buckets.append(_new_bucket(start))
+        return self.buckets[-1]
+
+    def record_review(self, text_length: int, now: Optional[float] = None) -> None:
+        """Count one analyzed review, whichever analyses were run on it"""
+        now = time.time() if now is None else now
+        with self._lock:
+            self.total_reviews += 1
+            self.total_text_length += text_length
+            self._bucket(now)["reviews"] += 1
+            self.last_updated = now
+
+    def record_sentiment(self, sentiment: str, model: str, now: Optional[float] = None) -> None:
+        now = time.time() if now is None else now
+        model = getattr(model, "value", model)
+        sentiment = getattr(sentiment, "value", sentiment)
+        with self._lock:
+            self.sentiment_counts[sentiment] = self.sentiment_counts.get(sentiment, 0) + 1
+            counts = self.model_predictions.setdefault(model, {name: 0 for name in SENTIMENTS})
+            counts[sentiment] = counts.get(sentiment, 0) + 1
+            bucket = self._bucket(now)
+            bucket[sentiment] = bucket.get(sentiment, 0) + 1
+            self.last_updated = now
+
+    def record_fake(self, is_suspicious: bool, now: Optional[float] = None) -> None:
+        now = time.time() if now is None else now
+        with self._lock:
+            self.fake_checked += 1
+            if is_suspicious:
+                self.suspicious += 1
+                self._bucket(now)["suspicious"] += 1
+            self.last_updated = now
+
+    def record_helpfulness(self, category: str, now: Optional[float] = None) -> None:
+        now = time.time() if now is None else now
+        with self._lock:
+            self.helpfulness_checked += 1
+            if category in HELPFUL_CATEGORIES:
+                self.helpful += 1
+                self._bucket(now)["helpful"] += 1
+            self.last_updated = now
+
+    def record_analysis(self, result: Dict[str, Any], model: str, text_length: int) -> None:
+        """Record a combined {"sentiment", "fake", "helpfulness"} result"""
+        self.record_review(text_length)
+        if "sentiment" in result:
+            # A fallback result names the model that actually answered
+            self.record_sentiment(result["sentiment"]["sentiment"], result["sentiment"].get("model", model))
+        if "fake" in result:
+            self.record_fake(result["fake"]["is_suspicious"])
+        if "helpfulness" in result:
+            self.record_helpfulness(result["helpfulness"]["helpfulness_category"])
+
+    def _window(self, buckets: List[Dict[str, Any]], now: Optional[float] = None) -> List[Dict[str, Any]]:
+        now = time.time() if now is None else now
+        oldest = now - now % self.bucket_seconds - (self.window_buckets - 1) * self.bucket_seconds
+        return [dict(bucket) for bucket in buckets if bucket["start"] >= oldest]
+
+    def timeline(self, now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Buckets still inside the window, oldest first"""
+        with self._lock:
+            return self._window(list(self.buckets), now)
+
+    def _combined_state(self) -> Dict[str, Any]:
+        """This process's counters, plus every other worker's when saving a shard"""
+        with self._lock:
+            state = self._state()
+        if self._baseline is None or not self._main_path:
+            return state
+        main, others = gather(self._main_path, self.snapshot_path)
+        if main is None or main.get("version") != SNAPSHOT_VERSION:
+            main = self._baseline
+        combined = combine_states(main, combine_states(state, self._baseline, sign=-1))
+        for shard in others:
+            if shard.get("version") == SNAPSHOT_VERSION:
+                combined = combine_states(combined, shard)
+        return combined
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current totals, percentages and timeline, across workers when sharded"""
+        state = self._combined_state()
+        state.pop("merged_shards", None)
+        state.pop("shard_id", None)
+        state["average_text_length"] = (
+            state["total_text_length"] / state["total_reviews"] if state["total_reviews"] else 0.0
+        )
+        state["suspicious_reviews_percentage"] = (
+            100.0 * state["suspicious"] / state["fake_checked"] if state["fake_checked"] else 0.0
+        )
+        state["helpful_reviews_percentage"] = (
+            100.0 * state["helpful"] / state["helpfulness_checked"] if state["helpfulness_checked"] else 0.0
+        )
+        state["timeline"] = self._window(state["buckets"])
+        return state
+
+    def _state(self) -> Dict[str, Any]:
+        return {
+            "version": SNAPSHOT_VERSION,
+            "total_reviews": self.total_reviews,
+            "total_text_length": self.total_text_length,
+            "sentiment_counts": dict(self.sentiment_counts),
+            "model_predictions": {model: dict(counts) for model, counts in self.model_predictions.items()},
+            "fake_checked": self.fake_checked,
+            "suspicious": self.suspicious,
+            "helpfulness_checked": self.helpfulness_checked,
+            "helpful": self.helpful,
+            "buckets": [dict(bucket) for bucket in self.buckets],
+            "last_updated": self.last_updated,
+            "merged_shards": list(self._merged_shards)
+        }
+
+    def start_shard(self, path: str) -> None:
+        """Save only what is recorded from now on, to path, for merge() into the main snapshot"""
+        with self._lock:
+            self._baseline = self._state()
+        self._shard_id = new_shard_id()
+        self._main_path = self.snapshot_path
+        self.snapshot_path = path
+
+    def save(self, path: Optional[str] = None) -> None:
+        """Atomically write the raw counters to disk"""
+        path = path or self.snapshot_path
+        if not path:
+            return
+        with self._lock:
+            state = self._state()
+        if self._baseline is not None:
+            state = combine_states(state, self._baseline, sign=-1)
+            state.update(shard_id=self._shard_id, merged_shards=[])
+        write_state(path, state)
+
+    def load(self, path: str) -> None:
+        """Restore counters from a snapshot written by save()"""
+        state = self._read(path)
+        if state is not None:
+            with self._lock:
+                self._restore(state)
+
+    def merge(self, path: str) -> bool:
+        """Add a worker's shard to these counters"""
+        shard = self._read(path)
+        if shard is None:
+            return False
+        with self._lock:
+            combined = combine_states(self._state(), shard)
+            mark_merged(combined, shard)
+            self._restore(combined)
+        return True
+
+    @staticmethod
+    def _read(path: str) -> Optional[Dict[str, Any]]:
+        state = read_state(path)
+        if state is None:
+            return None
+        if state.get("version") != SNAPSHOT_VERSION:
+            print(f"⚠️ Ignoring statistics snapshot {path} with unknown version")
+            return None
+        return state
+
+    def _restore(self, state: Dict[str, Any]) -> None:
+        self._reset()
+        for name in COUNTERS:
+            setattr(self, name, state[name])
+        self.sentiment_counts.update(state["sentiment_counts"])
+        self.model_predictions = state["model_predictions"]
+        self.buckets.extend(state["buckets"])
+        self.last_updated = state["last_updated"]
+        self._merged_shards = list(state.get("merged_shards", ()))
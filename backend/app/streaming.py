@@ -0,0 +1,97 @@
+"""
+NDJSON streaming helpers for /predict/stream
+
+Reads newline-delimited JSON reviews from a chunked request body and streams
+one JSON result line back per review. Input is only pulled from the client
+as fast as results are written out, so memory stays flat.
+"""
+
+import json
+from typing import Any, AsyncIterator, Dict, List, Tuple
+
+from pydantic import ValidationError
+from starlette.responses import StreamingResponse
+
+from app.schemas import StreamReviewRequest
+
+# (line index, validated review or None, error message or None)
+ParsedLine = Tuple[int, Dict[str, Any], str]
+
+
+class NDJSONStreamingResponse(StreamingResponse):
+    """StreamingResponse that leaves the request body to the body iterator"""
+
+    media_type = "application/x-ndjson"
+
+    async def __call__(self, scope, receive, send) -> None:
+        # StreamingResponse normally spawns a task that drains receive() to
+        # watch for disconnects, which would swallow request body chunks still
+        # being read. Reading the body already surfaces disconnects instead.
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
+def parse_review_line(index: int, line: bytes) -> ParsedLine:
+    """Decode and validate one NDJSON review line"""
+    try:
+        payload = json.loads(line)
+        if not isinstance(payload, dict):
+            raise ValueError("Each line must be a JSON object")
+        review = StreamReviewRequest(**payload)
+    except ValidationError as e:
+        return index, None, "; ".join(
+            "{}: {}".format(".".join(str(part) for part in error["loc"]), error["msg"])
+            for error in e.errors()
+        )
+    except ValueError as e:
+        return index, None, str(e)
+    return index, review.model_dump(), None
+
+
+async def iter_review_batches(
+    chunks: AsyncIterator[bytes], max_batch: int = 32, max_line_bytes: int = 64 * 1024
+) -> AsyncIterator[List[ParsedLine]]:
+    """Group complete lines into batches of whatever has arrived so far"""
+    buffer = b""
+    index = 0
+    skipping = False
+    async for chunk in chunks:
+        buffer += chunk
+        lines = buffer.split(b"\n")
+        buffer = lines.pop()
+        if skipping:
+            # Drop the rest of an oversized line that was already reported
+            if not lines:
+                buffer = b""
+                continue
+            lines.pop(0)
+            skipping = False
+
+        batch = []
+        for line in lines:
+            if not line.strip():
+                continue
+            if len(line) > max_line_bytes:
+                batch.append((index, None, "Line exceeds {} bytes".format(max_line_bytes)))
+            else:
+                batch.append(parse_review_line(index, line))
+            index += 1
+            if len(batch) >= max_batch:
+                yield batch
+                batch = []
+
+        if len(buffer) > max_line_bytes:
+            batch.append((index, None, "Line exceeds {} bytes".format(max_line_bytes)))
+            index += 1
+            buffer = b""
+            skipping = True
+        if batch:
+            yield batch
+
+    if buffer.strip() and not skipping:
+        yield [parse_review_line(index, buffer)]
+
+
+def encode_line(result: Dict[str, Any]) -> bytes:
+    return json.dumps(result, default=str).encode("utf-8") + b"\n"
@@ -0,0 +1,274 @@
+"""
+Transformer sentiment classifier
+
+Thin batched inference wrapper around a Hugging Face sequence classification
+model and tokenizer. torch is imported lazily so the API runs without it.
+
+For CPU serving the model can be int8 dynamically quantized (every Linear
+layer) and/or exported to a TorchScript graph, and checkpoints are read from
+a local directory without touching the network.
+"""
+
+import os
+import time
+from collections import deque
+from typing import Any, Dict, List, Sequence, Tuple
+
+# Label order produced by the notebook's LabelEncoder
+SENTIMENT_LABELS = ["Negative", "Neutral", "Positive"]
+
+# "eager" runs the Python model, "torchscript" a traced graph of it
+RUNTIMES = ("eager", "torchscript")
+
+# "head" keeps the first max_length tokens; "head_tail" keeps the start and the
+# end of long reviews, where the verdict usually is
+TRUNCATIONS = ("head", "head_tail")
+
+# Upper bounds (in tokens) of the padded-length bands reported by stats()
+LENGTH_BANDS = (32, 64, 128, 256, 512)
+
+
+def configure_threads(num_threads: int) -> None:
+    """Set torch's intra-op thread count; 0 keeps torch's default"""
+    if num_threads > 0:
+        import torch
+        torch.set_num_threads(num_threads)
+
+
+def checkpoint_labels(config) -> List[str]:
+    """Labels from the checkpoint config, or the notebook's order for generic LABEL_n names"""
+    id2label = getattr(config, "id2label", None) or {}
+    labels = [str(id2label[index]) for index in sorted(id2label, key=int)]
+    if sorted(label.lower() for label in labels) == sorted(label.lower() for label in SENTIMENT_LABELS):
+        return [label.capitalize() for label in labels]
+    return list(SENTIMENT_LABELS)
+
+
+def load_checkpoint(path: str) -> Tuple[Any, Any, List[str]]:
+    """Read a fine-tuned checkpoint (model, tokenizer, labels) from a local directory"""
+    from transformers import AutoTokenizer, AutoModelForSequenceClassification
+
+    if not os.path.isdir(path):
+        raise FileNotFoundError(f"Model checkpoint directory not found: {path}")
+    tokenizer = AutoTokenizer.from_pretrained(path, local_files_only=True)
+    model = AutoModelForSequenceClassification.from_pretrained(path, local_files_only=True)
+    return model, tokenizer, checkpoint_labels(model.config)
+
+
+class TransformerSentimentClassifier:
+    """Runs one forward pass per batch of texts"""
+
+    def __init__(self, model, tokenizer, labels: Sequence[str] = SENTIMENT_LABELS,
+                 max_length: int = 512, device: str = "cpu", model_name: str = "roberta",
+                 quantize: bool = False, runtime: str = "eager", bucket_size: int = 16,
+                 truncation: str = "head", head_tokens: int = 128):
+        import torch
+
+        if runtime not in RUNTIMES:
+            raise ValueError(f"Unknown runtime {runtime!r}; choose from {', '.join(RUNTIMES)}")
+        if truncation not in TRUNCATIONS:
+            raise ValueError(f"Unknown truncation {truncation!r}; choose from {', '.join(TRUNCATIONS)}")
+        self._torch = torch
+        self.tokenizer = tokenizer
+        self.labels = list(labels)
+        self.max_length = max_length
+        self.device = torch.device(device)
+        self.model_name = model_name
+        self.bucket_size = max(1, bucket_size)
+        self.truncation = truncation
+        self.head_tokens = min(max(1, head_tokens), max_length - 1)
+        self.pad_token_id = tokenizer.pad_token_id if tokenizer.pad_token_id is not None else 0
+        model.to(self.device)
+        model.eval()
+
+        # Dynamic int8 kernels are CPU-only
+        self.quantized = quantize and self.device.type == "cpu"
+        if self.quantized:
+            model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        self.runtime = runtime
+        self.model = self._export(model) if runtime == "torchscript" else model
+
+        self.batches = 0
+        self.items = 0
+        self.batch_latencies = deque(maxlen=1024)
+        self.real_tokens = 0
+        self.padded_tokens = 0
+        self.unbucketed_tokens = 0
+        self.band_stats = {band: {"buckets": 0, "items": 0, "seconds": 0.0} for band in LENGTH_BANDS}
+
+    def _export(self, model):
+        """Trace the model into a TorchScript graph taking (input_ids, attention_mask)"""
+        torch = self._torch
+
+        class LogitsOnly(torch.nn.Module):
+            def __init__(self, wrapped):
+                super().__init__()
+                self.wrapped = wrapped
+
+            def forward(self, input_ids, attention_mask):
+                return self.wrapped(input_ids=input_ids, attention_mask=attention_mask).logits
+
+        # Unequal lengths so the traced graph includes the padding-mask path
+        example = self._encode(["a short example", "a longer example review for tracing the graph"])
+        with torch.no_grad():
+            traced = torch.jit.trace(
+                LogitsOnly(model).eval(), (example["input_ids"], example["attention_mask"]),
+                strict=False, check_trace=False
+            )
+        return torch.jit.freeze(traced) if not self.quantized else traced
+
+    def _encode(self, texts: List[str]) -> Dict[str, Any]:
+        encoded = self.tokenizer(
+            list(texts),
+            padding=True,
+            truncation=True,
+            max_length=self.max_length,
+            return_tensors="pt"
+        )
+        return {name: tensor.to(self.device) for name, tensor in encoded.items()}
+
+    def _logits(self, encoded: Dict[str, Any]):
+        if self.runtime == "torchscript":
+            return self.model(encoded["input_ids"], encoded["attention_mask"])
+        return self.model(**encoded).logits
+
+    def _tokenize(self, texts: List[str]) -> List[List[int]]:
+        """Token ids per text, tokenized once and without padding"""
+        if self.truncation == "head":
+            return self.tokenizer(list(texts), truncation=True, max_length=self.max_length)["input_ids"]
+
+        ids = self.tokenizer(list(texts), truncation=False)["input_ids"]
+        tail_tokens = self.max_length - self.head_tokens
+        return [
+            row if len(row) <= self.max_length else row[:self.head_tokens] + row[-tail_tokens:]
+            for row in ids
+        ]
+
+    def _pad(self, rows: List[List[int]]) -> Dict[str, Any]:
+        """Pad one bucket to its longest member"""
+        torch = self._torch
+        width = max(len(row) for row in rows)
+        input_ids = torch.full((len(rows), width), self.pad_token_id, dtype=torch.long)
+        attention_mask = torch.zeros((len(rows), width), dtype=torch.long)
+        for index, row in enumerate(rows):
+            input_ids[index, :len(row)] = torch.tensor(row, dtype=torch.long)
+            attention_mask[index, :len(row)] = 1
+        return {"input_ids": input_ids.to(self.device), "attention_mask": attention_mask.to(self.device)}
+
+    def predict_batch(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """Classify texts in length-sorted buckets, preserving input order
+
+        Texts are tokenized once, sorted by token count and split into buckets
+        of bucket_size, and each bucket is padded only to its own longest
+        member, so short reviews do not pay for the longest one in the batch.
+        """
+        if not texts:
+            return []
+        torch = self._torch
+        started_at = time.perf_counter()
+
+        ids = self._tokenize(texts)
+        order = sorted(range(len(texts)), key=lambda index: len(ids[index]))
+        tokenized_at = time.perf_counter()
+
+        results: List[Any] = [None] * len(texts)
+        for start in range(0, len(order), self.bucket_size):
+            bucket = order[start:start + self.bucket_size]
+            bucket_started_at = time.perf_counter()
+            encoded = self._pad([ids[index] for index in bucket])
+            with torch.inference_mode():
+                logits = self._logits(encoded)
+            probabilities = torch.softmax(logits.float(), dim=-1).cpu().tolist()
+            bucket_seconds = time.perf_counter() - bucket_started_at
+            self._record_bucket(encoded["input_ids"].shape[1], len(bucket), bucket_seconds)
+
+            timings = {
+                "feature_extraction": tokenized_at - started_at,
+                "inference": bucket_seconds
+            }
+            for index, probs in zip(bucket, probabilities):
+                results[index] = self._result(texts[index], probs, timings)
+
+        lengths = [len(row) for row in ids]
+        self.real_tokens += sum(lengths)
+        self.unbucketed_tokens += max(lengths) * len(lengths)
+        self.batches += 1
+        self.items += len(texts)
+        self.batch_latencies.append(time.perf_counter() - started_at)
+        return results
+
+    def _record_bucket(self, width: int, size: int, seconds: float) -> None:
+        self.padded_tokens += width * size
+        band = next((band for band in LENGTH_BANDS if width <= band), LENGTH_BANDS[-1])
+        stats = self.band_stats[band]
+        stats["buckets"] += 1
+        stats["items"] += size
+        stats["seconds"] += seconds
+
+    def stats(self) -> Dict[str, Any]:
+        """Inference configuration and per-batch latency over recent batches"""
+        from app.evaluation import percentile
+
+        latencies = list(self.batch_latencies)
+        return {
+            "runtime": self.runtime,
+            "quantized": self.quantized,
+            "device": str(self.device),
+            "threads": self._torch.get_num_threads(),
+            "batches": self.batches,
+            "items": self.items,
+            "batch_p50_ms": percentile(latencies, 50) * 1000,
+            "batch_p99_ms": percentile(latencies, 99) * 1000,
+            "bucket_size": self.bucket_size,
+            "truncation": self.truncation,
+            # Share of the tokens fed to the model that were padding
+            "padding_waste": self._waste(self.padded_tokens),
+            "padding_waste_unbucketed": self._waste(self.unbucketed_tokens),
+            "buckets_by_length": {
+                f"<={band}": {
+                    "buckets": stats["buckets"],
+                    "items": stats["items"],
+                    "avg_bucket_ms": stats["seconds"] / stats["buckets"] * 1000 if stats["buckets"] else 0.0
+                }
+                for band, stats in self.band_stats.items()
+            }
+        }
+
+    def _waste(self, fed_tokens: int) -> float:
+        return 1 - self.real_tokens / fed_tokens if fed_tokens else 0.0
+
+    def _result(self, text: str, probs: List[float], timings: Dict[str, float]) -> Dict[str, Any]:
+        scores = dict(zip(self.labels, probs))
+        sentiment = max(scores, key=scores.get)
+        confidence = scores[sentiment]
+        return {
+            "sentiment": sentiment,
+            "confidence": confidence,
+            "details": {
+                "confidence": confidence,
+                "probabilities": {
+                    "positive": scores.get("Positive", 0.0),
+                    "negative": scores.get("Negative", 0.0),
+                    "neutral": scores.get("Neutral", 0.0)
+                },
+                "processing_time": timings["inference"]
+            },
+            "model": self.model_name,
+            "text_length": len(text),
+            "processing_time": sum(timings.values()),
+            "stage_timings": dict(timings)
+        }
+
+
+def build_classifier(path: str, device: str = "cpu", quantize: bool = False, runtime: str = "eager",
+                     num_threads: int = 0, max_length: int = 512, bucket_size: int = 16,
+                     truncation: str = "head", head_tokens: int = 128,
+                     model_name: str = "roberta") -> TransformerSentimentClassifier:
+    """Load a local checkpoint and prepare it for serving"""
+    configure_threads(num_threads)
+    model, tokenizer, labels = load_checkpoint(path)
+    return TransformerSentimentClassifier(
+        model, tokenizer, labels=labels, max_length=max_length, device=device,
+        model_name=model_name, quantize=quantize, runtime=runtime,
+        bucket_size=bucket_size, truncation=truncation, head_tokens=head_tokens
+    )
@@ -0,0 +1,324 @@
+"""
+Fast VADER scoring engine
+
+Output-equivalent reimplementation of vaderSentiment's polarity_scores.
+The lexicon and rule tables are loaded once into dicts/sets, or looked up in
+place in the mapped lexicon artifact (app.lexicons), and every text is
+tokenized, lowercased and looked up a single time instead of once per rule.
+"""
+
+import math
+import os
+import string
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional
+
+from vaderSentiment import vaderSentiment as _vader
+
+if TYPE_CHECKING:
+    from app.lexicons import LexiconArtifact
+
+B_INCR = _vader.B_INCR
+C_INCR = _vader.C_INCR
+N_SCALAR = _vader.N_SCALAR
+
+VADER_DATA_DIR = os.path.dirname(os.path.abspath(_vader.__file__))
+
+_PUNCTUATION = string.punctuation
+
+
+def _load_lexicon(path: str) -> Dict[str, float]:
+    """Parse vader_lexicon.txt into a word -> valence dict"""
+    lexicon = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f.read().rstrip("\n").split("\n"):
+            if not line:
+                continue
+            word, measure = line.strip().split("\t")[0:2]
+            lexicon[word] = float(measure)
+    return lexicon
+
+
+def _load_emojis(path: str) -> Dict[str, str]:
+    """Parse emoji_utf8_lexicon.txt, keeping only single-character keys"""
+    emojis = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f.read().rstrip("\n").split("\n"):
+            emoji, description = line.strip().split("\t")[0:2]
+            # polarity_scores matches emojis character by character, so
+            # multi-codepoint entries can never be hit
+            if len(emoji) == 1:
+                emojis[emoji] = description
+    return emojis
+
+
+def _split_keys(table: Dict[str, float]) -> Dict[tuple, float]:
+    """Re-key a phrase table by word tuples so n-gram lookups skip string joins"""
+    return {tuple(key.split(" ")): value for key, value in table.items() if " " in key}
+
+
+class FastVaderScorer:
+    """Precompiled VADER scorer returning the same neg/neu/pos/compound dict"""
+
+    def __init__(self, data_dir: str = VADER_DATA_DIR, lexicons: Optional["LexiconArtifact"] = None):
+        if lexicons is not None:
+            # The lexicon and emojis stay in the shared map; the rule tables are
+            # a few dozen words each and are checked on every token
+            self.lexicon = lexicons["vader_lexicon"]
+            self.emojis = lexicons["vader_emojis"]
+            self.boosters = dict(lexicons["vader_boosters"].items())
+            self.negations = frozenset(lexicons["vader_negations"])
+            special_cases = dict(lexicons["vader_special_cases"].items())
+        else:
+            self.lexicon = _load_lexicon(os.path.join(data_dir, "vader_lexicon.txt"))
+            self.emojis = _load_emojis(os.path.join(data_dir, "emoji_utf8_lexicon.txt"))
+            self.boosters = dict(_vader.BOOSTER_DICT)
+            self.negations = frozenset(_vader.NEGATE)
+            special_cases = _vader.SPECIAL_CASES
+
+        self.booster_ngrams = _split_keys(self.boosters)
+        self.special_ngrams = _split_keys(special_cases)
+
+        # Every word that can take part in a special-case or booster n-gram;
+        # lets the idiom check bail out without building any tuples.
+        self.idiom_words = frozenset(
+            word for key in list(self.special_ngrams) + list(self.booster_ngrams) for word in key
+        )
+
+    def polarity_scores(self, text: str) -> Dict[str, float]:
+        """Score a single text, identical to SentimentIntensityAnalyzer.polarity_scores"""
+        text = self._replace_emojis(text).strip()
+
+        tokens = []
+        for token in text.split():
+            stripped = token.strip(_PUNCTUATION)
+            tokens.append(token if len(stripped) <= 2 else stripped)
+
+        if not tokens:
+            return self._score_valence([], text)
+
+        lookup = self.lexicon.get
+        lowered = [token.lower() for token in tokens]
+        valences = [lookup(word) for word in lowered]
+        in_lexicon = [valence is not None for valence in valences]
+        upper = [token.isupper() for token in tokens]
+        allcaps = sum(upper)
+        is_cap_diff = 0 < len(tokens) - allcaps < len(tokens)
+
+        sentiments = []
+        last = len(tokens) - 1
+        for i, word in enumerate(lowered):
+            if word in self.boosters:
+                sentiments.append(0)
+                continue
+            if i < last and word == "kind" and lowered[i + 1] == "of":
+                sentiments.append(0)
+                continue
+            if not in_lexicon[i]:
+                sentiments.append(0)
+                continue
+            sentiments.append(self._valence(i, tokens, lowered, valences, in_lexicon, upper, is_cap_diff))
+
+        if "but" in lowered:
+            self._but_check(lowered.index("but"), sentiments)
+
+        return self._score_valence(sentiments, text)
+
+    def score_many(self, texts: Iterable[str]) -> List[Dict[str, float]]:
+        """Score a batch of texts, preserving input order"""
+        polarity_scores = self.polarity_scores
+        return [polarity_scores(text) for text in texts]
+
+    def _replace_emojis(self, text: str) -> str:
+        """Swap emojis for their textual descriptions"""
+        # Every emoji key is non-ASCII, so plain ASCII reviews skip the scan
+        if text.isascii():
+            return text
+        emojis = self.emojis
+        if not any(char in emojis for char in text if char > "\x7f"):
+            return text
+
+        parts = []
+        prev_space = True
+        for char in text:
+            description = emojis.get(char) if char > "\x7f" else None
+            if description is not None:
+                if not prev_space:
+                    parts.append(" ")
+                parts.append(description)
+                prev_space = False
+            else:
+                parts.append(char)
+                prev_space = char == " "
+        return "".join(parts)
+
+    def _valence(self, i, tokens, lowered, valences, in_lexicon, upper, is_cap_diff) -> float:
+        """Valence of a lexicon word after negation, booster and idiom rules"""
+        word = lowered[i]
+        valence = valences[i]
+
+        if word == "no" and i != len(tokens) - 1 and in_lexicon[i + 1]:
+            valence = 0.0
+        if (i > 0 and lowered[i - 1] == "no") \
+                or (i > 1 and lowered[i - 2] == "no") \
+                or (i > 2 and lowered[i - 3] == "no" and lowered[i - 1] in ("or", "nor")):
+            valence = valences[i] * N_SCALAR
+
+        if upper[i] and is_cap_diff:
+            if valence > 0:
+                valence += C_INCR
+            else:
+                valence -= C_INCR
+
+        for start_i in range(0, 3):
+            j = i - (start_i + 1)
+            if i > start_i and not in_lexicon[j]:
+                s = 0.0
+                booster = self.boosters.get(lowered[j])
+                if booster is not None:
+                    s = booster
+                    if valence < 0:
+                        s *= -1
+                    if upper[j] and is_cap_diff:
+                        if valence > 0:
+                            s += C_INCR
+                        else:
+                            s -= C_INCR
+                if start_i == 1 and s != 0:
+                    s = s * 0.95
+                if start_i == 2 and s != 0:
+                    s = s * 0.9
+                valence = valence + s
+                valence = self._negation_check(valence, lowered, start_i, i)
+                if start_i == 2:
+                    valence = self._special_idioms_check(valence, lowered, i)
+
+        if i > 1 and not in_lexicon[i - 1] and lowered[i - 1] == "least":
+            if lowered[i - 2] != "at" and lowered[i - 2] != "very":
+                valence = valence * N_SCALAR
+        elif i > 0 and not in_lexicon[i - 1] and lowered[i - 1] == "least":
+            valence = valence * N_SCALAR
+        return valence
+
+    def _is_negated(self, word: str) -> bool:
+        return word in self.negations or "n't" in word
+
+    def _negation_check(self, valence: float, lowered: List[str], start_i: int, i: int) -> float:
+        if start_i == 0:
+            if self._is_negated(lowered[i - 1]):
+                valence = valence * N_SCALAR
+        elif start_i == 1:
+            if lowered[i - 2] == "never" and (lowered[i - 1] == "so" or lowered[i - 1] == "this"):
+                valence = valence * 1.25
+            elif lowered[i - 2] == "without" and lowered[i - 1] == "doubt":
+                pass
+            elif self._is_negated(lowered[i - 2]):
+                valence = valence * N_SCALAR
+        else:
+            # Operator precedence mirrors upstream: (never and so/this) or so/this
+            if lowered[i - 3] == "never" and (lowered[i - 2] == "so" or lowered[i - 2] == "this") or \
+                    (lowered[i - 1] == "so" or lowered[i - 1] == "this"):
+                valence = valence * 1.25
+            elif lowered[i - 3] == "without" and (lowered[i - 2] == "doubt" or lowered[i - 1] == "doubt"):
+                pass
+            elif self._is_negated(lowered[i - 3]):
+                valence = valence * N_SCALAR
+        return valence
+
+    def _special_idioms_check(self, valence: float, lowered: List[str], i: int) -> float:
+        idiom_words = self.idiom_words
+        window = lowered[i - 3:i + 3]
+        if not any(word in idiom_words for word in window):
+            return valence
+
+        special = self.special_ngrams
+        w3, w2, w1, w0 = lowered[i - 3], lowered[i - 2], lowered[i - 1], lowered[i]
+        for seq in ((w1, w0), (w2, w1, w0), (w2, w1), (w3, w2, w1), (w3, w2)):
+            if seq in special:
+                valence = special[seq]
+                break
+
+        if len(lowered) - 1 > i:
+            seq = (w0, lowered[i + 1])
+            if seq in special:
+                valence = special[seq]
+        if len(lowered) - 1 > i + 1:
+            seq = (w0, lowered[i + 1], lowered[i + 2])
+            if seq in special:
+                valence = special[seq]
+
+        for seq in ((w3, w2, w1), (w3, w2), (w2, w1)):
+            if seq in self.booster_ngrams:
+                valence = valence + self.booster_ngrams[seq]
+        return valence
+
+    @staticmethod
+    def _but_check(but_index: int, sentiments: List[float]) -> None:
+        """Contrastive 'but' weighting, replicating upstream's index() lookups"""
+        # Upstream re-finds each value with list.index() while rewriting the
+        # list in place, so duplicate valences can land on an earlier slot.
+        # Zero entries stay zero either way and are skipped.
+        for position in range(len(sentiments)):
+            sentiment = sentiments[position]
+            if not sentiment:
+                continue
+            si = sentiments.index(sentiment)
+            if si < but_index:
+                sentiments[si] = sentiment * 0.5
+            elif si > but_index:
+                sentiments[si] = sentiment * 1.5
+
+    @staticmethod
+    def _score_valence(sentiments: List[float], text: str) -> Dict[str, float]:
+        if sentiments:
+            sum_s = float(sum(sentiments))
+
+            ep_count = min(text.count("!"), 4)
+            qm_count = text.count("?")
+            qm_amplifier = 0
+            if qm_count > 1:
+                qm_amplifier = qm_count * 0.18 if qm_count <= 3 else 0.96
+            punct_emph_amplifier = ep_count * 0.292 + qm_amplifier
+
+            if sum_s > 0:
+                sum_s += punct_emph_amplifier
+            elif sum_s < 0:
+                sum_s -= punct_emph_amplifier
+
+            compound = sum_s / math.sqrt((sum_s * sum_s) + 15)
+            if compound < -1.0:
+                compound = -1.0
+            elif compound > 1.0:
+                compound = 1.0
+
+            pos_sum = 0.0
+            neg_sum = 0.0
+            neu_count = 0
+            for score in sentiments:
+                if score > 0:
+                    pos_sum += (float(score) + 1)
+                if score < 0:
+                    neg_sum += (float(score) - 1)
+                if score == 0:
+                    neu_count += 1
+
+            if pos_sum > math.fabs(neg_sum):
+                pos_sum += punct_emph_amplifier
+            elif pos_sum < math.fabs(neg_sum):
+                neg_sum -= punct_emph_amplifier
+
+            total = pos_sum + math.fabs(neg_sum) + neu_count
+            pos = math.fabs(pos_sum / total)
+            neg = math.fabs(neg_sum / total)
+            neu = math.fabs(neu_count / total)
+        else:
+            compound = 0.0
+            pos = 0.0
+            neg = 0.0
+            neu = 0.0
+
+        return {
+            "neg": round(neg, 3),
+            "neu": round(neu, 3),
+            "pos": round(pos, 3),
+            "compound": round(compound, 4)
+        }
@@ -0,0 +1,158 @@
+"""
+Process-pool execution for batch sentiment analysis
+
+Batches are split into shards and scored in worker processes that each hold
+their own analyzers, so large batches use every core instead of one.
+"""
+
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional
+
+from app.deadlines import Deadline
+
+
+def batch_error(text: str, error: Exception) -> Dict[str, Any]:
+    """Per-item error entry, as returned by /predict/batch"""
+    return {
+        "error": str(error),
+        "text": text[:100] + "..." if len(text) > 100 else text
+    }
+
+
+def batch_skipped(text: str, reason: str) -> Dict[str, Any]:
+    """Entry for an item a batch stopped before reaching"""
+    skipped = batch_error(text, f"Not analyzed: {reason}")
+    skipped["skipped"] = True
+    return skipped
+
+
+def _init_worker():
+    """Load analyzers once per worker process"""
+    from app.simple_models import load_analyzers
+    load_analyzers()
+
+
+def analyze_sentiment_shard(texts: List[str], model: str, deadline: Optional[Deadline] = None) -> List[Dict[str, Any]]:
+    """Score one shard, isolating failures to the item that raised and stopping at the deadline"""
+    from app.simple_models import sentiment_analyzer
+
+    results = []
+    for text in texts:
+        reason = deadline.stop_reason() if deadline is not None else None
+        if reason is not None:
+            results.append(batch_skipped(text, reason))
+            continue
+        try:
+            results.append(sentiment_analyzer.analyze_sentiment(text, model))
+        except Exception as e:
+            results.append(batch_error(text, e))
+    return results
+
+
+def analyze_sentiment_task(text: str, model: str) -> Dict[str, Any]:
+    from app.simple_models import sentiment_analyzer
+    return sentiment_analyzer.analyze_sentiment(text, model)
+
+
+def detect_fake_task(text: str, summary: str, rating: int) -> Dict[str, Any]:
+    from app.simple_models import fake_detector
+    return fake_detector.detect_fake_review(text, summary, rating)
+
+
+def analyze_helpfulness_task(text: str, helpful_votes: int, total_votes: int) -> Dict[str, Any]:
+    from app.simple_models import helpfulness_analyzer
+    return helpfulness_analyzer.analyze_helpfulness(text, helpful_votes, total_votes)
+
+
+def analyze_review_task(text: str, summary: str, rating: int, helpful_votes: int, total_votes: int,
+                        model: str, analyses: List[str]) -> Dict[str, Any]:
+    from app.simple_models import review_analyzer
+    return review_analyzer.analyze_review(text, summary, rating, helpful_votes, total_votes, model, analyses)
+
+
+def analyze_review_chunk(reviews: List[Dict[str, Any]], analyses: List[str], model: str) -> List[Dict[str, Any]]:
+    """Run the requested analyses over a chunk of reviews, isolating failures per review"""
+    from app.simple_models import review_analyzer
+
+    results = []
+    for review in reviews:
+        text = review["text"]
+        try:
+            result = review_analyzer.analyze_review(
+                text, review.get("summary") or "", review["rating"],
+                review["helpful_votes"], review["total_votes"], model, analyses
+            )
+        except Exception as e:
+            result = batch_error(text, e)
+        results.append(result)
+    return results
+
+
+class BatchWorkerPool:
+    """Lazily started process pool that scores batches shard by shard"""
+
+    def __init__(self, workers: Optional[int] = None, min_shard_size: int = 16):
+        self.workers = workers or os.cpu_count() or 1
+        self.min_shard_size = max(1, min_shard_size)
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.workers > 1
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker)
+        return self._executor
+
+    def shard(self, texts: List[str]) -> List[List[str]]:
+        """Split texts into at most one contiguous shard per worker"""
+        shard_count = min(self.workers, max(1, len(texts) // self.min_shard_size))
+        size, remainder = divmod(len(texts), shard_count)
+        shards = []
+        start = 0
+        for index in range(shard_count):
+            end = start + size + (1 if index < remainder else 0)
+            shards.append(texts[start:end])
+            start = end
+        return shards
+
+    def should_shard(self, count: int) -> bool:
+        """Whether a batch is large enough to be worth the IPC overhead"""
+        return self.enabled and count >= 2 * self.min_shard_size
+
+    async def analyze_sentiment(self, texts: List[str], model: str,
+                                deadline: Optional[Deadline] = None) -> List[Dict[str, Any]]:
+        """Score texts across worker processes, returning results in input order
+
+        A shard that fails as a whole comes back as per-item errors, without
+        dropping the other shards' results.
+        """
+        if not texts:
+            return []
+        shards = self.shard(texts)
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        shard_results = await asyncio.gather(*[
+            loop.run_in_executor(executor, analyze_sentiment_shard, shard, model, deadline)
+            for shard in shards
+        ], return_exceptions=True)
+
+        results = []
+        for shard, outcome in zip(shards, shard_results):
+            if isinstance(outcome, BaseException):
+                if isinstance(outcome, BrokenProcessPool):
+                    # A worker died; start a fresh pool on the next batch
+                    self.shutdown()
+                results.extend(batch_error(text, outcome) for text in shard)
+            else:
+                results.extend(outcome)
+        return results
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
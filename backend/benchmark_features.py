@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the fake review pattern detectors
+Times the original regexes against the linear-time detectors on normal
+reviews and on adversarial inputs built to trigger regex backtracking.
+
+Usage:
+    python benchmark_features.py [--repeat 5]
+"""
+
+import argparse
+import re
+import time
+
+from app.features import contains_url, contains_email, contains_phone, count_repeated_words
+
+LEGACY_DETECTORS = {
+    "url": lambda text: bool(re.search(r'http[s]?://', text)),
+    "email": lambda text: bool(re.search(r'\S+@\S+', text)),
+    "phone": lambda text: bool(re.search(r'(\d{3}[-\.\s]??\d{3}[-\.\s]??\d{4})', text)),
+    "repeated": lambda text: len(re.findall(r'\b(\w+)(\s+\1){2,}\b', text.lower()))
+}
+
+LINEAR_DETECTORS = {
+    "url": contains_url,
+    "email": contains_email,
+    "phone": contains_phone,
+    "repeated": lambda text: count_repeated_words(text.lower())
+}
+
+NORMAL_REVIEW = (
+    "I bought this GPS for my husband who is an over the road trucker. Very impressed "
+    "with the shipping time, it arrived a few days earlier than expected! The screen is "
+    "bright and the maps are accurate, but the suction mount is weak. "
+)
+
+
+def build_inputs(length: int):
+    return {
+        "normal review": (NORMAL_REVIEW * (length // len(NORMAL_REVIEW) + 1))[:length],
+        "no whitespace": "a" * length,
+        "no whitespace, trailing @": "a" * (length - 1) + "@",
+        "digits only": "1" * length,
+        "many @ signs": "@ " * (length // 2),
+        "long repeated words": " ".join(["w" * 99] * (length // 100)),
+        "near-repeated words": " ".join(["w" * 98 + ("x" if i % 2 else "y") for i in range(length // 100)])
+    }
+
+
+def worst_time(detect, text: str, repeat: int) -> float:
+    worst = 0.0
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        detect(text)
+        worst = max(worst, time.perf_counter() - started_at)
+    return worst
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark fake review pattern detectors")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per input; the worst is reported")
+    parser.add_argument("--lengths", default="5000,50000", help="Comma-separated input lengths")
+    args = parser.parse_args()
+
+    print("🧪 Pattern detector benchmark (worst of {} runs, ms)".format(args.repeat))
+    for length in [int(value) for value in args.lengths.split(",")]:
+        print(f"\n{'='*78}")
+        print(f"Input length: {length:,} characters")
+        print(f"{'input':<28}{'detector':<10}{'regex':>12}{'linear':>12}{'same':>8}")
+        worst_linear = 0.0
+        for name, text in build_inputs(length).items():
+            for detector, legacy in LEGACY_DETECTORS.items():
+                linear = LINEAR_DETECTORS[detector]
+                legacy_time = worst_time(legacy, text, args.repeat)
+                linear_time = worst_time(linear, text, args.repeat)
+                worst_linear = max(worst_linear, linear_time)
+                same = "✅" if legacy(text) == linear(text) else "❌"
+                print(f"{name:<28}{detector:<10}{legacy_time * 1000:>12.3f}{linear_time * 1000:>12.3f}{same:>8}")
+        print(f"Worst linear detector time: {worst_linear * 1000:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
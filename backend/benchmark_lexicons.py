@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the precompiled lexicon artifact
+Builds the VADER and polarity scorers in a fresh process by parsing the
+package data files and by mapping the artifact, and reports load time, the
+memory the process dirtied (Private_Dirty, Linux only) after loading and after
+scoring, and scoring throughput. Pages of the mapped file stay clean and are
+shared through the page cache, so they are not counted.
+
+Usage:
+    python benchmark_lexicons.py [--artifact lexicons.bin] [--texts 5000]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+REVIEWS = [
+    "Great GPS, the screen is really bright and the maps are accurate!",
+    "Stopped charging after two weeks. Returned it.",
+    "It's a cable. It works. Nothing more to say.",
+    "The sound quality is AMAZING for the price, but the ear cups get warm after an hour or so.",
+    "Not happy with the mount at all... it broke after a week. 2/5",
+    "Absolutely love these headphones 😁 best purchase this year, would not hesitate to buy again",
+    "Kinda sorta works, I guess? Not great, not terrible. The remote is a little flimsy."
+]
+
+
+def private_dirty_mb() -> float:
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            for line in f:
+                if line.startswith("Private_Dirty:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return 0.0
+
+
+def measure(mode: str, artifact: str, count: int) -> dict:
+    """Runs in the child process: build both scorers and score count texts"""
+    from app.lexicons import DEFAULT_CACHE_SIZE, LexiconArtifact
+    from app.polarity import FastPolarityScorer
+    from app.vader_engine import FastVaderScorer
+
+    before = private_dirty_mb()
+    started_at = time.perf_counter()
+    lexicons = None
+    if mode == "mapped":
+        lexicons = LexiconArtifact(artifact, cache_size=int(os.getenv("LEXICON_CACHE_SIZE", DEFAULT_CACHE_SIZE)))
+    vader = FastVaderScorer(lexicons=lexicons)
+    polarity = FastPolarityScorer(lexicons=lexicons)
+    load_seconds = time.perf_counter() - started_at
+    loaded = private_dirty_mb()
+
+    # Numbered so every text also brings a word no cache has seen
+    texts = [f"{REVIEWS[i % len(REVIEWS)]} #{i}" for i in range(count)]
+    started_at = time.perf_counter()
+    vader.score_many(texts)
+    vader_seconds = time.perf_counter() - started_at
+    started_at = time.perf_counter()
+    polarity.score_many(texts)
+    polarity_seconds = time.perf_counter() - started_at
+    scored = private_dirty_mb()
+
+    return {
+        "load_ms": load_seconds * 1000,
+        "loaded_mb": loaded - before,
+        "scored_mb": scored - before,
+        "vader_per_sec": count / vader_seconds,
+        "polarity_per_sec": count / polarity_seconds
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the precompiled lexicon artifact")
+    parser.add_argument("--artifact", default=None, help="Artifact to map (default: build a temporary one)")
+    parser.add_argument("--texts", type=int, default=5000, help="Texts scored per scorer")
+    parser.add_argument("--child", choices=("parsed", "mapped"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure(args.child, args.artifact, args.texts)))
+        return
+
+    from app.lexicons import build
+
+    with tempfile.TemporaryDirectory() as tmp:
+        artifact = args.artifact or os.path.join(tmp, "lexicons.bin")
+        if args.artifact is None:
+            build(artifact)
+        results = {}
+        for mode in ("parsed", "mapped"):
+            output = subprocess.run(
+                [sys.executable, __file__, "--child", mode, "--artifact", artifact, "--texts", str(args.texts)],
+                check=True, capture_output=True, text=True
+            ).stdout
+            results[mode] = json.loads(output.strip().splitlines()[-1])
+
+    print(f"\n🧪 VADER and polarity scorers, fresh process each, {args.texts:,} texts")
+    print(f"{'lexicons':<10}{'load ms':>10}{'dirty MB':>10}{'after scoring':>15}{'VADER/s':>10}{'polarity/s':>12}")
+    for mode, result in results.items():
+        print(f"{mode:<10}{result['load_ms']:>10.1f}{result['loaded_mb']:>10.1f}{result['scored_mb']:>15.1f}"
+              f"{result['vader_per_sec']:>10,.0f}{result['polarity_per_sec']:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Benchmark for response serialization
+Times encoding real VADER results the way the routes used to (Pydantic
+validation plus FastAPI's generic encoder) against the projected, columnar
+and MessagePack paths, and reports bytes on the wire for each.
+
+Usage:
+    python benchmark_serialization.py [--sizes 1,100,1000] [--repeat 20]
+"""
+
+import argparse
+import json
+import time
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app import serialization
+from app.schemas import SentimentResponse
+from app.serialization import JSON_MEDIA_TYPE, MSGPACK_MEDIA_TYPE, columnar, encode, project
+from app.simple_models import sentiment_analyzer
+
+REVIEWS = [
+    "Great GPS, the screen is really bright and the maps are accurate!",
+    "Stopped charging after two weeks. Returned it.",
+    "It's a cable. It works. Nothing more to say.",
+    "The sound quality is AMAZING for the price, but the ear cups get warm after an hour or so.",
+    "Not happy with the mount at all... it broke after a week. 2/5"
+]
+
+SENTIMENT_ADAPTER = TypeAdapter(SentimentResponse)
+
+
+def _json(content) -> bytes:
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode()
+
+
+def legacy_single(result):
+    # SentimentResponse(**result) in the route, then FastAPI's response_model check and dump
+    validated = SENTIMENT_ADAPTER.validate_python(SentimentResponse(**result))
+    return _json(SENTIMENT_ADAPTER.dump_python(validated, mode="json"))
+
+
+def projected_single(result):
+    return encode(project(SentimentResponse, result)).body
+
+
+def legacy_batch(results):
+    # A plain dict return goes through jsonable_encoder before JSONResponse renders it
+    return _json(jsonable_encoder({"model": "vader", "total_analyzed": len(results), "results": results}))
+
+
+def rows_batch(results, media_type=JSON_MEDIA_TYPE):
+    return encode({"model": "vader", "total_analyzed": len(results), "results": results}, media_type).body
+
+
+def columnar_batch(results, media_type=JSON_MEDIA_TYPE):
+    content = {"model": "vader", "total_analyzed": len(results), "shape": "columnar", "columns": columnar(results)}
+    return encode(content, media_type).body
+
+
+def best_time(encode_fn, payload, repeat: int):
+    best, body = float("inf"), b""
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        body = encode_fn(payload)
+        best = min(best, time.perf_counter() - started_at)
+    return best, len(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark response serialization")
+    parser.add_argument("--sizes", default="1,100,1000", help="Comma-separated batch sizes")
+    parser.add_argument("--repeat", type=int, default=20, help="Runs per case; the best is reported")
+    args = parser.parse_args()
+
+    cases = [
+        ("rows, legacy encoder", legacy_batch),
+        ("rows, JSON", rows_batch),
+        ("columnar, JSON", columnar_batch)
+    ]
+    if serialization.msgpack is not None:
+        cases += [
+            ("rows, MessagePack", lambda results: rows_batch(results, MSGPACK_MEDIA_TYPE)),
+            ("columnar, MessagePack", lambda results: columnar_batch(results, MSGPACK_MEDIA_TYPE))
+        ]
+    else:
+        print("ℹ️  msgpack is not installed; MessagePack cases are skipped")
+
+    single = sentiment_analyzer.analyze_sentiment(REVIEWS[0])
+    print(f"\n🧪 Single /predict/sentiment response (best of {args.repeat} runs)")
+    print(f"{'path':<28}{'encode µs':>12}{'bytes':>10}")
+    for name, encode_fn in (("validated twice", legacy_single), ("projected", projected_single)):
+        seconds, size = best_time(encode_fn, single, args.repeat)
+        print(f"{name:<28}{seconds * 1e6:>12.1f}{size:>10,}")
+
+    for size in [int(value) for value in args.sizes.split(",")]:
+        results = [sentiment_analyzer.analyze_sentiment(REVIEWS[i % len(REVIEWS)]) for i in range(size)]
+        print(f"\n{'='*50}")
+        print(f"🧪 /predict/batch with {size:,} results")
+        print(f"{'shape, encoding':<28}{'encode ms':>12}{'bytes':>10}")
+        for name, encode_fn in cases:
+            seconds, body_size = best_time(encode_fn, results, args.repeat)
+            print(f"{name:<28}{seconds * 1000:>12.3f}{body_size:>10,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Shared test fixtures
+The app's startup and shutdown own process-wide executors and worker pools,
+so every endpoint test shares one running app for the session. Tests of the
+transformer paths use stand-ins, so no checkpoint is needed.
+"""
+
+import os
+import tempfile
+import time
+
+import pytest
+
+
+@pytest.fixture(scope="session")
+def client():
+    from fastapi.testclient import TestClient
+
+    # Keep uploads and snapshots out of the working tree
+    scratch = tempfile.mkdtemp(prefix="api-test-")
+    os.environ.setdefault("JOBS_DIR", os.path.join(scratch, "jobs"))
+    from app.main import app
+
+    with TestClient(app) as client:
+        for _ in range(1200):
+            if client.get("/ready").status_code == 200:
+                break
+            time.sleep(0.05)
+        else:
+            raise AssertionError("models did not become ready")
+        yield client
+
+
+@pytest.fixture
+def slow_roberta_manager():
+    """Factory for a ModelManager whose RoBERTa stand-in sleeps delay seconds per forward pass"""
+    from app.batching import MicroBatcher
+    from app.models import ModelManager
+    from app.schemas import ModelStatus
+
+    def make(delay, max_batch_size=16):
+        manager = ModelManager()
+
+        def slow_roberta(texts):
+            time.sleep(delay)
+            return [
+                {
+                    "sentiment": "Positive", "confidence": 0.9,
+                    "details": {
+                        "confidence": 0.9, "processing_time": delay,
+                        "probabilities": {"positive": 0.9, "negative": 0.05, "neutral": 0.05}
+                    },
+                    "model": "roberta", "text_length": len(text), "processing_time": delay
+                }
+                for text in texts
+            ]
+
+        manager.roberta_batcher = MicroBatcher(slow_roberta, max_batch_size=max_batch_size, max_wait=0)
+        manager.model_status["roberta"] = ModelStatus(loaded=True)
+        return manager
+
+    return make
+
+
+@pytest.fixture(scope="session")
+def tiny_roberta():
+    """Factory for a tiny randomly initialized RoBERTa (model, tokenizer) over the given words
+
+    Each call builds a fresh model from the same seed, so it runs on CPU
+    without downloads and tests cannot change each other's weights.
+    """
+    torch = pytest.importorskip("torch")
+    transformers = pytest.importorskip("transformers")
+    from tokenizers import Tokenizer, models, pre_tokenizers
+
+    def make(words):
+        vocab = {"<pad>": 0, "<s>": 1, "</s>": 2, "<unk>": 3}
+        vocab.update({word: index + 4 for index, word in enumerate(words)})
+        backend = Tokenizer(models.WordLevel(vocab=vocab, unk_token="<unk>"))
+        backend.pre_tokenizer = pre_tokenizers.Whitespace()
+        tokenizer = transformers.PreTrainedTokenizerFast(
+            tokenizer_object=backend, pad_token="<pad>", unk_token="<unk>"
+        )
+
+        torch.manual_seed(0)
+        config = transformers.RobertaConfig(
+            vocab_size=len(vocab), hidden_size=16, num_hidden_layers=1, num_attention_heads=2,
+            intermediate_size=32, max_position_embeddings=64, num_labels=3, pad_token_id=0,
+            id2label={0: "negative", 1: "neutral", 2: "positive"},
+            label2id={"negative": 0, "neutral": 1, "positive": 2}
+        )
+        return transformers.RobertaForSequenceClassification(config), tokenizer
+
+    return make
@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+Async load generator for the API
+Drives a weighted mix of endpoints with short, long and adversarial reviews,
+in-process through ASGI (default), against a uvicorn it starts locally, or
+against any running server, and reports throughput, p50/p95/p99 latency and
+error rates per route.
+
+Closed loop: --concurrency clients each send their next request as soon as the
+previous one returns. Open loop: requests arrive at --rate per second whether
+or not earlier ones have finished, and latency is measured from the scheduled
+arrival so queueing delay is not hidden. --sweep runs several levels in a row
+to find the saturation point.
+
+Usage:
+    python loadtest.py --mode closed --sweep 1,4,16,64 --duration 10
+    python loadtest.py --mode open --rate 500 --mix sentiment=1 --profiles short=1
+    python loadtest.py --uvicorn --mix sentiment=5,batch=1,fake=3
+    python loadtest.py --url http://localhost:8000 --concurrency 32
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.evaluation import percentile
+
+SHORT_REVIEWS = [
+    "Great product, works perfectly!",
+    "Terrible quality. Broke after one day.",
+    "It's okay, nothing special.",
+    "Love it!!! Best purchase this year.",
+    "Does not charge. Returned it.",
+    "Decent cable for the price."
+]
+
+LONG_REVIEW = (
+    "I bought this GPS for my husband who is an over the road trucker. Very impressed "
+    "with the shipping time, it arrived a few days earlier than expected! The screen is "
+    "bright and the maps are accurate, but the suction mount is weak and it fell off the "
+    "windshield twice in the first week. Customer support was helpful and sent a new one. "
+)
+
+# Inputs that stress the text pipeline: long runs, heavy punctuation, repeats, unicode
+ADVERSARIAL_REVIEWS = [
+    "a" * 4999 + "@",
+    "1" * 5000,
+    "!" * 5000,
+    "@ " * 2500,
+    " ".join(["great"] * 830),
+    "WORST. PRODUCT. EVER. " * 220,
+    "😀👍🔥 ünïcödé ☃ " * 300,
+    "http://x.io " * 400
+]
+
+PROFILES: Dict[str, Callable[[random.Random], str]] = {
+    "short": lambda rng: rng.choice(SHORT_REVIEWS),
+    "long": lambda rng: (LONG_REVIEW * 14)[:rng.randint(2000, 5000)],
+    "adversarial": lambda rng: rng.choice(ADVERSARIAL_REVIEWS)
+}
+
+
+def _batch_payload(rng: random.Random, text: Callable[[], str], model: str) -> Dict[str, Any]:
+    return {"texts": [text() for _ in range(32)], "model": model}
+
+
+ENDPOINTS: Dict[str, Tuple[str, Callable[..., Dict[str, Any]]]] = {
+    "sentiment": ("/predict/sentiment", lambda rng, text, model: {"text": text(), "model": model}),
+    "batch": ("/predict/batch", _batch_payload),
+    "fake": ("/detect/fake", lambda rng, text, model: {
+        "text": text(), "summary": "Great", "rating": rng.randint(1, 5)
+    }),
+    "helpfulness": ("/analyze/helpfulness", lambda rng, text, model: {
+        "text": text(), "helpful_votes": rng.randint(0, 10), "total_votes": 10
+    }),
+    "full": ("/analyze/full", lambda rng, text, model: {
+        "text": text(), "summary": "Great", "rating": rng.randint(1, 5),
+        "helpful_votes": 3, "total_votes": 4, "model": model
+    })
+}
+
+
+def parse_weights(value: str, choices) -> Dict[str, float]:
+    """'sentiment=5,fake=1' -> {"sentiment": 5.0, "fake": 1.0}"""
+    weights = {}
+    for item in value.split(","):
+        name, _, weight = item.partition("=")
+        name = name.strip()
+        if name not in choices:
+            raise argparse.ArgumentTypeError(f"unknown name {name!r}; choose from {', '.join(choices)}")
+        weights[name] = float(weight or 1)
+    return weights
+
+
+class RequestFactory:
+    """Draws (route, payload) pairs from the endpoint and payload mixes"""
+
+    def __init__(self, mix: Dict[str, float], profiles: Dict[str, float], model: str, seed: int = 0):
+        self.rng = random.Random(seed)
+        self.endpoints = list(mix)
+        self.endpoint_weights = list(mix.values())
+        self.profiles = list(profiles)
+        self.profile_weights = list(profiles.values())
+        self.model = model
+
+    def _text(self) -> str:
+        profile = self.rng.choices(self.profiles, self.profile_weights)[0]
+        return PROFILES[profile](self.rng)
+
+    def __call__(self) -> Tuple[str, Dict[str, Any]]:
+        name = self.rng.choices(self.endpoints, self.endpoint_weights)[0]
+        route, build = ENDPOINTS[name]
+        return route, build(self.rng, self._text, self.model)
+
+
+class RouteStats:
+    """Latencies and outcomes for one route"""
+
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.statuses: Counter = Counter()
+
+    def record(self, latency: float, status: str) -> None:
+        self.latencies.append(latency)
+        self.statuses[status] += 1
+
+    def summary(self, elapsed: float) -> Dict[str, Any]:
+        count = len(self.latencies)
+        errors = sum(n for status, n in self.statuses.items() if not status.startswith("2"))
+        return {
+            "requests": count,
+            "throughput": count / elapsed if elapsed else 0.0,
+            "error_rate": errors / count if count else 0.0,
+            "p50_ms": percentile(self.latencies, 50) * 1000,
+            "p95_ms": percentile(self.latencies, 95) * 1000,
+            "p99_ms": percentile(self.latencies, 99) * 1000,
+            "statuses": dict(self.statuses)
+        }
+
+
+async def _send(client, stats: Dict[str, RouteStats], route: str, payload: Dict[str, Any],
+                started_at: float) -> None:
+    try:
+        response = await client.post(route, json=payload)
+        await response.aread()
+        status = str(response.status_code)
+    except Exception as e:
+        status = type(e).__name__
+    stats.setdefault(route, RouteStats()).record(time.perf_counter() - started_at, status)
+
+
+async def run_closed_loop(client, factory: RequestFactory, concurrency: int,
+                          duration: float) -> Dict[str, RouteStats]:
+    """concurrency clients, each waiting for its response before sending again"""
+    stats: Dict[str, RouteStats] = {}
+    deadline = time.perf_counter() + duration
+
+    async def user():
+        while time.perf_counter() < deadline:
+            route, payload = factory()
+            await _send(client, stats, route, payload, time.perf_counter())
+
+    await asyncio.gather(*[user() for _ in range(concurrency)])
+    return stats
+
+
+async def run_open_loop(client, factory: RequestFactory, rate: float, duration: float,
+                        seed: int = 0) -> Dict[str, RouteStats]:
+    """Poisson arrivals at rate/sec, independent of how fast responses come back"""
+    stats: Dict[str, RouteStats] = {}
+    rng = random.Random(seed)
+    in_flight = set()
+    started_at = time.perf_counter()
+    scheduled_at = started_at
+    while True:
+        scheduled_at += rng.expovariate(rate)
+        if scheduled_at - started_at >= duration:
+            break
+        delay = scheduled_at - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        route, payload = factory()
+        # Latency counts from the scheduled arrival, so a stalled generator is not hidden
+        task = asyncio.create_task(_send(client, stats, route, payload, scheduled_at))
+        in_flight.add(task)
+        task.add_done_callback(in_flight.discard)
+    if in_flight:
+        await asyncio.gather(*in_flight)
+    return stats
+
+
+def summarize(stats: Dict[str, RouteStats], elapsed: float) -> Dict[str, Any]:
+    combined = RouteStats()
+    for route_stats in stats.values():
+        combined.latencies.extend(route_stats.latencies)
+        combined.statuses.update(route_stats.statuses)
+    return {
+        "elapsed_seconds": elapsed,
+        "total": combined.summary(elapsed),
+        "routes": {route: route_stats.summary(elapsed) for route, route_stats in sorted(stats.items())}
+    }
+
+
+def print_summary(label: str, summary: Dict[str, Any]) -> None:
+    print(f"\n📈 {label} ({summary['elapsed_seconds']:.1f}s)")
+    print(f"   {'route':<22}{'requests':>9}{'req/s':>9}{'errors':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    rows = list(summary["routes"].items()) + [("total", summary["total"])]
+    for route, row in rows:
+        print(f"   {route:<22}{row['requests']:>9}{row['throughput']:>9.1f}{row['error_rate']:>8.1%}"
+              f"{row['p50_ms']:>9.1f}{row['p95_ms']:>9.1f}{row['p99_ms']:>9.1f}")
+
+
+async def wait_until_ready(client, timeout: float = 300.0) -> None:
+    deadline = time.perf_counter() + timeout
+    while True:
+        try:
+            if (await client.get("/ready")).status_code == 200:
+                return
+        except Exception:
+            pass
+        if time.perf_counter() > deadline:
+            raise SystemExit("❌ Server did not become ready")
+        await asyncio.sleep(0.2)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def run(args) -> List[Dict[str, Any]]:
+    try:
+        import httpx
+    except ImportError:
+        raise SystemExit("❌ The load generator needs httpx: pip install httpx")
+
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    timeout = httpx.Timeout(args.timeout)
+    server = None
+    lifespan = None
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, limits=limits, timeout=timeout)
+    elif args.uvicorn:
+        port = _free_port()
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        )
+        client = httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=timeout)
+    else:
+        from app.main import app
+        lifespan = app.router.lifespan_context(app)
+        await lifespan.__aenter__()
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://loadtest",
+                                   timeout=timeout)
+
+    summaries = []
+    try:
+        async with client:
+            await wait_until_ready(client)
+            factory = RequestFactory(args.mix, args.profiles, args.model, args.seed)
+            levels = args.sweep or [args.rate if args.mode == "open" else args.concurrency]
+            for level in levels:
+                started_at = time.perf_counter()
+                if args.mode == "open":
+                    stats = await run_open_loop(client, factory, level, args.duration, args.seed)
+                    label = f"open loop at {level:g} req/s"
+                else:
+                    stats = await run_closed_loop(client, factory, int(level), args.duration)
+                    label = f"closed loop with {int(level)} clients"
+                summary = summarize(stats, time.perf_counter() - started_at)
+                summary.update(mode=args.mode, level=level)
+                print_summary(label, summary)
+                summaries.append(summary)
+    finally:
+        if lifespan is not None:
+            await lifespan.__aexit__(None, None, None)
+        if server is not None:
+            server.terminate()
+            server.wait()
+    return summaries
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Load-test the API with mixed endpoints and payloads")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--url", help="Test a running server instead of the in-process app")
+    target.add_argument("--uvicorn", action="store_true", help="Start a local uvicorn and test it")
+    parser.add_argument("--mode", choices=["closed", "open"], default="closed")
+    parser.add_argument("--concurrency", type=int, default=16, help="Closed-loop clients")
+    parser.add_argument("--rate", type=float, default=100.0, help="Open-loop arrivals per second")
+    parser.add_argument("--sweep", type=lambda value: [float(level) for level in value.split(",")],
+                        help="Comma-separated concurrency levels (closed) or rates (open) to run in turn")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per level")
+    parser.add_argument("--mix", type=lambda value: parse_weights(value, ENDPOINTS),
+                        default=parse_weights("sentiment=5,batch=1,fake=3", ENDPOINTS),
+                        help=f"Endpoint weights from {','.join(ENDPOINTS)}")
+    parser.add_argument("--profiles", type=lambda value: parse_weights(value, PROFILES),
+                        default=parse_weights("short=6,long=3,adversarial=1", PROFILES),
+                        help=f"Payload weights from {','.join(PROFILES)}")
+    parser.add_argument("--model", choices=["vader", "roberta"], default="vader")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout in seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Save the per-level summaries as JSON")
+    args = parser.parse_args(argv)
+
+    summaries = asyncio.run(run(args))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(summaries, f, indent=2)
+        print(f"💾 Results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
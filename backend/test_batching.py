@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Tests for the dynamic micro-batching scheduler
+Uses a tiny randomly initialized RoBERTa so it runs on CPU without downloads
+"""
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("transformers")
+
+from app.batching import MicroBatcher
+from app.transformer import TransformerSentimentClassifier
+
+WORDS = ["great", "terrible", "product", "battery", "works", "broke", "love", "hate", "not", "very"]
+
+
+@pytest.fixture
+def classifier(tiny_roberta):
+    model, tokenizer = tiny_roberta(WORDS)
+    return TransformerSentimentClassifier(model, tokenizer, max_length=32)
+
+
+def test_concurrent_requests_share_forward_passes(classifier):
+    texts = [" ".join(WORDS[i:i + 1 + i % 5]) for i in range(10)] * 2
+
+    async def run():
+        batcher = MicroBatcher(classifier.predict_batch, max_batch_size=8, max_wait=0.05)
+        try:
+            results = await asyncio.gather(*[batcher.submit(text) for text in texts])
+        finally:
+            batcher.shutdown()
+        return batcher, results
+
+    batcher, results = asyncio.run(run())
+
+    assert batcher.batches == 3
+    assert batcher.full_flushes == 2
+    for text, result in zip(texts, results):
+        single = classifier.predict_batch([text])[0]
+        assert result["text_length"] == len(text)
+        assert result["sentiment"] == single["sentiment"]
+        for label, probability in single["details"]["probabilities"].items():
+            assert result["details"]["probabilities"][label] == pytest.approx(probability, abs=1e-5)
+
+
+def test_lone_request_flushes_after_max_wait():
+    calls = []
+
+    def batch_fn(items):
+        calls.append(list(items))
+        return [item.upper() for item in items]
+
+    async def run():
+        batcher = MicroBatcher(batch_fn, max_batch_size=32, max_wait=0.01)
+        try:
+            return await asyncio.wait_for(batcher.submit("ok"), timeout=1)
+        finally:
+            batcher.shutdown()
+
+    assert asyncio.run(run()) == "OK"
+    assert calls == [["ok"]]
+
+
+def test_batch_failure_reaches_every_caller():
+    def batch_fn(items):
+        raise RuntimeError("forward pass failed")
+
+    async def run():
+        batcher = MicroBatcher(batch_fn, max_batch_size=2, max_wait=0.01)
+        try:
+            return await asyncio.gather(batcher.submit("a"), batcher.submit("b"), return_exceptions=True)
+        finally:
+            batcher.shutdown()
+
+    outcomes = asyncio.run(run())
+    assert all(isinstance(outcome, RuntimeError) for outcome in outcomes)
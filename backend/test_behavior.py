@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Tests for the reviewer/product behavior store
+"""
+
+import uuid
+
+from app.behavior import BehaviorStore, DAY_SECONDS
+from app.dedup import content_digest
+from app.simple_models import SimpleFakeDetector
+
+DAY = 16000 * DAY_SECONDS
+
+
+def _review(reviewer, product, rating, day=0):
+    return {"reviewer_id": reviewer, "product_id": product, "rating": rating, "review_time": DAY + day * DAY_SECONDS}
+
+
+CORPUS = [
+    _review("alice", "cable", 5, 0),
+    _review("bob", "cable", 5, 1),
+    _review("carol", "cable", 4, 2),
+    _review("spammer", "cable", 1, 3),
+    _review("spammer", "charger", 1, 3),
+    _review("spammer", "mouse", 1, 3),
+    _review("alice", "charger", 4, 5),
+    _review(None, "mouse", 5, 5)
+]
+
+
+def test_build_matches_incremental_records_in_posting_order():
+    built = BehaviorStore.build(CORPUS)
+    incremental = BehaviorStore()
+    for review in CORPUS:
+        incremental.record(review["reviewer_id"], review["product_id"], review["rating"], review["review_time"])
+
+    profile = built.profile("alice", "cable", 5, DAY + 5 * DAY_SECONDS)
+    assert profile["reviewer_reviews"] == 2
+    assert profile["reviewer_average_rating"] == 4.5
+    assert profile["reviewer_max_daily_reviews"] == 2  # the checked review joins day 5
+    assert profile["product_reviews"] == 4
+    assert profile["product_average_rating"] == 3.75
+    assert profile["rating_deviation"] == 1.25
+
+    spammer = built.profile("spammer", "cable", 1, DAY + 9 * DAY_SECONDS)
+    assert spammer["reviewer_max_daily_reviews"] == 3
+    assert incremental.profile("spammer", "cable", 1, DAY + 9 * DAY_SECONDS)["reviewer_max_daily_reviews"] == 3
+    # The corpus pass measures deviation against final product averages
+    assert spammer["reviewer_rating_deviation"] > 2
+
+
+def test_unknown_ids_have_empty_profiles():
+    profile = BehaviorStore.build(CORPUS).profile("nobody", None, 5)
+    assert profile["reviewer_reviews"] == 0
+    assert profile["reviewer_max_daily_reviews"] == 1
+    assert profile["product_average_rating"] is None
+
+
+def test_save_and_load_round_trip(tmp_path):
+    path = str(tmp_path / "behavior.npz")
+    store = BehaviorStore.build(CORPUS, path=path)
+    store.save()
+
+    restored = BehaviorStore(path=path)
+    assert restored.stats()["reviewers"] == 4
+    assert restored.profile("spammer", "mouse", 1, 0) == store.profile("spammer", "mouse", 1, 0)
+    for day in range(2):
+        restored.record("new", "mouse", 3, DAY + day * DAY_SECONDS)
+    assert restored.profile("new", "mouse", 3, DAY)["reviewer_reviews"] == 2
+
+
+def test_behavior_raises_suspicion():
+    store = BehaviorStore()
+    for index in range(5):
+        store.record("burst", f"product-{index}", 5, DAY)
+    detector = SimpleFakeDetector()
+    result = detector.detect_fake_review("Solid build quality and the battery lasts all week long.", rating=5)
+
+    detector.flag_behavior(result, store.profile("burst", "product-0", 5, DAY))
+    assert result["behavior"]["reviewer_max_daily_reviews"] == 6
+    assert result["is_suspicious"]
+    assert "Reviewer posted 6 reviews in one day" in result["warnings"]
+
+
+def test_a_review_is_recorded_once():
+    store = BehaviorStore()
+    store.record("alice", "cable", 5, DAY)
+    digest = content_digest("Works great", "alice", "charger")
+    before = store.profile("alice", "charger", 2, DAY, digest=digest)
+
+    assert store.record("alice", "charger", 2, DAY, digest=digest)
+    for _ in range(3):
+        assert not store.record("alice", "charger", 2, DAY, digest=digest)
+    # Checking the recorded review again sees the store as it was before it
+    assert store.profile("alice", "charger", 2, DAY, digest=digest) == before
+    assert store.profile("alice", "charger", 2, DAY)["reviewer_reviews"] == 2
+    assert store.stats()["reviews"] == 1
+
+
+def test_build_counts_repeated_rows_once_and_skips_undated_ones_in_bursts(tmp_path):
+    repeated = {**_review("dave", "cable", 5, 1), "text": "Great"}
+    undated = [{**_review("erin", f"product-{index}", 4), "review_time": None} for index in range(5)]
+    path = str(tmp_path / "behavior.npz")
+    built = BehaviorStore.build(CORPUS + [repeated] * 3 + undated, path=path)
+
+    assert built.profile("dave", "mouse", 5, DAY)["reviewer_reviews"] == 1
+    erin = built.profile("erin", "mouse", 4, DAY)
+    assert erin["reviewer_reviews"] == 5 and erin["reviewer_max_daily_reviews"] == 1
+    built.save()
+    assert not BehaviorStore(path=path).record("dave", "cable", 5, DAY, content_digest("Great", "dave", "cable"))
+
+
+def test_rechecking_a_review_leaves_its_profile_and_risk_unchanged(client):
+    reviewer, product = f"R-{uuid.uuid4().hex}", f"P-{uuid.uuid4().hex}"
+    review = {"text": "Best cable ever, five stars!", "rating": 5, "reviewer_id": reviewer, "product_id": product}
+    results = [client.post("/detect/fake", json=review).json() for _ in range(6)]
+    assert all(result["behavior"] == results[0]["behavior"] for result in results)
+    assert results[0]["behavior"]["reviewer_reviews"] == 0
+    assert len({(result["risk_level"], tuple(result["warnings"])) for result in results}) == 1
+
+    # The same text on other products is a new review each time, served from the cache or not
+    profiles = [client.post("/detect/fake", json={**review, "product_id": f"{product}-{index}"}).json()["behavior"]
+                for index in range(5)]
+    assert [profile["reviewer_reviews"] for profile in profiles] == [1, 2, 3, 4, 5]
+    assert profiles[-1]["reviewer_max_daily_reviews"] == 6
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Tests for the offline bulk scoring CLI
+Covers part ordering, resuming an interrupted run, option checks on resume
+and malformed input lines
+"""
+
+import glob
+import json
+import os
+
+import pytest
+
+from app import bulk
+
+
+def _write_reviews(path, count, bad_lines=()):
+    with open(path, "w") as f:
+        for index in range(count):
+            if index in bad_lines:
+                f.write('{"reviewerID": "broken", "reviewText": \n')
+            review = {
+                "reviewerID": f"R{index}", "asin": "B0001", "overall": 5 if index % 2 else 1,
+                "reviewText": "Works great, would buy again!" if index % 2 else "Broke after one day, terrible."
+            }
+            f.write(json.dumps(review) + "\n")
+
+
+def _read_rows(output_dir):
+    rows = []
+    for path in sorted(glob.glob(os.path.join(output_dir, "part-*.jsonl"))):
+        with open(path) as f:
+            rows.extend(json.loads(line) for line in f)
+    return rows
+
+
+def test_parts_keep_input_order(tmp_path):
+    reviews, output = str(tmp_path / "reviews.json"), str(tmp_path / "scored")
+    _write_reviews(reviews, 53)
+
+    checkpoint = bulk.run(reviews, output, workers=2, chunk_size=10, fmt="jsonl")
+    assert checkpoint["complete"] and checkpoint["rows_done"] == 53 and checkpoint["parts_done"] == 6
+    assert [os.path.basename(path) for path in sorted(glob.glob(os.path.join(output, "part-*")))] == [
+        f"part-{part:05d}.jsonl" for part in range(6)
+    ]
+    rows = _read_rows(output)
+    assert [row["reviewer_id"] for row in rows] == [f"R{index}" for index in range(53)]
+    assert all(row["error"] is None and row["sentiment"] for row in rows)
+
+
+def test_interrupted_run_resumes_without_duplicates_or_gaps(tmp_path, monkeypatch):
+    reviews, output = str(tmp_path / "reviews.json"), str(tmp_path / "scored")
+    _write_reviews(reviews, 45)
+
+    write_part = bulk.write_part
+    written = []
+
+    def crash_after_two_parts(output_dir, part, columns, fmt):
+        if len(written) == 2:
+            raise KeyboardInterrupt
+        written.append(part)
+        return write_part(output_dir, part, columns, fmt)
+
+    monkeypatch.setattr(bulk, "write_part", crash_after_two_parts)
+    with pytest.raises(KeyboardInterrupt):
+        bulk.run(reviews, output, workers=2, chunk_size=10, fmt="jsonl")
+    with open(os.path.join(output, bulk.CHECKPOINT_FILE)) as f:
+        assert json.load(f)["rows_done"] == 20
+
+    monkeypatch.setattr(bulk, "write_part", write_part)
+    checkpoint = bulk.run(reviews, output, workers=2, chunk_size=10, fmt="jsonl")
+    assert checkpoint["rows_done"] == 45 and checkpoint["parts_done"] == 5
+    assert [row["reviewer_id"] for row in _read_rows(output)] == [f"R{index}" for index in range(45)]
+
+
+def test_resume_with_different_options_is_refused(tmp_path):
+    reviews, output = str(tmp_path / "reviews.json"), str(tmp_path / "scored")
+    _write_reviews(reviews, 5)
+    bulk.run(reviews, output, workers=1, chunk_size=2, fmt="jsonl")
+
+    for options in ({"chunk_size": 3, "fmt": "jsonl"}, {"chunk_size": 2, "fmt": "csv"},
+                    {"chunk_size": 2, "fmt": "jsonl", "analyses": ["sentiment"]}):
+        with pytest.raises(bulk.CheckpointMismatch, match="resume it with the same options"):
+            bulk.run(reviews, output, workers=1, **options)
+
+    other = str(tmp_path / "other.json")
+    _write_reviews(other, 3)
+    with pytest.raises(bulk.CheckpointMismatch, match="holds a checkpoint for"):
+        bulk.run(other, output, workers=1, chunk_size=2, fmt="jsonl")
+    # Only the CLI turns it into an exit
+    with pytest.raises(SystemExit, match="holds a checkpoint for"):
+        bulk.main([other, output, "--chunk-size", "2", "--format", "jsonl", "--workers", "1"])
+    with pytest.raises(SystemExit):
+        bulk.main([reviews, str(tmp_path / "other"), "--model", "roberta"])
+
+
+def test_malformed_lines_become_error_rows(tmp_path):
+    reviews, output = str(tmp_path / "reviews.json"), str(tmp_path / "scored")
+    # 25 good rows, one broken line, then one more row
+    _write_reviews(reviews, 26, bad_lines=(25,))
+    with open(reviews, "a") as f:
+        f.write("[1, 2]\n")
+
+    checkpoint = bulk.run(reviews, output, workers=2, chunk_size=10, fmt="jsonl")
+    assert checkpoint["complete"] and checkpoint["rows_done"] == 28
+    rows = _read_rows(output)
+    assert [row["reviewer_id"] for row in rows[:25]] == [f"R{index}" for index in range(25)]
+    assert rows[25]["error"].startswith("Malformed JSON on line 26")
+    assert rows[25]["sentiment"] is None
+    assert rows[26]["reviewer_id"] == "R25" and rows[26]["error"] is None
+    assert rows[27]["error"] == "Line 28 is not a JSON object"
+
+    # Skipping for a resume counts malformed lines as rows without parsing them
+    skipped = list(bulk.iter_records(reviews, skip=25))
+    assert skipped[0]["error"].startswith("Malformed JSON on line 26") and len(skipped) == 3
+
+
+def test_skipped_csv_rows_may_span_lines(tmp_path):
+    reviews = str(tmp_path / "reviews.csv")
+    with open(reviews, "w", newline="") as f:
+        f.write('reviewerID,overall,reviewText\nR0,5,"Two\nlines"\nR1,1,Broke\nR2,4,Fine\n')
+    assert [record["reviewer_id"] for record in bulk.iter_records(reviews, skip=1)] == ["R1", "R2"]
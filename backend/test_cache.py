@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Tests for the in-memory result cache
+Covers the byte-bounded LRU, TTL expiry, request coalescing and errors
+reaching coalesced callers
+"""
+
+import asyncio
+
+from app import cache
+from app.cache import ResultCache, estimate_size, make_cache_key
+
+
+def test_cache_key_ignores_parameter_order():
+    assert make_cache_key("fake", text="good", rating=5) == make_cache_key("fake", rating=5, text="good")
+    assert make_cache_key("fake", text="good", rating=5) != make_cache_key("fake", text="good", rating=4)
+    assert make_cache_key("fake", text="good") != make_cache_key("sentiment", text="good")
+
+
+def test_lru_evicts_least_recently_used_over_byte_budget():
+    value = {"sentiment": "Positive", "confidence": 0.9}
+    entry_size = estimate_size(value) + estimate_size(make_cache_key("a"))
+    results = ResultCache(max_bytes=3 * entry_size, ttl=60)
+    keys = [make_cache_key(name) for name in "abcd"]
+
+    for key in keys[:3]:
+        results.put(key, dict(value))
+    assert results.current_bytes == 3 * entry_size
+    # Touching "a" makes "b" the least recently used
+    assert results.get(keys[0])[0]
+    results.put(keys[3], dict(value))
+
+    assert [results.get(key)[0] for key in keys] == [True, False, True, True]
+    assert results.evictions == 1 and results.current_bytes == 3 * entry_size
+
+    # A value bigger than the whole budget is not cached, and evicts nothing
+    results.put(make_cache_key("huge"), {"text": "x" * (4 * entry_size)})
+    assert results.stats()["entries"] == 3 and results.evictions == 1
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+    results = ResultCache(ttl=10)
+    results.put("key", {"value": 1})
+
+    now[0] += 9.9
+    assert results.lookup("key") == (True, {"value": 1})
+    now[0] += 0.1
+    assert results.lookup("key") == (False, None)
+    stats = results.stats()
+    assert stats["expirations"] == 1 and stats["entries"] == 0 and stats["bytes"] == 0
+    assert stats["hits"] == 1 and stats["misses"] == 1
+
+
+def test_concurrent_misses_share_one_computation():
+    results = ResultCache()
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"sentiment": "Positive"}
+
+    async def run():
+        values = await asyncio.gather(*[results.get_or_compute("key", compute) for _ in range(20)])
+        return values + [await results.get_or_compute("key", compute)]
+
+    values = asyncio.run(run())
+    assert len(calls) == 1
+    assert all(value == {"sentiment": "Positive"} for value in values)
+    stats = results.stats()
+    assert (stats["misses"], stats["coalesced"], stats["hits"], stats["in_flight"]) == (1, 19, 1, 0)
+
+
+def test_errors_reach_coalesced_callers_and_are_not_cached():
+    results = ResultCache()
+    calls = []
+
+    async def failing():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        raise RuntimeError("model crashed")
+
+    async def succeeding():
+        return {"sentiment": "Negative"}
+
+    async def run():
+        outcomes = await asyncio.gather(
+            *[results.get_or_compute("key", failing) for _ in range(5)], return_exceptions=True
+        )
+        return outcomes, await results.get_or_compute("key", succeeding)
+
+    outcomes, retried = asyncio.run(run())
+    assert len(calls) == 1
+    assert all(isinstance(outcome, RuntimeError) and str(outcome) == "model crashed" for outcome in outcomes)
+    assert retried == {"sentiment": "Negative"}
+    assert results.stats()["in_flight"] == 0
+
+
+def test_disabled_cache_always_computes():
+    results = ResultCache(max_bytes=0)
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        return len(calls)
+
+    async def run():
+        return [await results.get_or_compute("key", compute) for _ in range(3)]
+
+    assert asyncio.run(run()) == [1, 2, 3]
+    results.put("key", 1)
+    assert results.get("key") == (False, None)
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Tests for concurrent model comparison
+Uses a stand-in transformer that sleeps, so no checkpoint is needed
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from app.executor import OverloadedError
+
+TEXT = "  Love it, works great!  "
+
+
+def _compare(manager, **kwargs):
+    async def run():
+        await manager._load_vader()
+        try:
+            return await manager.compare_models(TEXT, **kwargs)
+        finally:
+            manager.shutdown()
+    return asyncio.run(run())
+
+
+def test_models_run_concurrently_and_agree(slow_roberta_manager):
+    comparison = _compare(slow_roberta_manager(0.2), timeout=2)
+    assert set(comparison.models) == {"vader", "roberta"}
+    assert comparison.text == TEXT.strip()
+    assert comparison.agreement and not comparison.partial
+    assert comparison.recommended == "roberta"
+    assert set(comparison.timings) == {"vader", "roberta"}
+
+
+def test_slow_model_degrades_to_partial_result(slow_roberta_manager):
+    started_at = time.perf_counter()
+    comparison = _compare(slow_roberta_manager(1.0), timeout=0.2)
+    assert time.perf_counter() - started_at < 0.9
+    assert set(comparison.models) == {"vader"}
+    assert comparison.partial
+    assert "roberta" in comparison.errors
+    assert comparison.recommended == "vader"
+
+
+def test_overload_is_partial_unless_every_model_was_turned_away(slow_roberta_manager):
+    manager = slow_roberta_manager(0.01)
+    answer = manager._sentiment
+
+    async def full_queue(text, model, *args):
+        if model in turned_away:
+            raise OverloadedError(turned_away[model])
+        return await answer(text, model, *args)
+
+    manager._sentiment = full_queue
+    turned_away = {"vader": 2}
+    comparison = _compare(manager)
+    assert set(comparison.models) == {"roberta"} and comparison.partial
+    assert comparison.errors == {"vader": "Inference queue is full, retry later"}
+
+    turned_away = {"vader": 2, "roberta": 5}
+    with pytest.raises(OverloadedError) as overloaded:
+        _compare(manager)
+    assert overloaded.value.retry_after == 5
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Tests for per-request deadlines, cancellation and load shedding
+Uses a stand-in transformer that sleeps, so no checkpoint is needed
+"""
+
+import asyncio
+import pickle
+import time
+
+import pytest
+
+from app.deadlines import Deadline, cancel_on_disconnect
+from app.executor import InferenceExecutor, OverloadedError
+from app.workers import analyze_sentiment_shard
+
+
+def test_header_can_only_shorten_the_configured_timeout():
+    assert 4 < Deadline.from_header(None, 5).remaining() <= 5
+    assert 1 < Deadline.from_header("2", 5).remaining() <= 2
+    assert 4 < Deadline.from_header("60", 5).remaining() <= 5
+    assert 1 < Deadline.from_header("2", 5, elapsed=0.5).remaining() <= 1.5
+    assert Deadline.from_header(None, 0).remaining() is None
+    for header in ("0", "-1", "nan", "soon"):
+        with pytest.raises(ValueError):
+            Deadline.from_header(header, 5)
+
+
+def test_shard_stops_at_item_boundary():
+    deadline = Deadline(None)
+    assert all("error" not in result for result in analyze_sentiment_shard(["good", "bad"], "vader", deadline))
+
+    deadline.cancel("client disconnected")
+    results = analyze_sentiment_shard(["good", "bad"], "vader", deadline)
+    assert all(result["skipped"] for result in results)
+    assert results[0]["error"] == "Not analyzed: client disconnected"
+
+    # Worker processes see the expiry and any earlier cancellation
+    copy = pickle.loads(pickle.dumps(deadline))
+    assert copy.stop_reason() == "client disconnected"
+    assert pickle.loads(pickle.dumps(Deadline(-1))).stop_reason() == "request deadline exceeded"
+
+
+def test_executor_sheds_requests_that_would_miss_their_deadline():
+    executor = InferenceExecutor(workers=1, queue_size=8)
+    # One request running, and requests have been taking 2s each
+    executor.in_flight, executor.completed, executor.total_run = 1, 1, 2.0
+
+    async def admit(deadline):
+        async with executor.admit(deadline):
+            return True
+
+    with pytest.raises(OverloadedError):
+        asyncio.run(admit(Deadline(1)))
+    assert executor.shed == 1
+    assert asyncio.run(admit(Deadline(10)))
+    assert asyncio.run(admit(None))
+
+
+def test_batch_returns_partial_results_at_deadline(slow_roberta_manager):
+    # One text per forward pass, so the batch can stop between them
+    manager = slow_roberta_manager(0.1, max_batch_size=1)
+    texts = [f"Review number {index}" for index in range(20)]
+
+    async def run():
+        try:
+            return await manager.batch_sentiment_analysis(texts, "roberta", Deadline(0.35))
+        finally:
+            manager.shutdown()
+
+    started_at = time.perf_counter()
+    results = asyncio.run(run())
+    assert time.perf_counter() - started_at < 1.0
+    done = [result for result in results if "error" not in result]
+    skipped = [result for result in results if result.get("skipped")]
+    assert 1 <= len(done) < len(texts) and len(done) + len(skipped) == len(texts)
+    assert skipped[0]["error"] == "Not analyzed: request deadline exceeded"
+    # Finished items are kept in order and cached; skipped ones are not
+    assert [result["text_length"] for result in results[:len(done)]] == [len(text) for text in texts[:len(done)]]
+    assert manager.cache.stats()["entries"] == len(done)
+
+
+class _Request:
+    """Stands in for a Starlette request whose client leaves after a while"""
+
+    def __init__(self, leaves_after):
+        self.leaves_at = time.monotonic() + leaves_after
+
+    async def is_disconnected(self):
+        return time.monotonic() >= self.leaves_at
+
+
+def test_disconnect_cancels_remaining_batch_work(slow_roberta_manager):
+    manager = slow_roberta_manager(0.1, max_batch_size=1)
+    texts = [f"Another review {index}" for index in range(20)]
+
+    async def run():
+        deadline = Deadline(None)
+        try:
+            async with cancel_on_disconnect(_Request(0.25), deadline):
+                return await manager.batch_sentiment_analysis(texts, "roberta", deadline)
+        finally:
+            manager.shutdown()
+
+    results = asyncio.run(run())
+    skipped = [result for result in results if result.get("skipped")]
+    assert skipped and skipped[0]["error"] == "Not analyzed: client disconnected"
+    assert manager.roberta_batcher.items < len(texts)
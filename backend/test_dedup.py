@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Tests for the near-duplicate review index
+"""
+
+import uuid
+
+from app.dedup import NearDuplicateIndex, content_digest
+from app.simple_models import SimpleFakeDetector
+
+REVIEW = (
+    "This charger stopped working after two weeks and the seller never answered my emails. "
+    "The cable frays near the plug and it gets hot while charging my phone overnight."
+)
+RESUBMITTED = REVIEW.replace("two weeks", "two weeks!!").upper()
+UNRELATED = (
+    "Excellent headphones with deep bass, comfortable ear pads and a battery that lasts "
+    "the whole flight. The case is sturdy and the bluetooth pairing was instant."
+)
+
+
+def test_finds_near_duplicates_not_unrelated_reviews():
+    index = NearDuplicateIndex()
+    first = index.add(REVIEW)
+    index.add(UNRELATED)
+
+    assert [review_id for review_id, _ in index.query(RESUBMITTED)] == [first]
+    assert index.count_near_duplicates("Arrived on time, exactly as described, five stars") == 0
+    assert index.add("") is None
+
+
+def test_check_and_add_counts_earlier_copies_only():
+    index = NearDuplicateIndex(merge_every=2)
+    digests = [content_digest(REVIEW, f"R{reviewer}", "B0001") for reviewer in range(4)]
+    assert [index.check_and_add(REVIEW, digest) for digest in digests] == [0, 1, 2, 3]
+    assert index.stats()["pending"] == 0
+
+
+def test_resubmitting_the_same_review_is_not_a_duplicate():
+    index = NearDuplicateIndex()
+    digest = content_digest(REVIEW, "R1", "B0001")
+    assert [index.check_and_add(REVIEW, digest) for _ in range(5)] == [0, 0, 0, 0, 0]
+    assert len(index) == 1
+    # Another reviewer, or another product, posting the same words still counts
+    assert index.check_and_add(REVIEW, content_digest(REVIEW, "R2", "B0001")) == 1
+    assert index.count_near_duplicates(REVIEW, content_digest(REVIEW, "R1", "B0002")) == 2
+    assert index.count_near_duplicates(REVIEW, digest) == 1
+
+def test_capacity_bounds_the_index():
+    index = NearDuplicateIndex(max_items=1)
+    assert index.add(REVIEW) == 0
+    assert index.add(UNRELATED) is None
+    assert len(index) == 1
+
+
+def test_save_and_load_round_trip(tmp_path):
+    path = str(tmp_path / "duplicates.npz")
+    index = NearDuplicateIndex(path=path)
+    index.add(REVIEW)
+    index.add(UNRELATED)
+    index.save()
+
+    restored = NearDuplicateIndex(path=path)
+    assert len(restored) == 2
+    assert restored.count_near_duplicates(RESUBMITTED) == 1
+    # The saved digest still recognises a re-check of the same review
+    assert restored.check_and_add(REVIEW) == 0 and len(restored) == 2
+    assert restored.count_near_duplicates(REVIEW, content_digest(REVIEW, "R9", "B0009")) == 1
+
+    # Signatures from different parameters are not comparable
+    assert len(NearDuplicateIndex(path=path, bands=8)) == 0
+
+
+def test_near_duplicates_raise_suspicion():
+    detector = SimpleFakeDetector()
+    result = detector.detect_fake_review(REVIEW, rating=3)
+    assert result["risk_level"] == "Low"
+
+    detector.flag_near_duplicates(result, 3)
+    assert result["features"]["near_duplicates"] == 3
+    assert result["is_suspicious"] and result["risk_level"] == "Medium"
+    assert "Near-duplicate of 3 existing reviews" in result["warnings"]
+
+
+def test_rechecking_a_review_does_not_change_its_risk(client):
+    # Unique per run, so the shared process-wide index has not seen it yet
+    text = f"{REVIEW} Order {uuid.uuid4().hex}"
+    checks = [client.post("/detect/fake", json={"text": text, "rating": 3}).json() for _ in range(6)]
+    assert [check["features"]["near_duplicates"] for check in checks] == [0] * 6
+    assert len({check["risk_level"] for check in checks}) == 1
+    assert not any(warning.startswith("Near-duplicate") for check in checks for warning in check["warnings"])
+
+    # The same words from a reviewer are a repost, cached result or not
+    repost = {"text": text, "rating": 3, "reviewer_id": f"R-{uuid.uuid4().hex}"}
+    assert client.post("/detect/fake", json=repost).json()["features"]["near_duplicates"] == 1
+    full = client.post("/analyze/full", json={"text": text, "rating": 3, "model": "vader"}).json()
+    assert full["fake"]["features"]["near_duplicates"] == 1
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Tests for the offline evaluation harness
+"""
+
+import csv
+
+from app.evaluation import (
+    classification_metrics, compare_reports, evaluate, load_labeled_split, load_reports,
+    percentile, save_report
+)
+from app.workers import analyze_sentiment_shard
+
+
+def _vader(texts):
+    return analyze_sentiment_shard(texts, "vader")
+
+
+def _write_split(path, rows):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=["Score", "Text"])
+        writer.writeheader()
+        writer.writerows({"Score": score, "Text": text} for score, text in rows)
+
+
+def test_classification_metrics_match_hand_counts():
+    y_true = ["Negative", "Negative", "Neutral", "Positive", "Positive", "Positive"]
+    y_pred = ["Negative", "Positive", "Neutral", "Positive", "Positive", None]
+    metrics = classification_metrics(y_true, y_pred)
+
+    assert metrics["accuracy"] == 4 / 6
+    assert metrics["confusion_matrix"] == [[1, 0, 1], [0, 1, 0], [0, 0, 2]]
+    assert metrics["precision"]["Positive"] == 2 / 3
+    assert metrics["recall"]["Positive"] == 2 / 3
+    assert metrics["recall"]["Negative"] == 0.5
+    assert metrics["f1_score"]["Neutral"] == 1.0
+    assert metrics["errors"] == 1
+
+
+def test_percentile_nearest_rank():
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 99) == 99
+    assert percentile([], 99) == 0.0
+
+
+def test_split_loading_and_baseline_comparison(tmp_path):
+    path = tmp_path / "val.csv"
+    _write_split(path, [
+        (5, "Absolutely love it, works great!"),
+        (1, "Terrible, it broke after one day."),
+        (3, "It is a cable."),
+        ("", "Unlabeled rows are skipped")
+    ])
+    texts, labels = load_labeled_split(str(path))
+    assert labels == ["Positive", "Negative", "Neutral"]
+
+    report = evaluate(texts, labels, _vader, "vader", batch_size=2)
+    assert report["quality"]["accuracy"] == 1.0
+    assert report["speed"]["reviews_per_second"] > 0
+    assert compare_reports(report, report) == []
+    assert compare_reports(report, dict(report, version=1))[0].startswith("baseline is a version 1 report")
+
+    changed = evaluate(texts, labels, lambda batch: [{"sentiment": "Neutral"} for _ in batch], "vader")
+    regressions = compare_reports(changed, report)
+    assert "predictions differ from the baseline" in regressions
+    assert any(regression.startswith("accuracy dropped") for regression in regressions)
+
+    save_report(report, str(tmp_path / "reports" / "vader.json"))
+    assert load_reports(str(tmp_path / "reports"))["vader"]["quality"]["accuracy"] == 1.0
+
+
+def test_latency_is_measured_per_batch():
+    clock = [0.0]
+
+    def predictor(batch):
+        # 5 ms per call plus 10 ms per review
+        clock[0] += 0.005 + 0.010 * len(batch)
+        return [{"sentiment": "Positive"} for _ in batch]
+
+    report = evaluate(["Great"] * 10, ["Positive"] * 10, predictor, "fixed", batch_size=4,
+                      clock=lambda: clock[0])
+    # Batches of 4, 4 and 2 reviews: 45, 45 and 25 ms
+    assert round(report["speed"]["batch_latency_p50_ms"], 6) == 45.0
+    assert round(report["speed"]["batch_latency_p99_ms"], 6) == 45.0
+    assert round(report["speed"]["total_seconds"], 6) == 0.115
+    assert round(report["speed"]["reviews_per_second"], 6) == round(10 / 0.115, 6)
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared review feature extractor
+Checks the fused features against the per-analyzer formulas they replace
+"""
+
+import random
+import re
+
+from app.features import extract_review_features, contains_email, count_repeated_words
+from app.simple_models import review_analyzer, fake_detector, helpfulness_analyzer
+
+TOKENS = [
+    "great", "GREAT", "the", "the the the", "battery", ".", "!", "?", "...", "!!", "?!",
+    "http://example.com", "https://x.io", "me@example.com", "a@b", "555-123-4567",
+    "555 123 4567", "5551234567", "\n", "\t", "", "OK.", "@", "a@", "@b", "The", "theory",
+    "_", "ünï", "Ünï", ",", "\u00a0"
+]
+
+ADVERSARIAL = [
+    "a" * 5000,
+    "a" * 4999 + "@",
+    "1" * 5000,
+    "@ " * 2500,
+    " ".join(["w" * 99] * 50),
+    " ".join(["w" * 98 + ("x" if i % 2 else "y") for i in range(50)])
+]
+
+
+def _reference_features(text, rating):
+    return {
+        "text_length": len(text),
+        "word_count": len(text.split()),
+        "sentence_count": len(re.split(r'[.!?]+', text)),
+        "single_sentence": len(text.split('.')) <= 2,
+        "exclamation_count": text.count('!'),
+        "question_count": text.count('?'),
+        "uppercase_ratio": sum(1 for c in text if c.isupper()) / len(text) if text else 0,
+        "has_url": bool(re.search(r'http[s]?://', text)),
+        "has_email": bool(re.search(r'\S+@\S+', text)),
+        "has_phone": bool(re.search(r'(\d{3}[-\.\s]??\d{3}[-\.\s]??\d{4})', text)),
+        "repeated_phrases": len(re.findall(r'\b(\w+)(\s+\1){2,}\b', text.lower())),
+        "extreme_rating": rating in [1, 5]
+    }
+
+
+def test_fused_features_match_reference():
+    rng = random.Random(7)
+    for _ in range(3000):
+        text = " ".join(rng.choice(TOKENS) for _ in range(rng.randint(0, 30)))
+        rating = rng.randint(1, 5)
+        expected = _reference_features(text, rating)
+        features = extract_review_features(text, "", rating)
+        single_sentence = expected.pop("single_sentence")
+
+        assert (features["period_count"] <= 1) == single_sentence, text
+        for name, value in expected.items():
+            assert features[name] == value, (name, text)
+
+
+def test_detectors_match_regexes_on_adversarial_inputs():
+    for text in ADVERSARIAL:
+        assert contains_email(text) == bool(re.search(r'\S+@\S+', text))
+        assert count_repeated_words(text) == len(re.findall(r'\b(\w+)(\s+\1){2,}\b', text))
+
+
+def test_full_analysis_matches_individual_analyzers():
+    text = "Love it!!! Works GREAT with my laptop. Contact me@example.com for deals deals deals."
+    full = review_analyzer.analyze_review(text, "Great", 5, 3, 4, "vader")
+    fake = fake_detector.detect_fake_review(text, "Great", 5)
+    helpfulness = helpfulness_analyzer.analyze_helpfulness(text, 3, 4)
+
+    assert full["fake"]["features"] == fake["features"]
+    assert full["fake"]["warnings"] == fake["warnings"]
+    assert full["helpfulness"]["features"] == helpfulness["features"]
+    assert full["helpfulness"]["helpfulness_category"] == helpfulness["helpfulness_category"]
+    assert full["sentiment"]["sentiment"] == "Positive"
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Tests for background bulk-analysis jobs
+"""
+
+import asyncio
+import io
+import json
+import os
+
+import pytest
+from starlette.datastructures import UploadFile
+
+from app.bulk import save_checkpoint
+from app.jobs import JobManager
+
+REVIEWS = [
+    {"reviewerID": f"R{index}", "asin": "B0001", "overall": 5 if index % 2 else 1,
+     "reviewText": "Works great, would buy again!" if index % 2 else "Broke after one day, terrible."}
+    for index in range(7)
+]
+
+
+def _upload(name="reviews.jsonl"):
+    data = "".join(json.dumps(review) + "\n" for review in REVIEWS).encode()
+    return UploadFile(io.BytesIO(data), filename=name)
+
+
+async def _wait(manager, job_id, timeout=60):
+    for _ in range(int(timeout / 0.05)):
+        job = manager.get(job_id)
+        if job["status"] in ("completed", "failed"):
+            return job
+        await asyncio.sleep(0.05)
+    raise AssertionError("job did not finish")
+
+
+def test_job_runs_in_chunks_and_pages_results(tmp_path):
+    async def scenario():
+        manager = JobManager(str(tmp_path), chunk_size=3)
+        await manager.start()
+        try:
+            job = await manager.create(_upload(), ["sentiment", "fake"], "vader")
+            assert job["status"] == "queued" and job["bytes"] > 0
+            return manager, await _wait(manager, job["job_id"])
+        finally:
+            manager.shutdown()
+
+    manager, job = asyncio.run(scenario())
+    assert job["status"] == "completed"
+    assert (job["total_rows"], job["rows_done"], job["parts_done"], job["progress"]) == (7, 7, 3, 1.0)
+
+    page = manager.results_page(job["job_id"], offset=2, limit=3)
+    assert page["total"] == 7
+    assert [row["reviewer_id"] for row in page["rows"]] == ["R2", "R3", "R4"]
+    assert page["rows"][1]["sentiment"] == "Positive"
+    assert "helpfulness_category" not in page["rows"][0]
+
+    streamed = b"".join(manager.iter_results(job["job_id"])).decode().splitlines()
+    assert [json.loads(line)["reviewer_id"] for line in streamed] == [f"R{index}" for index in range(7)]
+
+
+def test_corrupt_line_becomes_an_error_row(tmp_path):
+    lines = [json.dumps(review) for review in REVIEWS]
+    lines.insert(4, '{"reviewerID": "R-broken", "reviewText": "cut off')
+    upload = UploadFile(io.BytesIO(("\n".join(lines) + "\n").encode()), filename="reviews.jsonl")
+
+    async def scenario():
+        manager = JobManager(str(tmp_path), chunk_size=3)
+        await manager.start()
+        try:
+            job = await manager.create(upload, ["sentiment"], "vader")
+            return manager, await _wait(manager, job["job_id"])
+        finally:
+            manager.shutdown()
+
+    manager, job = asyncio.run(scenario())
+    assert job["status"] == "completed"
+    assert (job["total_rows"], job["rows_done"], job["progress"]) == (8, 8, 1.0)
+
+    rows = manager.results_page(job["job_id"], limit=10)["rows"]
+    assert rows[4]["error"].startswith("Malformed JSON on line 5") and rows[4]["sentiment"] is None
+    assert [row["reviewer_id"] for row in rows[:4] + rows[5:]] == [f"R{index}" for index in range(7)]
+
+
+def test_restart_resumes_from_last_committed_chunk(tmp_path):
+    async def queue_only():
+        manager = JobManager(str(tmp_path), chunk_size=3)
+        await manager.start()
+        manager.shutdown()
+        job = await manager.create(_upload(), ["sentiment"], "vader")
+        return job["job_id"]
+
+    job_id = asyncio.run(queue_only())
+    job_dir = os.path.join(str(tmp_path), job_id)
+    # A previous run committed the first chunk, then the server went down
+    with open(os.path.join(job_dir, "part-00000.jsonl"), "w") as f:
+        for index in range(3):
+            f.write(json.dumps({"reviewer_id": f"committed-{index}"}) + "\n")
+    save_checkpoint(job_dir, {"input": os.path.join(job_dir, "input.jsonl"), "rows_done": 3, "parts_done": 1})
+
+    async def restart():
+        manager = JobManager(str(tmp_path), chunk_size=3)
+        await manager.start()
+        try:
+            return manager, await _wait(manager, job_id)
+        finally:
+            manager.shutdown()
+
+    manager, job = asyncio.run(restart())
+    assert job["status"] == "completed" and job["rows_done"] == 7
+    rows = manager.results_page(job_id, limit=10)["rows"]
+    assert [row["reviewer_id"] for row in rows] == ["committed-0", "committed-1", "committed-2", "R3", "R4", "R5", "R6"]
+
+
+def test_checkpoint_for_another_input_fails_only_that_job(tmp_path):
+    async def queue_only():
+        manager = JobManager(str(tmp_path), chunk_size=3)
+        await manager.start()
+        manager.shutdown()
+        job = await manager.create(_upload(), ["sentiment"], "vader")
+        return job["job_id"]
+
+    job_id = asyncio.run(queue_only())
+    job_dir = os.path.join(str(tmp_path), job_id)
+    save_checkpoint(job_dir, {"input": "/elsewhere/input.jsonl", "rows_done": 3, "parts_done": 1})
+
+    async def restart():
+        manager = JobManager(str(tmp_path), chunk_size=3)
+        await manager.start()
+        try:
+            failed = await _wait(manager, job_id)
+            # The worker keeps going
+            job = await manager.create(_upload(), ["sentiment"], "vader")
+            return failed, await _wait(manager, job["job_id"])
+        finally:
+            manager.shutdown()
+
+    failed, job = asyncio.run(restart())
+    assert failed["status"] == "failed" and "holds a checkpoint for /elsewhere/input.jsonl" in failed["error"]
+    assert failed["rows_done"] == 0
+    assert job["status"] == "completed" and job["rows_done"] == 7
+
+
+def test_unknown_job_ids_are_rejected(tmp_path):
+    manager = JobManager(str(tmp_path))
+    for job_id in ("0" * 32, "../../etc"):
+        try:
+            manager.get(job_id)
+        except KeyError:
+            continue
+        raise AssertionError(f"{job_id} should not resolve")
+
+
+def test_job_locked_by_another_process_is_left_alone(tmp_path):
+    fcntl = pytest.importorskip("fcntl")
+
+    async def queue_only():
+        manager = JobManager(str(tmp_path), chunk_size=3)
+        await manager.start()
+        manager.shutdown()
+        return (await manager.create(_upload(), ["sentiment"], "vader"))["job_id"]
+
+    job_id = asyncio.run(queue_only())
+    # Another server process sharing JOBS_DIR is running this job
+    lock = os.open(os.path.join(str(tmp_path), job_id, "job.lock"), os.O_RDWR | os.O_CREAT)
+    fcntl.flock(lock, fcntl.LOCK_EX)
+
+    async def second_process():
+        manager = JobManager(str(tmp_path), chunk_size=3, poll_interval=0.05)
+        await manager.start()
+        try:
+            await asyncio.sleep(0.3)
+            assert manager.get(job_id)["status"] == "queued"
+            # That process exits, releasing the lock; this one resumes the job
+            os.close(lock)
+            return await _wait(manager, job_id)
+        finally:
+            manager.shutdown()
+
+    job = asyncio.run(second_process())
+    assert job["status"] == "completed" and job["rows_done"] == 7
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Tests for the precompiled lexicon artifact
+Checks the mapped tables against the parsed dicts, and that the VADER and
+polarity scorers give identical scores from either
+"""
+
+import pytest
+
+from app import lexicons
+from app.lexicons import LexiconArtifact, build, compile_tables, load_from_env
+from app.polarity import FastPolarityScorer
+from app.vader_engine import FastVaderScorer
+from test_vader_engine import REVIEW_CORPUS, _fuzz_texts
+
+
+@pytest.fixture(scope="module")
+def artifact_path(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("lexicons") / "lexicons.bin")
+    build(path)
+    return path
+
+
+@pytest.mark.parametrize("cache_size", [0, 64])
+def test_tables_match_parsed_word_lists(artifact_path, cache_size):
+    artifact = LexiconArtifact(artifact_path, cache_size=cache_size)
+    for name, (_, entries) in compile_tables().items():
+        table = artifact[name]
+        assert len(table) == len(entries)
+        assert dict(table.items()) == entries, name
+        for word, value in entries.items():
+            assert table.get(word) == value and word in table
+
+    table = artifact["vader_lexicon"]
+    for word in ("", "zzzz", "x" * 100, "café", "\ud800", "good "):
+        assert table.get(word) is None and word not in table
+    with pytest.raises(KeyError):
+        table["zzzz"]
+
+
+def test_mapped_scorers_match_parsed(artifact_path):
+    artifact = LexiconArtifact(artifact_path, cache_size=256)
+    texts = REVIEW_CORPUS + _fuzz_texts(2000)
+
+    assert FastVaderScorer(lexicons=artifact).score_many(texts) == FastVaderScorer().score_many(texts)
+
+    pytest.importorskip("textblob")
+    assert FastPolarityScorer(lexicons=artifact).score_many(texts) == FastPolarityScorer().score_many(texts)
+
+
+def test_env_artifact_falls_back_when_missing_stale_or_invalid(artifact_path, tmp_path, monkeypatch):
+    monkeypatch.delenv("LEXICON_PATH", raising=False)
+    assert load_from_env() is None
+
+    monkeypatch.setenv("LEXICON_PATH", str(tmp_path / "missing.bin"))
+    assert load_from_env() is None
+
+    invalid = tmp_path / "invalid.bin"
+    invalid.write_bytes(b"not a lexicon artifact")
+    monkeypatch.setenv("LEXICON_PATH", str(invalid))
+    assert load_from_env() is None
+
+    monkeypatch.setenv("LEXICON_PATH", artifact_path)
+    assert load_from_env().is_current()
+
+    monkeypatch.setattr(lexicons, "source_versions", lambda: {"vaderSentiment": "0.0", "textblob": None})
+    assert load_from_env() is None
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Tests for the /metrics latency histograms
+Checks the Prometheus text exposition of the histograms directly and through
+the running app
+"""
+
+import math
+import re
+import uuid
+
+from app.metrics import MetricsRegistry, merge_shard
+
+SAMPLE = re.compile(r'^(\w+)(?:\{(.*)\})? (\S+)$')
+LABEL = re.compile(r'(\w+)="((?:[^"\\]|\\.)*)"')
+
+
+def _samples(text):
+    """{(metric name, frozenset of label pairs): value} from Prometheus text"""
+    samples = {}
+    for line in text.splitlines():
+        if not line or line.startswith("#"):
+            continue
+        name, labels, value = SAMPLE.match(line).groups()
+        samples[(name, frozenset(LABEL.findall(labels or "")))] = float(value)
+    return samples
+
+
+def _series(samples, metric, **labels):
+    """Buckets as [(le, count)] in bound order, plus sum and count, of one labeled series"""
+    wanted = set(labels.items())
+    buckets = sorted(
+        (float(dict(key)["le"]), value) for (name, key), value in samples.items()
+        if name == f"{metric}_bucket" and wanted == set(key) - {("le", dict(key)["le"])}
+    )
+    key = frozenset(wanted)
+    return buckets, samples.get((f"{metric}_sum", key), 0.0), samples.get((f"{metric}_count", key), 0.0)
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("op_seconds", "Time per op", ["op"], buckets=(0.1, 1.0))
+    assert registry.histogram("op_seconds", "Time per op", ["op"]) is histogram
+    for value in (0.05, 0.5, 0.5, 3.0):
+        histogram.observe(value, op='say "hi"')
+    histogram.observe(0.1, op="other")
+
+    text = registry.render({"queue_depth": ("Waiting requests", 2)})
+    assert text.splitlines()[:2] == ["# HELP op_seconds Time per op", "# TYPE op_seconds histogram"]
+    assert 'op_seconds_bucket{op="say \\"hi\\"",le="0.1"} 1' in text
+    assert "# TYPE queue_depth gauge\nqueue_depth 2.0\n" in text
+
+    samples = _samples(text)
+    assert _series(samples, "op_seconds", op='say \\"hi\\"') == ([(0.1, 1), (1.0, 3), (math.inf, 4)], 4.05, 4)
+    # A value on a bucket's bound falls in that bucket
+    assert _series(samples, "op_seconds", op="other") == ([(0.1, 1), (1.0, 1), (math.inf, 1)], 0.1, 1)
+
+
+def test_worker_shards_are_summed_when_rendering(tmp_path):
+    main = str(tmp_path / "metrics.json")
+    workers = []
+    for slot in range(2):
+        registry = MetricsRegistry()
+        registry.histogram("op_seconds", "Time per op", ["op"], buckets=(0.1, 1.0)).observe(0.05, op="read")
+        registry.start_shard(f"{main}.worker{slot}", main)
+        workers.append(registry)
+    # Values recorded before the fork are the master's
+    assert "op_seconds_count" not in workers[0].render()
+
+    reads = [registry.histogram("op_seconds", "Time per op", ["op"]) for registry in workers]
+    reads[0].observe(0.5, op="read")
+    reads[1].observe(0.05, op="read")
+    reads[1].observe(2.0, op="write")
+    workers[1].save()
+    samples = _samples(workers[0].render())
+    assert _series(samples, "op_seconds", op="read") == ([(0.1, 1), (1.0, 2), (math.inf, 2)], 0.55, 2)
+    assert _series(samples, "op_seconds", op="write")[2] == 1
+
+    # Worker 1 is replaced: its shard moves into the main file, then its successor starts empty
+    assert merge_shard(main, f"{main}.worker1")
+    successor = MetricsRegistry()
+    successor.histogram("op_seconds", "Time per op", ["op"], buckets=(0.1, 1.0))
+    successor.start_shard(f"{main}.worker1", main)
+    successor.save()
+    assert _series(_samples(workers[0].render()), "op_seconds", op="read")[2] == 2
+    workers[0].save()
+    assert _series(_samples(successor.render()), "op_seconds", op="read")[2] == 2
+
+
+def test_metrics_endpoint_counts_requests_by_endpoint_and_status(client):
+    before = _samples(client.get("/metrics").text)
+    for _ in range(3):
+        response = client.post("/detect/fake", json={"text": f"Solid charger {uuid.uuid4().hex}, works fine"})
+        assert response.status_code == 200
+    assert client.post("/detect/fake", json={"text": "Bad rating", "rating": 9}).status_code == 422
+    response = client.get("/metrics")
+    assert response.headers["content-type"].startswith("text/plain")
+    after = _samples(response.text)
+
+    def delta(metric, **labels):
+        buckets_before, sum_before, count_before = _series(before, metric, **labels)
+        buckets, total, count = _series(after, metric, **labels)
+        counts_before = dict(buckets_before)
+        buckets = [(bound, value - counts_before.get(bound, 0)) for bound, value in buckets]
+        return buckets, total - sum_before, count - count_before
+
+    for labels, expected in (
+        ({"endpoint": "/detect/fake", "method": "POST", "status": "200"}, 3),
+        ({"endpoint": "/detect/fake", "method": "POST", "status": "422"}, 1)
+    ):
+        buckets, total, count = delta("http_request_duration_seconds", **labels)
+        assert count == expected and total > 0
+        counts = [value for _, value in buckets]
+        assert counts == sorted(counts), "buckets must be cumulative"
+        assert buckets[-1] == (math.inf, expected)
+
+    for stage in ("validation", "inference", "serialization"):
+        buckets, total, count = delta(
+            "analysis_stage_duration_seconds", endpoint="/detect/fake", model="fake_detector", stage=stage
+        )
+        assert count == 3 and buckets[-1] == (math.inf, 3), stage
+
+    assert ("inference_in_flight", frozenset()) in after
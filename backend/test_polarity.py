@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Golden tests for the fast polarity/subjectivity engine
+Checks FastPolarityScorer against TextBlob's PatternAnalyzer on review-style texts
+"""
+
+import random
+
+import pytest
+
+from app.polarity import FastPolarityScorer
+from test_vader_engine import REVIEW_CORPUS
+
+textblob = pytest.importorskip("textblob")
+
+TOLERANCE = 1e-9
+
+# Negations, modifiers, exclamation boosts, sarcasm, emoticons, abbreviations,
+# contractions, quotes and paragraph breaks all change pattern's tokenization
+EXTRA_TOKENS = [
+    "not", "never", "no", "n't", "don't", "isn't", "very", "really", "extremely", "terribly",
+    "!", "(!)", "( ! )", ":)", ": )", ":-(", ":D", "<3", "o.O", ">.>", ":-.", ":'(", "e.g.",
+    "U.S.", "Mr.", "etc.", "...", "..", "\n\n", "\r\n", "'", "\"", "“", "”", "’", "a", "is",
+    "the", "it's", "I'm", ",", ".", "?", "(", ")", "-", "♥", "A.", "ok"
+]
+
+
+@pytest.fixture(scope="module")
+def scorer():
+    return FastPolarityScorer()
+
+
+def _assert_close(scorer, text):
+    expected = textblob.TextBlob(text).sentiment
+    polarity, subjectivity = scorer.polarity_subjectivity(text)
+    assert abs(polarity - expected.polarity) <= TOLERANCE, text
+    assert abs(subjectivity - expected.subjectivity) <= TOLERANCE, text
+
+
+def test_review_corpus_matches_textblob(scorer):
+    for text in REVIEW_CORPUS:
+        _assert_close(scorer, text)
+
+
+def test_random_texts_match_textblob(scorer):
+    rng = random.Random(11)
+    words = list(scorer.lexicon)
+    for _ in range(2000):
+        tokens = [
+            rng.choice(words) if rng.random() < 0.4 else rng.choice(EXTRA_TOKENS)
+            for _ in range(rng.randint(0, 25))
+        ]
+        separators = [rng.choice([" ", " ", " ", "", "  ", "\n", "\n\n"]) for _ in tokens]
+        _assert_close(scorer, "".join(token + sep for token, sep in zip(tokens, separators)))
+
+
+def test_score_many_preserves_order(scorer):
+    texts = ["Great product!", "Terrible, not good at all.", "", "It is okay."]
+    assert scorer.score_many(texts) == [scorer.polarity_subjectivity(text) for text in texts]
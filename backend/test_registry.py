@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared model registry
+Covers lazy construction, one build under concurrent first use, load times
+and errors, the simple_models re-exports and /ready around warm-up
+"""
+
+import threading
+import time
+
+import pytest
+
+from app import simple_models
+from app.registry import ModelRegistry, registry
+
+
+class _Loader:
+    """Counts builds, taking delay seconds each"""
+
+    def __init__(self, delay=0.0, fail_times=0):
+        self.delay = delay
+        self.fail_times = fail_times
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.calls <= self.fail_times:
+            raise RuntimeError("checkpoint missing")
+        return object()
+
+
+def test_models_are_built_on_first_use():
+    models = ModelRegistry()
+    loader = _Loader()
+    models.register("sentiment", loader)
+
+    assert "sentiment" in models and "fake" not in models
+    assert loader.calls == 0 and not models.is_loaded("sentiment")
+    assert models.load_time("sentiment") is None
+
+    instance = models.get("sentiment")
+    assert models.get("sentiment") is instance
+    assert loader.calls == 1 and models.is_loaded("sentiment")
+    with pytest.raises(KeyError, match="Unknown model: fake"):
+        models.get("fake")
+
+
+def test_concurrent_first_use_builds_once():
+    models = ModelRegistry()
+    loader = _Loader(delay=0.05)
+    models.register("sentiment", loader)
+    start = threading.Barrier(16)
+    instances = []
+
+    def use():
+        start.wait()
+        instances.append(models.get("sentiment"))
+
+    threads = [threading.Thread(target=use) for _ in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert loader.calls == 1
+    assert len(instances) == 16 and all(instance is instances[0] for instance in instances)
+
+
+def test_load_times_and_errors_are_recorded():
+    models = ModelRegistry()
+    models.register("slow", _Loader(delay=0.02))
+    flaky = _Loader(fail_times=1)
+    models.register("flaky", flaky)
+    # A loader may build nothing, which is cached like any instance
+    models.register("optional", lambda: None)
+
+    load_times = models.load_all()
+    assert set(load_times) == {"slow", "optional"} and load_times["slow"] >= 0.02
+    assert models.load_time("slow") == load_times["slow"]
+    assert models.errors() == {"flaky": "checkpoint missing"}
+    assert models.get("optional") is None and models.is_loaded("optional")
+
+    # A later successful build clears the error
+    models.get("flaky")
+    assert models.errors() == {} and flaky.calls == 2
+    assert models.load_time("flaky") is not None
+
+
+def test_simple_models_attributes_resolve_through_the_registry():
+    from app.simple_models import fake_detector, sentiment_analyzer
+
+    assert sentiment_analyzer is registry.get("sentiment_analyzer")
+    assert fake_detector is simple_models.fake_detector is registry.get("fake_detector")
+    assert simple_models.review_analyzer.sentiment is sentiment_analyzer
+    load_times = simple_models.load_analyzers()
+    assert set(load_times) == set(simple_models.ANALYZERS)
+    assert all(seconds is not None for seconds in load_times.values())
+    with pytest.raises(AttributeError, match="no attribute 'roberta_analyzer'"):
+        simple_models.roberta_analyzer
+
+
+def test_ready_is_503_until_models_are_warmed_up(client):
+    from app.main import model_manager
+
+    ready = client.get("/ready")
+    assert ready.status_code == 200
+    body = ready.json()
+    # RoBERTa needs a checkpoint and is optional
+    assert body["ready"] and body["models"]["vader"] and body["models"]["fake_detector"]
+    assert "import_seconds" in body["startup"]
+
+    model_manager.ready = False
+    try:
+        warming = client.get("/ready")
+        assert warming.status_code == 503 and warming.json()["ready"] is False
+    finally:
+        model_manager.ready = True
+    assert client.get("/ready").status_code == 200
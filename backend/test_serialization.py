@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Tests for response projection, columnar batches and content negotiation
+"""
+
+import pytest
+
+from app import serialization
+from app.schemas import FakeDetectionResponse, FullAnalysisResponse, SentimentResponse
+from app.serialization import JSON_MEDIA_TYPE, MSGPACK_MEDIA_TYPE, columnar, encode, negotiate, project
+from app.simple_models import fake_detector, review_analyzer, sentiment_analyzer
+from app.workers import batch_error
+
+REVIEW = "Great GPS, the screen is bright!!! Not happy with the mount though... http://example.com"
+
+
+def test_projection_matches_validated_models():
+    results = {
+        SentimentResponse: sentiment_analyzer.analyze_sentiment(REVIEW),
+        FakeDetectionResponse: fake_detector.detect_fake_review(REVIEW, rating=1),
+        FullAnalysisResponse: review_analyzer.analyze_review(REVIEW, rating=4, model="vader")
+    }
+    for model, result in results.items():
+        assert "stage_timings" in result
+        assert project(model, result) == model(**result).model_dump(mode="json")
+
+
+def test_projection_requires_declared_fields():
+    with pytest.raises(KeyError):
+        project(SentimentResponse, {"sentiment": "Positive"})
+
+
+def test_columnar_batch_keeps_order_and_errors():
+    results = [sentiment_analyzer.analyze_sentiment("Love it"), batch_error("x", ValueError("bad")),
+               sentiment_analyzer.analyze_sentiment("Hate it")]
+    columns = columnar(results)
+    assert columns["sentiment"] == ["Positive", None, "Negative"]
+    assert columns["error"] == [None, "bad", None]
+    assert columns["positive"][0] == results[0]["details"]["probabilities"]["positive"]
+    assert len({len(column) for column in columns.values()}) == 1
+
+
+@pytest.mark.parametrize("accept, available, expected", [
+    (None, True, JSON_MEDIA_TYPE),
+    ("*/*", True, JSON_MEDIA_TYPE),
+    ("application/msgpack", True, MSGPACK_MEDIA_TYPE),
+    ("application/json, application/x-msgpack", True, MSGPACK_MEDIA_TYPE),
+    ("application/json, application/msgpack;q=0.5", True, JSON_MEDIA_TYPE),
+    ("application/msgpack, */*;q=0.1", False, JSON_MEDIA_TYPE),
+    ("application/msgpack", False, None),
+    ("text/html", True, None)
+])
+def test_negotiation(monkeypatch, accept, available, expected):
+    # Negotiation only depends on whether msgpack can be imported
+    monkeypatch.setattr(serialization, "msgpack", (serialization.msgpack or object()) if available else None)
+    assert negotiate(accept) == expected
+
+
+def test_msgpack_round_trip():
+    msgpack = pytest.importorskip("msgpack")
+    content = {"model": "vader", "columns": columnar([sentiment_analyzer.analyze_sentiment("Love it")])}
+    response = encode(content, MSGPACK_MEDIA_TYPE)
+    assert response.media_type == MSGPACK_MEDIA_TYPE
+    assert msgpack.unpackb(response.body) == content
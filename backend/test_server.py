@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Tests for the pre-forking production server
+"""
+
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+
+import pytest
+
+from app.server import parse_smaps_rollup, process_memory, worker_count
+
+SMAPS_ROLLUP = """55d0c3a4e000-7ffd5e1f4000 ---p 00000000 00:00 0                          [rollup]
+Rss:               57344 kB
+Pss:               26624 kB
+Shared_Clean:      40960 kB
+Shared_Dirty:       5120 kB
+Private_Clean:      1024 kB
+Private_Dirty:     10240 kB
+Swap:                  0 kB
+"""
+
+
+def test_smaps_rollup_is_parsed_into_bytes():
+    assert parse_smaps_rollup(SMAPS_ROLLUP) == {
+        "rss": 57344 * 1024,
+        "pss": 26624 * 1024,
+        "shared": 46080 * 1024,
+        "private": 11264 * 1024
+    }
+
+
+def test_worker_count_defaults_to_cpu_count():
+    assert worker_count(3) == 3
+    assert worker_count(0) == (os.cpu_count() or 1)
+
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/status"), reason="needs /proc")
+def test_process_memory_of_this_process():
+    memory = process_memory(os.getpid())
+    assert memory["rss"] > 0
+    assert process_memory(2 ** 22 + 1) == {}
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_for_health(port: int, timeout: float = 30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as response:
+                return response.status
+        except OSError:
+            time.sleep(0.2)
+    raise AssertionError("server did not come up")
+
+
+def _detect_fake(port: int, text: str) -> dict:
+    request = urllib.request.Request(
+        f"http://127.0.0.1:{port}/detect/fake", data=json.dumps({"text": text}).encode(),
+        headers={"Content-Type": "application/json"}
+    )
+    with urllib.request.urlopen(request, timeout=10) as response:
+        return json.load(response)
+
+
+def _get(port: int, path: str) -> str:
+    with urllib.request.urlopen(f"http://127.0.0.1:{port}{path}", timeout=10) as response:
+        return response.read().decode()
+
+
+def _fake_checks_seen(port: int) -> tuple:
+    """Fake checks counted by /statistics and by the /metrics request histogram, as one worker answers"""
+    statistics = json.loads(_get(port, "/statistics"))["dataset"]["total_reviews"]
+    prefix = 'http_request_duration_seconds_count{endpoint="/detect/fake",method="POST",status="200"} '
+    counts = [line[len(prefix):] for line in _get(port, "/metrics").splitlines() if line.startswith(prefix)]
+    return statistics, int(counts[0]) if counts else 0
+
+
+def _wait_until_every_worker_sees(port: int, expected: tuple, timeout: float = 20) -> None:
+    """Poll until enough answers in a row, from whichever workers, agree on expected"""
+    deadline, agreeing, seen = time.time() + timeout, 0, None
+    while agreeing < 10 and time.time() < deadline:
+        seen = _fake_checks_seen(port)
+        agreeing = agreeing + 1 if seen == expected else 0
+        time.sleep(0.05)
+    assert seen == expected
+
+
+def _start_server(port: int, tmp_path, **env) -> subprocess.Popen:
+    env = dict(
+        os.environ,
+        ROBERTA_MODEL_PATH="",
+        STATS_SNAPSHOT_PATH=str(tmp_path / "statistics.json"),
+        DEDUP_INDEX_PATH="",
+        BEHAVIOR_STORE_PATH="",
+        JOBS_DIR=str(tmp_path / "jobs"),
+        BATCH_WORKERS="1",
+        WORKER_SHARD_INTERVAL="0.2",
+        PYTHONUNBUFFERED="1",
+        **env
+    )
+    return subprocess.Popen(
+        [sys.executable, "-m", "app.server", "--workers", "2", "--host", "127.0.0.1", "--port", str(port)],
+        cwd=os.path.dirname(os.path.abspath(__file__)), env=env,
+        stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True
+    )
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork")
+def test_adding_reviews_from_several_workers_is_refused(tmp_path):
+    master = _start_server(_free_port(), tmp_path, DEDUP_INSERT="true", BEHAVIOR_RECORD="")
+    output, _ = master.communicate(timeout=60)
+    assert master.returncode != 0
+    assert "DEDUP_INSERT=true needs a single worker, not 2" in output
+    assert "👷 Worker" not in output
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork")
+def test_workers_are_forked_rolled_and_stopped(tmp_path):
+    port = _free_port()
+    # Unset, the index and store are served read-only by every worker
+    master = _start_server(port, tmp_path, DEDUP_INSERT="", BEHAVIOR_RECORD="")
+    lines = []
+    reader = threading.Thread(target=lambda: lines.extend(master.stdout), daemon=True)
+    reader.start()
+    text = "Same words posted again and again to every worker"
+    try:
+        assert _wait_for_health(port) == 200
+        # With two workers the index is read-only, so no worker counts reposts
+        assert [_detect_fake(port, text)["features"]["near_duplicates"] for _ in range(3)] == [0, 0, 0]
+        # Whichever worker answers reports every worker's traffic
+        _wait_until_every_worker_sees(port, (3, 3))
+        master.send_signal(signal.SIGHUP)
+        deadline = time.time() + 30
+        while sum("👷 Worker" in line for line in lines) < 4 and time.time() < deadline:
+            time.sleep(0.1)
+        assert _wait_for_health(port) == 200
+        for _ in range(2):
+            _detect_fake(port, text)
+        # Including the traffic of the workers the restart replaced
+        _wait_until_every_worker_sees(port, (5, 5))
+    finally:
+        master.send_signal(signal.SIGTERM)
+        master.wait(timeout=60)
+        reader.join(timeout=5)
+
+    output = "".join(lines)
+    assert master.returncode == 0
+    assert output.count("👷 Worker") == 4
+    assert output.count("stopped after") == 2
+    assert "✅ All workers stopped" in output
+    # Every worker's statistics, before and after the restart, reached the snapshot
+    with open(tmp_path / "statistics.json") as f:
+        assert json.load(f)["fake_checked"] == 5
+    assert sorted(os.listdir(tmp_path)) == ["jobs", "statistics.json"]
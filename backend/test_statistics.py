@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Tests for the incremental statistics engine
+"""
+
+from app.statistics import StatisticsEngine
+
+
+def _analysis(sentiment, suspicious, category):
+    return {
+        "sentiment": {"sentiment": sentiment},
+        "fake": {"is_suspicious": suspicious},
+        "helpfulness": {"helpfulness_category": category}
+    }
+
+
+def test_running_totals_and_percentages():
+    engine = StatisticsEngine()
+    engine.record_analysis(_analysis("Positive", False, "Very Helpful"), "vader", 100)
+    engine.record_analysis(_analysis("Negative", True, "Not Helpful"), "roberta", 300)
+    engine.record_analysis({"sentiment": {"sentiment": "Positive"}}, "vader", 200)
+
+    stats = engine.snapshot()
+    assert stats["total_reviews"] == 3
+    assert stats["average_text_length"] == 200
+    assert stats["sentiment_counts"] == {"Positive": 2, "Negative": 1, "Neutral": 0}
+    assert stats["model_predictions"]["vader"]["Positive"] == 2
+    assert stats["suspicious_reviews_percentage"] == 50.0
+    assert stats["helpful_reviews_percentage"] == 50.0
+
+
+def test_timeline_keeps_only_the_window():
+    engine = StatisticsEngine(bucket_seconds=60, window_buckets=3)
+    for minute in range(5):
+        engine.record_review(10, now=minute * 60 + 1)
+        engine.record_sentiment("Neutral", "vader", now=minute * 60 + 2)
+
+    timeline = engine.timeline(now=4 * 60 + 5)
+    assert [bucket["start"] for bucket in timeline] == [120, 180, 240]
+    assert all(bucket["reviews"] == 1 and bucket["Neutral"] == 1 for bucket in timeline)
+
+
+def test_snapshot_survives_restart(tmp_path):
+    path = str(tmp_path / "stats.json")
+    engine = StatisticsEngine(snapshot_path=path)
+    engine.record_analysis(_analysis("Neutral", True, "Helpful"), "vader", 42)
+    engine.save()
+
+    restored = StatisticsEngine(snapshot_path=path).snapshot()
+    assert restored["total_reviews"] == 1
+    assert restored["suspicious"] == 1
+    assert restored["model_predictions"] == {"vader": {"Positive": 0, "Negative": 0, "Neutral": 1}}
+
+
+def test_worker_shards_merge_into_the_snapshot(tmp_path):
+    path = str(tmp_path / "stats.json")
+    base = StatisticsEngine(bucket_seconds=60, snapshot_path=path)
+    base.record_analysis(_analysis("Positive", False, "Helpful"), "vader", 10)
+    base.save()
+
+    # Two workers fork from the saved totals and each record their own traffic
+    workers = []
+    for slot, sentiment in enumerate(("Negative", "Neutral")):
+        worker = StatisticsEngine(bucket_seconds=60, snapshot_path=path)
+        worker.start_shard(f"{path}.worker{slot}")
+        for _ in range(slot + 1):
+            worker.record_analysis(_analysis(sentiment, True, "Not Helpful"), "roberta", 20)
+        worker.save()
+        workers.append(worker)
+    assert StatisticsEngine(snapshot_path=f"{path}.worker1").snapshot()["total_reviews"] == 2
+
+    master = StatisticsEngine(bucket_seconds=60, snapshot_path=path)
+    assert master.merge(f"{path}.worker0") and master.merge(f"{path}.worker1")
+    assert not master.merge(str(tmp_path / "missing.json"))
+    stats = master.snapshot()
+    assert stats["total_reviews"] == 4 and stats["total_text_length"] == 70
+    assert stats["sentiment_counts"] == {"Positive": 1, "Negative": 1, "Neutral": 2}
+    assert stats["model_predictions"]["roberta"] == {"Positive": 0, "Negative": 1, "Neutral": 2}
+    assert stats["suspicious"] == 3 and stats["helpful"] == 1
+    assert sum(bucket["reviews"] for bucket in stats["timeline"]) == 4
+
+
+def test_shard_skips_buckets_that_left_the_window(tmp_path):
+    engine = StatisticsEngine(bucket_seconds=60, window_buckets=2)
+    engine.record_review(10, now=1)
+    engine.start_shard(str(tmp_path / "shard.json"))
+    engine.record_review(10, now=61)
+    engine.record_review(10, now=121)
+    engine.save()
+
+    master = StatisticsEngine(bucket_seconds=60, window_buckets=2)
+    master.merge(str(tmp_path / "shard.json"))
+    assert master.total_reviews == 2
+    assert [(bucket["start"], bucket["reviews"]) for bucket in master.buckets] == [(60, 1), (120, 1)]
+
+
+def test_sharded_snapshot_adds_the_other_workers(tmp_path):
+    path = str(tmp_path / "stats.json")
+    base = StatisticsEngine(snapshot_path=path)
+    base.record_analysis(_analysis("Positive", False, "Helpful"), "vader", 10)
+    base.save()
+
+    workers = [StatisticsEngine(snapshot_path=path) for _ in range(2)]
+    for slot, worker in enumerate(workers):
+        worker.start_shard(f"{path}.worker{slot}")
+    workers[0].record_analysis(_analysis("Negative", True, "Helpful"), "vader", 20)
+    workers[1].record_analysis(_analysis("Neutral", False, "Helpful"), "vader", 30)
+    # Worker 1 has not saved yet, so worker 0 sees only its own traffic on top of the snapshot
+    assert workers[0].snapshot()["total_reviews"] == 2
+    workers[1].save()
+    assert workers[0].snapshot()["sentiment_counts"] == {"Positive": 1, "Negative": 1, "Neutral": 1}
+
+    # The master folds worker 1's shard in but has not deleted it yet: it is counted once
+    master = StatisticsEngine(snapshot_path=path)
+    master.merge(f"{path}.worker1")
+    master.save()
+    stats = workers[0].snapshot()
+    assert stats["total_reviews"] == 3 and stats["total_text_length"] == 60
+    assert sum(bucket["reviews"] for bucket in stats["timeline"]) == 3
+    assert "merged_shards" not in stats
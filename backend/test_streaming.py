@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Tests for /predict/stream
+Covers line batching and the line size cap, output order through the
+endpoint, client disconnects, and streams waiting for executor capacity
+"""
+
+import asyncio
+import json
+import threading
+import uuid
+
+import pytest
+
+from app.executor import InferenceExecutor, OverloadedError
+from app.streaming import encode_line, iter_review_batches
+
+
+async def _chunks(*chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+def _collect(chunks, **kwargs):
+    async def run():
+        return [batch async for batch in iter_review_batches(_chunks(*chunks), **kwargs)]
+
+    return asyncio.run(run())
+
+
+def _line(text, **fields):
+    return json.dumps({"text": text, **fields}).encode() + b"\n"
+
+
+def test_lines_split_across_chunks_keep_their_order():
+    body = b"".join(_line(f"Review {index}", id=index) for index in range(10)) + b"\n  \n"
+    # Every line is cut somewhere, and the last one has no trailing newline
+    chunks = [body[start:start + 7] for start in range(0, len(body), 7)] + [_line("Last").rstrip()]
+
+    batches = _collect(chunks, max_batch=4)
+    lines = [line for batch in batches for line in batch]
+    assert all(len(batch) <= 4 for batch in batches)
+    assert [index for index, _, _ in lines] == list(range(11))
+    assert [review["text"] for _, review, _ in lines] == [f"Review {index}" for index in range(10)] + ["Last"]
+    assert all(error is None for _, _, error in lines)
+
+
+def test_malformed_and_oversized_lines_are_reported_in_place():
+    oversized = _line("x" * 2000)
+    chunks = [
+        _line("First") + b"{not json\n" + b"[1, 2]\n" + json.dumps({"text": "Bad", "rating": 9}).encode() + b"\n",
+        # A complete oversized line in one chunk, then one that spans several
+        oversized + _line("Second"),
+        oversized[:700], oversized[700:1400], oversized[1400:] + _line("Third")
+    ]
+
+    lines = [line for batch in _collect(chunks, max_line_bytes=1024) for line in batch]
+    assert [index for index, _, _ in lines] == list(range(8))
+    assert [review and review["text"] for _, review, _ in lines] == [
+        "First", None, None, None, None, "Second", None, "Third"
+    ]
+    errors = [error for _, _, error in lines]
+    assert errors[1].startswith("Expecting property name")
+    assert errors[2] == "Each line must be a JSON object"
+    assert errors[3].startswith("rating:")
+    assert errors[4] == errors[6] == "Line exceeds 1024 bytes"
+
+
+def test_stream_endpoint_returns_one_line_per_review_in_order(client):
+    tag = uuid.uuid4().hex
+    body = b"".join(
+        b"{oops\n" if index == 40 else _line(f"Great product {tag} number {index}, works well", id=f"r{index}")
+        for index in range(100)
+    ) + _line("x" * (70 * 1024)) + _line(f"Final review {tag}", id="last")
+
+    response = client.post("/predict/stream?model=vader&analyses=sentiment,fake", content=body)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["index"] for line in lines] == list(range(102))
+    assert [line.get("id") for line in lines] == [None if index == 40 else f"r{index}" for index in range(100)] + [
+        None, "last"
+    ]
+    assert "error" in lines[40] and lines[100]["error"] == "Line exceeds 65536 bytes"
+    assert all(line["sentiment"]["sentiment"] and "fake" in line for line in lines[:40] + lines[41:100])
+
+
+def test_client_disconnect_ends_the_stream_quietly(client):
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+        "scheme": "http", "path": "/predict/stream", "raw_path": b"/predict/stream", "root_path": "",
+        "query_string": b"model=vader&analyses=sentiment", "headers": [(b"content-type", b"application/x-ndjson")],
+        "client": ("testclient", 50000), "server": ("testserver", 80)
+    }
+    received = [
+        {"type": "http.request", "body": _line("Lovely", id=1) + _line("Awful", id=2), "more_body": True},
+        {"type": "http.disconnect"}
+    ]
+    sent = []
+
+    async def receive():
+        return received.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    async def run():
+        await client.app(scope, receive, send)
+
+    client.portal.call(run)
+    assert sent[0]["type"] == "http.response.start" and sent[0]["status"] == 200
+    body = b"".join(message.get("body", b"") for message in sent[1:])
+    assert [json.loads(line)["id"] for line in body.splitlines()] == [1, 2]
+    assert sent[-1] == {"type": "http.response.body", "body": b"", "more_body": False}
+
+
+def test_waiting_for_capacity_is_not_counted_as_a_rejection():
+    executor = InferenceExecutor(workers=1, queue_size=0)
+    release = threading.Event()
+
+    async def run():
+        try:
+            blocking = asyncio.ensure_future(executor.run(release.wait))
+            while executor.in_flight == 0:
+                await asyncio.sleep(0)
+            with pytest.raises(OverloadedError):
+                await executor.run(len, "full")
+            waiting = [asyncio.ensure_future(executor.run(len, "x" * size, wait=True)) for size in range(3)]
+            await asyncio.sleep(0.05)
+            assert executor.stats()["waiting"] == 3 and not any(task.done() for task in waiting)
+
+            # A waiter that gives up does not hold on to the slot
+            waiting[0].cancel()
+            release.set()
+            await blocking
+            return await asyncio.gather(*waiting[1:])
+        finally:
+            executor.shutdown()
+
+    assert asyncio.run(run()) == [1, 2]
+    stats = executor.stats()
+    assert stats["rejected"] == 1 and stats["waiting"] == 0 and stats["in_flight"] == 0
+
+
+def test_encode_line_is_one_json_line():
+    line = encode_line({"index": 3, "text": "multi\nline"})
+    assert line.endswith(b"\n") and line.count(b"\n") == 1
+    assert json.loads(line) == {"index": 3, "text": "multi\nline"}
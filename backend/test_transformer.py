@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Tests for the local-checkpoint transformer backend
+Saves a tiny randomly initialized RoBERTa to disk and serves it with each CPU option
+"""
+
+import pytest
+
+pytest.importorskip("torch")
+transformers = pytest.importorskip("transformers")
+
+from app.transformer import build_classifier, checkpoint_labels
+
+WORDS = ["great", "terrible", "product", "battery", "works", "broke", "love", "hate", "not", "very"]
+TEXTS = ["great product", "terrible battery broke", "not very great", "love it", "hate hate hate works"]
+
+
+@pytest.fixture(scope="module")
+def checkpoint(tmp_path_factory, tiny_roberta):
+    model, tokenizer = tiny_roberta(WORDS)
+    path = tmp_path_factory.mktemp("checkpoint")
+    model.save_pretrained(path)
+    tokenizer.save_pretrained(path)
+    return str(path)
+
+
+def _probabilities(classifier):
+    return [
+        [result["details"]["probabilities"][name] for name in ("negative", "neutral", "positive")]
+        for result in classifier.predict_batch(TEXTS)
+    ]
+
+
+def test_checkpoint_labels_fall_back_to_notebook_order():
+    assert checkpoint_labels(transformers.RobertaConfig(num_labels=3)) == ["Negative", "Neutral", "Positive"]
+    config = transformers.RobertaConfig(id2label={0: "positive", 1: "negative", 2: "neutral"})
+    assert checkpoint_labels(config) == ["Positive", "Negative", "Neutral"]
+
+
+def test_missing_checkpoint_directory_fails_fast(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        build_classifier(str(tmp_path / "missing"))
+
+
+@pytest.mark.parametrize("quantize,runtime", [(False, "torchscript"), (True, "eager"), (True, "torchscript")])
+def test_cpu_options_match_eager_model(checkpoint, quantize, runtime):
+    reference = _probabilities(build_classifier(checkpoint, max_length=32))
+    classifier = build_classifier(checkpoint, quantize=quantize, runtime=runtime, max_length=32)
+    tolerance = 0.02 if quantize else 1e-5
+    for expected, actual in zip(reference, _probabilities(classifier)):
+        assert actual == pytest.approx(expected, abs=tolerance)
+
+    stats = classifier.stats()
+    assert stats["quantized"] == quantize
+    assert stats["runtime"] == runtime
+    assert stats["batches"] == 1 and stats["items"] == len(TEXTS)
+    assert stats["batch_p50_ms"] > 0
+
+
+def test_buckets_restore_order_and_cut_padding(checkpoint):
+    texts = [" ".join(WORDS[:1 + i % 10] * (1 + i % 3)) for i in range(23)]
+    classifier = build_classifier(checkpoint, max_length=64, bucket_size=4)
+    batched = classifier.predict_batch(texts)
+
+    reference = build_classifier(checkpoint, max_length=64, bucket_size=1)
+    for text, result in zip(texts, batched):
+        single = reference.predict_batch([text])[0]
+        assert result["text_length"] == len(text)
+        for label, probability in single["details"]["probabilities"].items():
+            assert result["details"]["probabilities"][label] == pytest.approx(probability, abs=1e-5)
+
+    stats = classifier.stats()
+    assert stats["padding_waste"] < stats["padding_waste_unbucketed"]
+    assert sum(band["buckets"] for band in stats["buckets_by_length"].values()) == 6
+
+
+def test_head_tail_truncation_keeps_both_ends(checkpoint):
+    classifier = build_classifier(checkpoint, max_length=8, truncation="head_tail", head_tokens=3)
+    text = "great " * 10 + "terrible broke"
+    ids = classifier._tokenize([text])[0]
+    vocab = classifier.tokenizer.get_vocab()
+    assert len(ids) == 8
+    assert ids[:3] == [vocab["great"]] * 3
+    assert ids[-2:] == [vocab["terrible"], vocab["broke"]]
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Golden tests for the fast VADER engine
+Checks FastVaderScorer against vaderSentiment on review-style texts
+"""
+
+import random
+
+from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer, BOOSTER_DICT, NEGATE, SPECIAL_CASES
+
+from app.vader_engine import FastVaderScorer
+
+# Review texts in the style of the Electronics_5 corpus, covering negation,
+# boosters, ALL CAPS emphasis, "but", "least", idioms, emoticons and emojis
+REVIEW_CORPUS = [
+    "We got this GPS for my husband who is an (OTR) over the road trucker. Very Impressed with the shipping time, it arrived a few days earlier than expected.",
+    "I'm a professional OTR truck driver, and I bought this TND 700 at a truck stop hoping to make my life easier. Rand McNally, are you listening? NOT HAPPY!!",
+    "Well, what can I say.  I've had this unit in my truck for about a week now and I'm sort of on the fence about it.",
+    "Not going to write a long review, even thought this unit deserves it. Great grafics, POOR GPS.",
+    "I've had mine for a year and here's what we got. Major issues, only excuses for support.",
+    "You get what you pay for. Combined with a free case, it's kind of ok but the cable died in a month.",
+    "Love it!  I ran an old school bridge from my Mac and this media bridge makes use of the 5 GHz router :)",
+    "I bought a new Kodak ZX5 pocket camcorder and needed a case. Great case, fits perfectly.",
+    "Terrible quality. Broke after one day. Do not waste your money.",
+    "THIS IS THE BEST PRODUCT EVER!!!!!!! BUY NOW!!!!!!!!!! AMAZING!!!!!!!!",
+    "It is okay, works as expected.",
+    "The sound is not bad at all, but the bass is barely there and the mids are slightly muddy.",
+    "At least it isn't a horrible charger. Still, I would never buy this brand again.",
+    "Without a doubt, an excellent keyboard. The keys feel great and I never had this good of a typing experience.",
+    "This is one of the least reliable routers I've owned. Drops the connection constantly???",
+    "No problems so far, no complaints. Fast shipping and nice packaging.",
+    "Nope. Doesn't work with my laptop, doesn't charge, doesn't do anything. Returned it.",
+    "The screen is VERY bright and the colors are EXTREMELY vivid, but the battery life is really disappointing.",
+    "Kinda sorta works, I guess? Not great, not terrible.",
+    "Absolutely love these headphones 😁💘 best purchase this year!",
+    "Arrived broken 😡 and customer service was useless. Yeah right, \"premium quality\".",
+    "This cable is the bomb. Cheap, sturdy, and it just works.",
+    "I wouldn't say it's great, but it's not the worst thing I've bought either.",
+    "Meh.",
+    "",
+    "   ",
+    "5 stars",
+    "Works fine with my TV, picture is clear, remote is a little flimsy but does the job.",
+    "DO NOT BUY. Stopped working after two weeks and the seller won't refund. Scam scam scam.",
+    "Highly recommended for anyone looking for a reliable solution, though setup was somewhat confusing.",
+    "It's good, but it's not that good. The price is fair but the build feels cheap and the fan is kind of loud.",
+    "I can't stand the clicking noise. Otherwise it would have been a perfect mouse.",
+    "The mount is solid as a rock and the instructions were surprisingly clear!!! :D",
+    "Hardly worth the money; occasionally freezes and the app crashes more than it works.",
+    "Never so happy with a purchase. Totally worth it!",
+    "Bad ass little speaker. Loud, clear, and the battery lasts forever.",
+]
+
+
+def _fuzz_texts(count: int, seed: int = 1234):
+    """Random texts drawn from the rule vocabulary to hit rare rule combinations"""
+    reference = SentimentIntensityAnalyzer()
+    rng = random.Random(seed)
+    vocabulary = list(reference.lexicon)[:2000] + list(BOOSTER_DICT) + list(NEGATE)
+    vocabulary += [word for phrase in SPECIAL_CASES for word in phrase.split()]
+    vocabulary += ["but", "BUT", "kind", "of", "least", "at", "very", "no", "nor", "never",
+                   "so", "this", "without", "doubt", "GREAT", "!!", "??", ":)", "😁", ","]
+    texts = []
+    for _ in range(count):
+        words = [rng.choice(vocabulary) for _ in range(rng.randint(0, 20))]
+        text = " ".join(words)
+        texts.append(text.upper() if rng.random() < 0.2 else text)
+    return texts
+
+
+def test_review_corpus_matches_vader():
+    reference = SentimentIntensityAnalyzer()
+    scorer = FastVaderScorer()
+    for text in REVIEW_CORPUS:
+        assert scorer.polarity_scores(text) == reference.polarity_scores(text), text
+
+
+def test_rule_fuzz_matches_vader():
+    reference = SentimentIntensityAnalyzer()
+    scorer = FastVaderScorer()
+    for text in _fuzz_texts(5000):
+        assert scorer.polarity_scores(text) == reference.polarity_scores(text), text
+
+
+def test_score_many_preserves_order():
+    scorer = FastVaderScorer()
+    assert scorer.score_many(REVIEW_CORPUS) == [scorer.polarity_scores(text) for text in REVIEW_CORPUS]
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Tests for the batch worker pool
+Covers input order across shards, in-batch duplicates scored once and
+failures isolated to the shard that raised
+"""
+
+import asyncio
+
+from app import workers
+from app.models import ModelManager
+from app.workers import BatchWorkerPool, analyze_sentiment_shard
+
+TEXTS = [
+    f"{opening} review number {index}"
+    for index, opening in enumerate(["Great product, love it!", "Terrible, broke in a day.", "It is a cable."] * 20)
+]
+
+
+def _shard_failing_on_marker(texts, model, deadline=None):
+    if any("crash" in text for text in texts):
+        raise RuntimeError("worker crashed")
+    return analyze_sentiment_shard(texts, model, deadline)
+
+
+def _scores(results):
+    """Results without their timings"""
+    return [(result.get("sentiment"), result.get("confidence"), result.get("error")) for result in results]
+
+
+def _run(pool, texts, model="vader"):
+    async def run():
+        try:
+            return await pool.analyze_sentiment(texts, model)
+        finally:
+            pool.shutdown()
+
+    return asyncio.run(run())
+
+
+def test_shards_are_contiguous_and_balanced():
+    pool = BatchWorkerPool(workers=4, min_shard_size=5)
+    shards = pool.shard(TEXTS[:23])
+    assert [len(shard) for shard in shards] == [6, 6, 6, 5]
+    assert [text for shard in shards for text in shard] == TEXTS[:23]
+    # Too few texts to be worth more than one shard
+    assert pool.shard(TEXTS[:7]) == [TEXTS[:7]]
+    assert not pool.should_shard(9) and pool.should_shard(10)
+
+
+def test_results_keep_input_order_across_shards():
+    results = _run(BatchWorkerPool(workers=3, min_shard_size=4), TEXTS)
+    assert _scores(results) == _scores(analyze_sentiment_shard(TEXTS, "vader"))
+    assert [result["text_length"] for result in results] == [len(text) for text in TEXTS]
+
+
+def test_one_failing_shard_keeps_the_others_results(monkeypatch):
+    monkeypatch.setattr(workers, "analyze_sentiment_shard", _shard_failing_on_marker)
+    texts = list(TEXTS[:30])
+    texts[12] = "This one will crash the shard"
+    pool = BatchWorkerPool(workers=3, min_shard_size=5)
+
+    results = _run(pool, texts)
+    expected = analyze_sentiment_shard(texts, "vader")
+    assert len(results) == len(texts)
+    # Shards are texts 0-9, 10-19 and 20-29
+    assert _scores(results[:10]) == _scores(expected[:10]) and _scores(results[20:]) == _scores(expected[20:])
+    assert all(result["error"] == "worker crashed" for result in results[10:20])
+    assert [result["text"] for result in results[10:20]] == texts[10:20]
+
+
+def test_in_batch_duplicates_are_scored_once_and_fanned_out():
+    manager = ModelManager()
+    scored = []
+
+    class RecordingPool(BatchWorkerPool):
+        async def analyze_sentiment(self, texts, model, deadline=None):
+            scored.extend(texts)
+            return analyze_sentiment_shard(texts, model, deadline)
+
+    manager.batch_pool = RecordingPool(workers=2, min_shard_size=2)
+    distinct = TEXTS[:6]
+    texts = distinct + distinct[::-1] + distinct[:2]
+
+    async def run():
+        try:
+            return await manager.batch_sentiment_analysis(texts, "vader")
+        finally:
+            manager.shutdown()
+
+    results = asyncio.run(run())
+    assert scored == distinct
+    assert [result["text_length"] for result in results] == [len(text) for text in texts]
+    by_text = dict(zip(distinct, _scores(analyze_sentiment_shard(distinct, "vader"))))
+    assert _scores(results) == [by_text[text] for text in texts]
+    # Every copy of a text shares the one computed result
+    assert results[0] is results[11] is results[12]
@@ -1,4 +1,4 @@
-import React, { useState } from 'react';
+import React, { useRef, useState } from 'react';
 import styled from 'styled-components';
 import { motion } from 'framer-motion';
 import {
@@ -53,6 +53,8 @@ const BatchAnalysis = () => {
   const [reviews, setReviews] = useState([]);
   const [isAnalyzing, setIsAnalyzing] = useState(false);
   const [results, setResults] = useState([]);
+  const [job, setJob] = useState(null);
+  const fileInput = useRef(null);
 
   const handleAddReview = () => {
     setReviews([...reviews, '']);
@@ -101,6 +103,54 @@ const BatchAnalysis = () => {
     }
   };
 
+  const pollJob = async (jobId) => {
+    const response = await fetch(`${process.env.REACT_APP_API_URL}/jobs/${jobId}`);
+    const status = await response.json();
+    setJob(status);
+    if (status.status === 'completed') {
+      const page = await fetch(`${process.env.REACT_APP_API_URL}/jobs/${jobId}/results?limit=100`);
+      const data = await page.json();
+      setResults(data.rows.map(row => ({
+        error: row.error,
+        sentiment: row.sentiment,
+        confidence: row.sentiment_confidence
+      })));
+    } else if (status.status !== 'failed') {
+      setTimeout(() => pollJob(jobId), 1000);
+    }
+  };
+
+  const handleUpload = async (event) => {
+    const file = event.target.files[0];
+    event.target.value = '';
+    if (!file) {
+      return;
+    }
+
+    setResults([]);
+    const formData = new FormData();
+    formData.append('file', file);
+    formData.append('model', 'vader');
+
+    try {
+      const response = await fetch(`${process.env.REACT_APP_API_URL}/jobs`, {
+        method: 'POST',
+        body: formData
+      });
+
+      if (response.ok) {
+        const created = await response.json();
+        setJob(created);
+        pollJob(created.job_id);
+      } else {
+        alert('Upload failed. Please try again.');
+      }
+    } catch (error) {
+      console.error('Error:', error);
+      alert('Failed to upload file. Please try again.');
+    }
+  };
+
   return (
     <Container>
       <UploadArea
@@ -115,6 +165,48 @@ const BatchAnalysis = () => {
         </p>
       </UploadArea>
 
+      <input
+        ref={fileInput}
+        type="file"
+        accept=".csv,.jsonl,.json"
+        onChange={handleUpload}
+        style={{ display: 'none' }}
+      />
+      <button
+        onClick={() => fileInput.current.click()}
+        style={{
+          background: 'white',
+          color: '#3b82f6',
+          border: '1px solid #3b82f6',
+          borderRadius: '8px',
+          padding: '12px 24px',
+          fontSize: '16px',
+          fontWeight: '600',
+          cursor: 'pointer',
+          display: 'flex',
+          alignItems: 'center',
+          gap: '8px'
+        }}
+      >
+        <Upload size={20} />
+        Upload CSV or JSONL File
+      </button>
+
+      {job && (
+        <ResultItem>
+          {job.status === 'failed' ? (
+            <AlertCircle size={20} style={{ color: '#ef4444' }} />
+          ) : (
+            <FileText size={20} style={{ color: '#3b82f6' }} />
+          )}
+          <span>{job.filename}</span>
+          <span style={{ color: '#64748b', fontSize: '14px' }}>
+            {job.status === 'failed' ? job.error : `${job.rows_done.toLocaleString()} reviews analyzed`}
+          </span>
+          <span style={{ fontWeight: 600 }}>{(job.progress * 100).toFixed(0)}%</span>
+        </ResultItem>
+      )}
+
       {reviews.map((review, index) => (
         <ResultItem
           key={index}
@@ -242,14 +242,10 @@ const Dashboard = () => {
       { name: 'ROBERTA', accuracy: 0, f1: 0 }
     ];
 
-  const timelineData = [
-    { time: '00:00', requests: 45 },
-    { time: '04:00', requests: 23 },
-    { time: '08:00', requests: 78 },
-    { time: '12:00', requests: 120 },
-    { time: '16:00', requests: 95 },
-    { time: '20:00', requests: 67 }
-  ];
+  const timelineData = (stats?.timeline || []).map(bucket => ({
+    time: new Date(bucket.start).toLocaleTimeString([], { hour: '2-digit', minute: '2-digit' }),
+    requests: bucket.reviews
+  }));
 
   const recentActivity = [
     {
@@ -97,10 +97,10 @@ const ModelComparison = () => {
     setResults(null);
 
     try {
-      const response = await fetch(${process.env.REACT_APP_API_URL}/compare', {
+      const response = await fetch(`${process.env.REACT_APP_API_URL}/compare`, {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify(text.trim())
+        body: JSON.stringify({ text: text.trim() })
       });
 
       if (response.ok) {
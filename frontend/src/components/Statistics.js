@@ -146,14 +146,11 @@ const Statistics = () => {
     accuracy: item.accuracy
   }));
 
-  const timelineData = [
-    { month: 'Jan', requests: 1200, accuracy: 85 },
-    { month: 'Feb', requests: 1800, accuracy: 87 },
-    { month: 'Mar', requests: 2400, accuracy: 89 },
-    { month: 'Apr', requests: 2100, accuracy: 88 },
-    { month: 'May', requests: 2800, accuracy: 91 },
-    { month: 'Jun', requests: 3200, accuracy: 93 }
-  ];
+  const timelineData = (stats?.timeline || []).map(bucket => ({
+    time: new Date(bucket.start).toLocaleTimeString([], { hour: '2-digit', minute: '2-digit' }),
+    requests: bucket.reviews,
+    suspicious: bucket.suspicious
+  }));
 
   return (
     <Container>
@@ -188,7 +185,7 @@ const Statistics = () => {
           animate={{ opacity: 1, y: 0 }}
           transition={{ delay: 0.3 }}
         >
-          <StatValue>{(stats.dataset.helpful_reviews_percentage * 100).toFixed(1)}%</StatValue>
+          <StatValue>{stats.dataset.helpful_reviews_percentage.toFixed(1)}%</StatValue>
           <StatLabel>Helpful Reviews</StatLabel>
         </StatCard>
 
@@ -197,7 +194,7 @@ const Statistics = () => {
           animate={{ opacity: 1, y: 0 }}
           transition={{ delay: 0.4 }}
         >
-          <StatValue>{(stats.dataset.suspicious_reviews_percentage * 100).toFixed(1)}%</StatValue>
+          <StatValue>{stats.dataset.suspicious_reviews_percentage.toFixed(1)}%</StatValue>
           <StatLabel>Suspicious Reviews</StatLabel>
         </StatCard>
       </StatsGrid>
@@ -262,12 +259,12 @@ const Statistics = () => {
       >
         <ChartTitle>
           <Activity size={18} />
-          Performance Timeline
+          Activity Timeline
         </ChartTitle>
         <ResponsiveContainer width="100%" height={400}>
           <LineChart data={timelineData}>
             <CartesianGrid strokeDasharray="3 3" stroke="#f0f0f0" />
-            <XAxis dataKey="month" />
+            <XAxis dataKey="time" />
             <YAxis yAxisId="left" orientation="left" stroke="#3b82f6" />
             <YAxis yAxisId="right" orientation="right" stroke="#10b981" />
             <Tooltip />
@@ -276,10 +273,10 @@ const Statistics = () => {
             <Line
               yAxisId="right"
               type="monotone"
-              dataKey="accuracy"
+              dataKey="suspicious"
               stroke="#10b981"
               strokeWidth={2}
-              name="Accuracy %"
+              name="Suspicious"
             />
           </LineChart>
         </ResponsiveContainer>